@@ -14,12 +14,17 @@ __copyright__ = "E.A. van Valkenburg"
 __license__ = "mit"
 
 from .account import SIAAccount
+from .batch import BatchConfig
 from .sync.client import SIAClient
+from .sync.pool import ThreadPoolConfig
+from .sync.selector import SelectorConfig
 from .errors import (
     InvalidAccountFormatError,
     InvalidAccountLengthError,
     InvalidKeyFormatError,
     InvalidKeyLengthError,
 )
-from .event import SIAEvent, OHEvent
+from .event import SIAEvent, OHEvent, HeartbeatEvent
+from .compact import CompactEvent
+from .binary import EventReader, EventWriter, decode_events, encode_events
 from .utils import CommunicationsProtocol
@@ -13,6 +13,10 @@ from .errors import (
     InvalidKeyFormatError,
     InvalidKeyLengthError,
 )
+from .utils.cipher import SIACipher
+from .utils.response import ResponseTemplate
+
+MAX_RESPONSE_TEMPLATES = 256
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,11 +41,62 @@ class SIAAccount:
         self.account_id = self.account_id.upper()
         self.response_qualifier = self.response_qualifier.upper()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a attribute, a new key also resets the key bytes and the cached cipher."""
+        super().__setattr__(name, value)
+        if name == "key" and "key_b" in self.__dict__:
+            self.key_b = value.encode("utf-8") if value else None
+        elif name == "key_b":
+            self.__dict__.pop("_cipher", None)
+            self.__dict__.pop("_templates", None)
+        elif name == "response_qualifier":
+            self.__dict__.pop("_templates", None)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state for copy and pickle, without the cached objects."""
+        state = self.__dict__.copy()
+        state.pop("_cipher", None)
+        state.pop("_templates", None)
+        return state
+
     @property
     def encrypted(self) -> bool:
         """Return true when encrypted."""
         return bool(self.key_b)
 
+    @property
+    def cipher(self) -> SIACipher | None:
+        """Return the cipher for this account, created once per key."""
+        if not self.key_b:
+            return None
+        cipher = self.__dict__.get("_cipher")
+        if cipher is None:
+            cipher = self.__dict__["_cipher"] = SIACipher(self.key_b)
+        return cipher
+
+    def response_template(
+        self, key: tuple[Any, ...], prefix: str, static: str
+    ) -> ResponseTemplate:
+        """Return the cached response template for key, or create it.
+
+        The key holds the response type and the route, the templates are cleared
+        when the key or response qualifier of the account changes.
+
+        Arguments:
+            key {tuple} -- the key of the template in the cache.
+            prefix {str} -- the part of the response before the sequence.
+            static {str} -- the part of the response after the sequence.
+        """
+        templates = self.__dict__.get("_templates")
+        if templates is None:
+            templates = self.__dict__["_templates"] = {}
+        template = templates.get(key)
+        if template is None:
+            if len(templates) >= MAX_RESPONSE_TEMPLATES:
+                templates.clear()
+            template = templates[key] = ResponseTemplate(prefix, static)
+        return template
+
     @classmethod
     def validate_account(
         cls, account_id: str | None = None, key: str | None = None
@@ -1,5 +1,6 @@
 """Init for aio."""
 from .. import (
+    BatchConfig,
     CommunicationsProtocol,
     InvalidAccountFormatError,
     InvalidAccountLengthError,
@@ -12,4 +13,8 @@ from .. import (
     __license__,
     __version__,
 )
+from ..utils import DispatchPolicy
 from .client import SIAClient
+from .dispatcher import DispatchConfig
+from .multiprocess import SIAMultiProcessClient
+from .parse_pool import ParsePoolConfig
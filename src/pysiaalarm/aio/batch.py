@@ -0,0 +1,70 @@
+"""Task that passes the events to the batch function of the aio client."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from ..batch import BaseBatcher, BatchConfig
+from ..event import SIAEvent
+
+
+class SIAAsyncBatcher(BaseBatcher):
+    """Collects the events of the server and awaits the batch function in its own task."""  # pylint: disable=line-too-long
+
+    def __init__(
+        self,
+        config: BatchConfig,
+        func: Callable[[list[SIAEvent]], Awaitable[None]],
+    ):
+        """Create the batcher, the task is started by start.
+
+        Arguments:
+            config {BatchConfig} -- Size and latency of the batches.
+            func {Callable[[list[SIAEvent]], Awaitable[None]]} -- Wrapped batch function, should not raise.
+        """
+        super().__init__(config)
+        self.func = func
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the task, needs a running loop."""
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="SIABatcher")
+
+    async def stop(self) -> None:
+        """Pass the waiting events to the batch function and stop the task."""
+        if self._task is None or self._wakeup is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def add(self, event: SIAEvent) -> None:
+        """Add a event to the batch, wakes the task when the batch is due."""
+        if self._append(event, time.monotonic()) and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Await the batch function for each batch until stopped."""
+        assert self._wakeup is not None
+        wakeup = self._wakeup
+        while True:
+            if self._ready(time.monotonic()):
+                await self.func(self._take())
+                continue
+            if self._stopping:
+                return
+            wakeup.clear()
+            if not self._events:
+                await wakeup.wait()
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), self._deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                pass
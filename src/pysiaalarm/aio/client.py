@@ -11,8 +11,12 @@ from typing import Any, Type
 
 from ..account import SIAAccount
 from ..base_client import BaseSIAClient
-from ..event import SIAEvent
+from ..batch import BatchConfig
+from ..event import HeartbeatEvent, SIAEvent
 from ..utils import CommunicationsProtocol
+from .batch import SIAAsyncBatcher
+from .dispatcher import DispatchConfig
+from .parse_pool import ParsePoolConfig
 from .server import SIAServerTCP, SIAServerUDP
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,7 +46,12 @@ class SIAClient(BaseSIAClient):
         host: str,
         port: int,
         accounts: list[SIAAccount],
-        function: Callable[[SIAEvent], Awaitable[None]],
+        function: Callable[[SIAEvent], Awaitable[None]] | None,
+        dispatch: DispatchConfig | None = None,
+        parse_pool: ParsePoolConfig | None = None,
+        heartbeat_function: Callable[[HeartbeatEvent], Awaitable[None]] | None = None,
+        batch_function: Callable[[list[SIAEvent]], Awaitable[None]] | None = None,
+        batch: BatchConfig | None = None,
         **kwargs: Any,
     ):
         """Create the asynchronous SIA Client object.
@@ -51,14 +60,70 @@ class SIAClient(BaseSIAClient):
             host {str} -- Host to run the server on, usually would be ""
             port {int} -- The port the server listens to.
             accounts {List[SIAAccount]} -- List of SIA Accounts to add.
-            function {Callable[[SIAEvent], Awaitable[None]]} -- The async function that gets called for each event.  # pylint: disable=line-too-long
+            function {Callable[[SIAEvent], Awaitable[None]]} -- The async function that gets called for each event, can be None when there is a batch_function.  # pylint: disable=line-too-long
             protocol {CommunicationsProtocol Enum} -- CommunicationsProtocol to use, TCP or UDP.
+            dispatch {DispatchConfig} -- Optional, call the function from a pool of workers fed by a bounded queue.  # pylint: disable=line-too-long
+            parse_pool {ParsePoolConfig} -- Optional, parse and decrypt the frames in a pool of processes.  # pylint: disable=line-too-long
+            heartbeat_function {Callable[[HeartbeatEvent], Awaitable[None]]} -- Optional, handle NULL frames with the heartbeat fast path and call this async function for them instead of function.  # pylint: disable=line-too-long
+            batch_function {Callable[[list[SIAEvent]], Awaitable[None]]} -- Optional, the async function that gets called with lists of events from a separate task, as well as function when that is not None.  # pylint: disable=line-too-long
+            batch {BatchConfig} -- Optional, the size and maximum latency of the batches.
 
         """
-        if not inspect.iscoroutinefunction(function):
+        if function is None and batch_function is None:
+            raise ValueError("Use a function, a batch function or both.")
+        if function is not None and not inspect.iscoroutinefunction(function):
             raise TypeError("Function should be a coroutine, create with async def.")
+        if batch_function is not None and not inspect.iscoroutinefunction(
+            batch_function
+        ):
+            raise TypeError(
+                "Batch function should be a coroutine, create with async def."
+            )
         BaseSIAClient.__init__(self, host, port, accounts, self.protocol)
         self._func = function
+        self._dispatch = dispatch
+        self._parse_pool = parse_pool
+        self.heartbeat_function = heartbeat_function
+        self._batch_func = batch_function
+        self._batch = batch
+        self._batcher: SIAAsyncBatcher | None = None
+
+    @property
+    def heartbeat_function(
+        self,
+    ) -> Callable[[HeartbeatEvent], Awaitable[None]] | None:
+        """Return the async function that gets the heartbeats, None when heartbeats are events."""  # pylint: disable=line-too-long
+        return self._heartbeat_func
+
+    @heartbeat_function.setter
+    def heartbeat_function(
+        self, func: Callable[[HeartbeatEvent], Awaitable[None]] | None
+    ) -> None:
+        """Set the async function that gets the heartbeats.
+
+        Args:
+            func (Callable[[HeartbeatEvent], Awaitable[None]] | None): With a function, NULL frames are handled by the heartbeat fast path and passed to this function instead of the function of the client.  # pylint: disable=line-too-long
+
+        Raises:
+            TypeError: If the function is not a coroutine function.
+
+        """
+        if func is not None and not inspect.iscoroutinefunction(func):
+            raise TypeError(
+                "Heartbeat function should be a coroutine, create with async def."
+            )
+        BaseSIAClient.heartbeat_function.fset(self, func)  # type: ignore
+
+    def _configure_server(self) -> None:
+        """Give the server the heartbeat function and the batcher."""
+        assert self.sia_server is not None
+        self.sia_server.heartbeat_func = self._heartbeat_func
+        if self._batch_func is not None:
+            self._batcher = SIAAsyncBatcher(
+                self._batch or BatchConfig(), self.sia_server.async_batch_func_wrap
+            )
+            self.sia_server.async_batch_func = self._batch_func
+            self.sia_server.batcher = self._batcher
 
     async def __aenter__(self, **kwargs: Any) -> SIAClient:
         """Start with as context manager."""
@@ -110,24 +175,34 @@ class SIAClientTCP(SIAClient):
         host: str,
         port: int,
         accounts: list[SIAAccount],
-        function: Callable[[SIAEvent], Awaitable[None]],
+        function: Callable[[SIAEvent], Awaitable[None]] | None,
         **kwargs: Any,
     ) -> None:
         """Create the TCP SIA Client object."""
-        super().__init__(host, port, accounts, function)
+        super().__init__(host, port, accounts, function, **kwargs)
         self.server: asyncio.Server | None = None
         self.sia_server: SIAServerTCP = SIAServerTCP(
-            self._accounts, self._func, self._counts
+            self._accounts,
+            self._func,
+            self._counts,
+            self._dispatch,
+            self._parse_pool,
         )
+        self._configure_server()
 
     async def async_start(self, **kwargs: Any) -> None:
         """Start the asynchronous SIA TCP server.
 
-        The rest of the arguments are passed directly to asyncio.start_server().
+        The rest of the arguments are passed directly to loop.create_server().
         """
         _LOGGER.debug("Starting SIA.")
-        self.server = await asyncio.start_server(
-            self.sia_server.handle_line, self._host, self._port, **kwargs
+        if self._batcher is not None:
+            self._batcher.start()
+        if self.sia_server.dispatcher is not None:
+            self.sia_server.dispatcher.start()
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(
+            self.sia_server.protocol_factory, self._host, self._port, **kwargs
         )
 
     async def async_stop(self) -> None:
@@ -137,8 +212,16 @@ class SIAClientTCP(SIAClient):
             return
         self.sia_server.shutdown_flag = True
         self.server.close()
+        self.sia_server.close_connections()
         await self.server.wait_closed()
         self.server = None
+        await self.sia_server.wait_delivered()
+        if self.sia_server.dispatcher is not None:
+            await self.sia_server.dispatcher.stop()
+        if self._batcher is not None:
+            await self._batcher.stop()
+        if self.sia_server.parse_pool is not None:
+            await self.sia_server.parse_pool.stop()
 
 
 class SIAClientUDP(SIAClient):
@@ -151,14 +234,19 @@ class SIAClientUDP(SIAClient):
         host: str,
         port: int,
         accounts: list[SIAAccount],
-        function: Callable[[SIAEvent], Awaitable[None]],
+        function: Callable[[SIAEvent], Awaitable[None]] | None,
         **kwargs: Any,
     ) -> None:
         """Create the UDP SIA Client object."""
-        super().__init__(host, port, accounts, function)
+        super().__init__(host, port, accounts, function, **kwargs)
         self.sia_server: SIAServerUDP = SIAServerUDP(
-            self._accounts, self._func, self._counts
+            self._accounts,
+            self._func,
+            self._counts,
+            self._dispatch,
+            self._parse_pool,
         )
+        self._configure_server()
         self.transport: asyncio.BaseTransport | None = None
         self.dgprotocol: asyncio.BaseProtocol | None = None
 
@@ -168,6 +256,8 @@ class SIAClientUDP(SIAClient):
         The rest of the arguments are passed directly to create_datagram_endpoint().
         """
         _LOGGER.debug("Starting SIA.")
+        if self._batcher is not None:
+            self._batcher.start()
         loop = asyncio.get_running_loop()
         self.transport, self.dgprotocol = await loop.create_datagram_endpoint(
             lambda: self.sia_server,
@@ -183,3 +273,10 @@ class SIAClientUDP(SIAClient):
             self.transport.close()
             self.transport = None
             self.dgprotocol = None
+        await self.sia_server.wait_delivered()
+        if self.sia_server.dispatcher is not None:
+            await self.sia_server.dispatcher.stop()
+        if self._batcher is not None:
+            await self._batcher.stop()
+        if self.sia_server.parse_pool is not None:
+            await self.sia_server.parse_pool.stop()
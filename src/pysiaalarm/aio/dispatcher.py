@@ -0,0 +1,133 @@
+"""Dispatcher that decouples the user function from responding to the alarm."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from ..event import EventsType
+from ..utils import Counter, DispatchPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class DispatchConfig:
+    """Configuration of the dispatcher.
+
+    Arguments:
+        workers {int} -- Number of worker tasks that call the user function.
+        queue_size {int} -- Maximum number of events waiting for a worker.
+        policy {DispatchPolicy} -- What to do with new events when the queue is full:
+            BLOCK stops reading from the connection until there is room,
+            DROP_OLDEST removes the oldest waiting event,
+            NAK responds with a NAK, so that the alarm sends the event again.
+    """
+
+    workers: int = 4
+    queue_size: int = 1000
+    policy: DispatchPolicy = DispatchPolicy.BLOCK
+
+
+class SIADispatcher:
+    """Bounded queue with worker tasks that call the user function."""
+
+    def __init__(
+        self,
+        func: Callable[[EventsType], Awaitable[None]],
+        counts: Counter,
+        config: DispatchConfig,
+    ):
+        """Create the dispatcher.
+
+        Arguments:
+            func {Callable[[EventsType], Awaitable[None]]} -- Wrapped user function, should not raise.
+            counts {Counter} -- Counter to keep the queue depth and dropped events in.
+            config {DispatchConfig} -- Configuration of the dispatcher.
+        """
+        self.func = func
+        self.counts = counts
+        self.config = config
+        self._queue: asyncio.Queue[EventsType] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._active = 0
+
+    @property
+    def policy(self) -> DispatchPolicy:
+        """Return the overflow policy."""
+        return self.config.policy
+
+    @property
+    def started(self) -> bool:
+        """Return True if the workers are running."""
+        return bool(self._workers)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of events queued or being handled by a worker."""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return self._active + queued
+
+    @property
+    def full(self) -> bool:
+        """Return True if the queue is full."""
+        return self._queue is not None and self._queue.full()
+
+    def start(self) -> None:
+        """Create the queue and start the workers, needs a running loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(self.config.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"SIADispatcher-{i}")
+            for i in range(self.config.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Let the workers handle the queued events and stop them."""
+        if self._queue is not None:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self.counts.set_queue_depth(0)
+
+    async def put(self, event: EventsType) -> None:
+        """Add a event, waiting for room in the queue."""
+        assert self._queue is not None
+        await self._queue.put(event)
+        self.counts.set_queue_depth(self._queue.qsize())
+
+    def put_nowait(self, event: EventsType) -> bool:
+        """Add a event without waiting, returns False when the event was not queued.
+
+        With the DROP_OLDEST policy the oldest event is removed to make room.
+        """
+        assert self._queue is not None
+        if self._queue.full():
+            if self.config.policy != DispatchPolicy.DROP_OLDEST:
+                return False
+            dropped = self._queue.get_nowait()
+            self._queue.task_done()
+            self.counts.increment_dropped_events()
+            _LOGGER.warning("Dispatch queue full, dropped event: %s", dropped)
+        self._queue.put_nowait(event)
+        self.counts.set_queue_depth(self._queue.qsize())
+        return True
+
+    async def _worker(self) -> None:
+        """Call the user function for queued events."""
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            event = await queue.get()
+            self.counts.set_queue_depth(queue.qsize())
+            self._active += 1
+            try:
+                await self.func(event)
+            finally:
+                self._active -= 1
+                queue.task_done()
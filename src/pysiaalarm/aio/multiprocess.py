@@ -0,0 +1,248 @@
+"""Multi process SIA Client, with a worker process per core on the same port."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from multiprocessing.synchronize import Event, Semaphore
+from types import TracebackType
+from typing import Any, Type
+
+from ..account import SIAAccount
+from ..base_client import BaseSIAClient
+from ..event import SIAEvent
+from ..utils import CommunicationsProtocol, Counter, SharedCounts
+from .client import SIAClient
+from .dispatcher import DispatchConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _WorkerConfig:
+    """Settings that are passed to each worker process."""
+
+    host: str
+    port: int
+    accounts: list[SIAAccount]
+    function: Callable[[SIAEvent], Awaitable[None]]
+    protocol: CommunicationsProtocol
+    dispatch: DispatchConfig | None
+    lazy_events: bool
+    flush_interval: float
+
+
+def _run_worker(
+    index: int,
+    config: _WorkerConfig,
+    shared: SharedCounts,
+    stop: Event,
+    ready: Semaphore,
+) -> None:
+    """Run the event loop of a worker process, stopping is done by the parent."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve(index, config, shared, stop, ready))
+
+
+async def _serve(
+    index: int,
+    config: _WorkerConfig,
+    shared: SharedCounts,
+    stop: Event,
+    ready: Semaphore,
+) -> None:
+    """Serve on the shared port until stopped, storing the counts periodically."""
+    client = SIAClient(
+        config.host,
+        config.port,
+        config.accounts,
+        config.function,
+        protocol=config.protocol,
+        dispatch=config.dispatch,
+    )
+    client.lazy_events = config.lazy_events
+    await client.async_start(reuse_port=True)
+    ready.release()
+    try:
+        while not stop.is_set():
+            shared.store(index, client.counts)
+            await asyncio.sleep(config.flush_interval)
+    finally:
+        await client.async_stop()
+        shared.store(index, client.counts)
+
+
+class SIAMultiProcessClient(BaseSIAClient):
+    """Class for a SIA Client that runs the asynchronous client in worker processes.
+
+    Each worker has its own event loop and binds its own socket to the same port
+    with SO_REUSEPORT, so the kernel spreads the connections or datagrams over
+    the workers. The counts of the workers are kept in shared memory and added
+    up by the counts property, while the workers run the counts can lag by up
+    to flush_interval seconds.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        accounts: list[SIAAccount],
+        function: Callable[[SIAEvent], Awaitable[None]],
+        protocol: CommunicationsProtocol = CommunicationsProtocol.TCP,
+        workers: int | None = None,
+        dispatch: DispatchConfig | None = None,
+        flush_interval: float = 0.5,
+        start_method: str | None = None,
+    ):
+        """Create the multi process SIA Client object.
+
+        Arguments:
+            host {str} -- Host to run the server on, usually would be ""
+            port {int} -- The port the workers listen to, can not be 0.
+            accounts {List[SIAAccount]} -- List of SIA Accounts to add.
+            function {Callable[[SIAEvent], Awaitable[None]]} -- The async function that gets called for each event, in the worker process.  # pylint: disable=line-too-long
+            protocol {CommunicationsProtocol Enum} -- CommunicationsProtocol to use, TCP or UDP.
+            workers {int} -- Number of worker processes, the number of cores by default.
+            dispatch {DispatchConfig} -- Optional, dispatch config used by each worker.
+            flush_interval {float} -- Seconds between storing the counts of a worker.
+            start_method {str} -- multiprocessing start method, with spawn the function and accounts are pickled.  # pylint: disable=line-too-long
+
+        """
+        if not inspect.iscoroutinefunction(function):
+            raise TypeError("Function should be a coroutine, create with async def.")
+        BaseSIAClient.__init__(self, host, port, accounts, protocol)
+        self._func = function
+        self._dispatch = dispatch
+        self.workers = workers or os.cpu_count() or 1
+        self.flush_interval = flush_interval
+        self._context = multiprocessing.get_context(start_method)
+        self._shared: SharedCounts | None = None
+        self._stop: Event | None = None
+        self._processes: list[BaseProcess] = []
+
+    @property
+    def counts(self) -> Counter:
+        """Return the counts of all workers added up, these can lag by up to flush_interval."""  # pylint: disable=line-too-long
+        if self._shared is None:
+            return self._counts
+        return self._shared.total()
+
+    def worker_counts(self) -> list[Counter]:
+        """Return the counts of each worker, these can lag by up to flush_interval."""
+        if self._shared is None:
+            return []
+        return [self._shared.worker(index) for index in range(self.workers)]
+
+    def __enter__(self) -> SIAMultiProcessClient:
+        """Start with as context manager."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        """End as context manager."""
+        self.stop()
+        return None
+
+    async def __aenter__(self) -> SIAMultiProcessClient:
+        """Start with as async context manager."""
+        await self.async_start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_val: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        """End as async context manager."""
+        await self.async_stop()
+        return None
+
+    def start(self, timeout: float = 10.0) -> None:
+        """Start the worker processes and wait until they all listen.
+
+        Arguments:
+            timeout {float} -- Seconds to wait for the workers to listen.
+
+        """
+        if self._processes:
+            return
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise OSError("SO_REUSEPORT is not available on this platform.")
+        _LOGGER.debug("Starting SIA with %s workers.", self.workers)
+        config = _WorkerConfig(
+            self._host,
+            self._port,
+            self.accounts,
+            self._func,
+            self.protocol,
+            self._dispatch,
+            self.lazy_events,
+            self.flush_interval,
+        )
+        self._shared = SharedCounts(self.workers, self._context)
+        self._stop = self._context.Event()
+        ready = self._context.Semaphore(0)
+        for index in range(self.workers):
+            process = self._context.Process(
+                target=_run_worker,
+                args=(index, config, self._shared, self._stop, ready),
+                name=f"sia-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        started = 0
+        while started < self.workers:
+            if ready.acquire(timeout=0.05):
+                started += 1
+                continue
+            failed = [p for p in self._processes if p.exitcode is not None]
+            if failed or time.monotonic() >= deadline:
+                self.stop()
+                raise RuntimeError(
+                    f"{len(failed)} SIA workers exited and {self.workers - started} did not start listening on port {self._port}."  # pylint: disable=line-too-long
+                )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker processes, the counts stay available.
+
+        Arguments:
+            timeout {float} -- Seconds to wait for the workers to finish the open events.
+
+        """
+        if not self._processes:
+            return
+        _LOGGER.debug("Stopping SIA workers.")
+        if self._stop is not None:
+            self._stop.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = []
+
+    async def async_start(self, timeout: float = 10.0) -> None:
+        """Start the worker processes without blocking the event loop."""
+        await asyncio.to_thread(self.start, timeout)
+
+    async def async_stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker processes without blocking the event loop."""
+        await asyncio.to_thread(self.stop, timeout)
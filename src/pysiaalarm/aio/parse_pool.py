@@ -0,0 +1,251 @@
+"""Pool of processes that parse and decrypt frames outside of the event loop."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..account import SIAAccount
+from ..base_server import BaseSIAServer, _text
+from ..binary import decode_events, encode_events
+from ..const import COUNTER_ACCOUNT, COUNTER_EVENTS, COUNTER_FORMAT
+from ..errors import EventFormatError, NoAccountError
+from ..event import EventsType, NAKEvent, SIAEvent, _strip_bounds
+from ..utils import dedupe_key
+from ..utils.dedupe import DedupeKey
+
+_LOGGER = logging.getLogger(__name__)
+
+# Kinds of parsed frames.
+FRAME_EMPTY = 0
+FRAME_EVENT = 1
+FRAME_NO_ACCOUNT = 2
+FRAME_FORMAT = 3
+
+# The kind of a frame with the response for events, or the error message.
+ParsedFrame = tuple[int, Optional[bytes], Optional[str]]
+
+_worker_accounts: dict[str, SIAAccount] = {}
+
+
+@dataclass
+class ParsePoolConfig:
+    """Configuration of the parse pool.
+
+    Arguments:
+        workers {int} -- Number of worker processes.
+        max_batch {int} -- Maximum number of frames sent to a worker at once,
+            the frames received in one round trip are split over the workers.
+        start_method {str} -- multiprocessing start method, the default when None.
+    """
+
+    workers: int = 2
+    max_batch: int = 256
+    start_method: str | None = None
+
+
+def _line(frame: bytes) -> str:
+    """Decode a frame without leading and trailing whitespace for logging."""
+    start, end = _strip_bounds(frame)
+    return _text(memoryview(frame)[start:end])
+
+
+def _init_worker(accounts: dict[str, SIAAccount]) -> None:
+    """Keep the accounts in the worker process."""
+    global _worker_accounts  # pylint: disable=global-statement
+    _worker_accounts = accounts
+
+
+def parse_frames(frames: list[bytes]) -> tuple[list[ParsedFrame], bytes]:
+    """Parse and decrypt frames and create their responses, in a worker process.
+
+    Returns the kind of each frame with the response or error message, and the
+    events of the frames of kind FRAME_EVENT in the compact binary format.
+    """
+    parsed: list[ParsedFrame] = []
+    events: list[EventsType] = []
+    for frame in frames:
+        start, end = _strip_bounds(frame)
+        if start == end:
+            parsed.append((FRAME_EMPTY, None, None))
+            continue
+        try:
+            event = SIAEvent._from_bytes(  # pylint: disable=protected-access
+                frame, start, end, _worker_accounts
+            )
+        except NoAccountError as exc:
+            parsed.append((FRAME_NO_ACCOUNT, None, str(exc)))
+            continue
+        except EventFormatError as exc:
+            parsed.append((FRAME_FORMAT, None, exc.args[0]))
+            continue
+        events.append(event)
+        parsed.append((FRAME_EVENT, event.create_response(), None))
+    return parsed, encode_events(events)
+
+
+class SIAParsePool:
+    """Process pool that parses frames, the event loop only counts and responds.
+
+    The workers keep a copy of the accounts, when the accounts of the server
+    or a attribute of a account change, the pool is started again. Events are
+    sent back in the compact binary format and get their account from the server.
+    """
+
+    @staticmethod
+    def _snapshot(accounts: dict[str, SIAAccount]) -> tuple[tuple[Any, ...], ...]:
+        """Return the attributes of the accounts that the workers use."""
+        return tuple(
+            (
+                name,
+                account.account_id,
+                account.key,
+                account.allowed_timeband,
+                account.device_timezone,
+                account.response_qualifier,
+            )
+            for name, account in accounts.items()
+        )
+
+    def __init__(self, config: ParsePoolConfig):
+        """Create the parse pool, the processes are started on first use."""
+        self.config = config
+        self._executor: ProcessPoolExecutor | None = None
+        self._accounts: tuple[tuple[Any, ...], ...] | None = None
+
+    def _get_executor(self, accounts: dict[str, SIAAccount]) -> ProcessPoolExecutor:
+        """Return the executor for the accounts, start it if needed."""
+        snapshot = self._snapshot(accounts)
+        if self._executor is not None and snapshot == self._accounts:
+            return self._executor
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        _LOGGER.debug("Starting %s parse workers.", self.config.workers)
+        self._executor = ProcessPoolExecutor(
+            self.config.workers,
+            mp_context=multiprocessing.get_context(self.config.start_method),
+            initializer=_init_worker,
+            initargs=(accounts,),
+        )
+        self._accounts = snapshot
+        return self._executor
+
+    async def parse(
+        self, server: BaseSIAServer, frames: list[bytes]
+    ) -> list[tuple[EventsType, bytes] | None]:
+        """Parse the frames for the server, returns the checked event and response per frame.
+
+        Empty frames give None, frames that could not be parsed a NAKEvent. Frames
+        that are in the dedupe cache of the server and heartbeats handled by the
+        fast path are not sent to the workers, when a frame is sent again in the
+        same batch, the frames before it are parsed first, so that it is found
+        in the cache.
+        """
+        if server.dedupe is None:
+            return await self._parse_segment(server, frames)
+        results: list[tuple[EventsType, bytes] | None] = []
+        start = 0
+        while start < len(frames):
+            seen: set[DedupeKey] = set()
+            end = start
+            while end < len(frames):
+                first, last = _strip_bounds(frames[end])
+                key = dedupe_key(memoryview(frames[end])[first:last])
+                if key in seen:
+                    break
+                if key is not None:
+                    seen.add(key)
+                end += 1
+            results.extend(await self._parse_segment(server, frames[start:end]))
+            start = end
+        return results
+
+    async def _parse_segment(
+        self, server: BaseSIAServer, frames: list[bytes]
+    ) -> list[tuple[EventsType, bytes] | None]:
+        """Parse frames that are not sent twice, the frames in the cache are not sent to the workers."""  # pylint: disable=line-too-long
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        results: list[tuple[EventsType, bytes] | None] = [None] * len(frames)
+        keys: list[DedupeKey | None] = [None] * len(frames)
+        pending: list[int] = []
+        for index, frame in enumerate(frames):
+            start, end = _strip_bounds(frame)
+            if start == end:
+                continue
+            if debug:
+                server.log_and_count(COUNTER_EVENTS, line=_line(frame))
+            else:
+                server.log_and_count(COUNTER_EVENTS)
+            keys[index], duplicate = server.find_duplicate(memoryview(frame)[start:end])
+            if duplicate is not None:
+                results[index] = (duplicate, duplicate.create_response())
+                continue
+            heartbeat = server.parse_heartbeat(frame, start, end)
+            if heartbeat is not None:
+                server.remember(keys[index], heartbeat)
+                results[index] = (heartbeat, heartbeat.create_response())
+                continue
+            pending.append(index)
+        if not pending:
+            return results
+
+        executor = self._get_executor(server.accounts)
+        loop = asyncio.get_running_loop()
+        size = self.config.max_batch
+        batches = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    parse_frames,
+                    [frames[index] for index in pending[i : i + size]],
+                )
+                for i in range(0, len(pending), size)
+            )
+        )
+        indexes = iter(pending)
+        for parsed, encoded in batches:
+            events = iter(decode_events(encoded))
+            for kind, response, message in parsed:
+                index = next(indexes)
+                frame = frames[index]
+                if kind == FRAME_EMPTY:
+                    continue  # pragma: no cover
+                if kind == FRAME_EVENT:
+                    event, response = self._checked(server, next(events), response)
+                    results[index] = (server.remember(keys[index], event), response)
+                    continue
+                if kind == FRAME_NO_ACCOUNT:
+                    server.log_and_count(
+                        COUNTER_ACCOUNT, _line(frame), exception=NoAccountError(message)
+                    )
+                else:
+                    server.log_and_count(
+                        COUNTER_FORMAT,
+                        _line(frame),
+                        exception=EventFormatError(message),
+                    )
+                nak = NAKEvent()
+                results[index] = (nak, nak.create_response())
+        return results
+
+    @staticmethod
+    def _checked(
+        server: BaseSIAServer, event: EventsType, response: bytes | None
+    ) -> tuple[EventsType, bytes]:
+        """Give the event its account from the server and count its problems."""
+        assert isinstance(event, SIAEvent) and response is not None
+        if server.accounts and event.account:
+            event.sia_account = server.accounts.get(
+                event.account, None
+            ) or server.accounts.get("", None)
+        return server.check_event(event), response
+
+    async def stop(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, True)
@@ -3,15 +3,18 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import deque
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 from .. import __author__, __copyright__, __license__, __version__
 from ..account import SIAAccount
 from ..base_server import BaseSIAServer
-from ..const import EMPTY_BYTES
-from ..event import SIAEvent
-from ..utils import Counter
+from ..const import COUNTER_DROPPED, EMPTY_BYTES
+from ..event import EventsType, NAKEvent, SIAEvent
+from ..utils import Counter, DispatchPolicy, SIAFramer
+from .dispatcher import DispatchConfig, SIADispatcher
+from .parse_pool import ParsePoolConfig, SIAParsePool
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,8 +25,10 @@ class SIAServerTCP(BaseSIAServer):
     def __init__(
         self,
         accounts: dict[str, SIAAccount],
-        func: Callable[[SIAEvent], Awaitable[None]],
+        func: Callable[[SIAEvent], Awaitable[None]] | None,
         counts: Counter,
+        dispatch: DispatchConfig | None = None,
+        parse_pool: ParsePoolConfig | None = None,
     ):
         """Create a SIA TCP Server.
 
@@ -31,19 +36,112 @@ class SIAServerTCP(BaseSIAServer):
             accounts Dict[str, SIAAccount] -- accounts as dict with account_id as key, SIAAccount object as value.  # pylint: disable=line-too-long
             func Callable[[SIAEvent], None] -- Function called for each valid SIA event, that can be matched to a account.  # pylint: disable=line-too-long
             counts Counter -- counter kept by client to give insights in how many errorous events were discarded of each type.  # pylint: disable=line-too-long
+            dispatch DispatchConfig -- when set, events are passed to the function by a pool of workers, instead of by the connection.  # pylint: disable=line-too-long
+            parse_pool ParsePoolConfig -- when set, frames are parsed and decrypted by a pool of processes.  # pylint: disable=line-too-long
         """
         BaseSIAServer.__init__(self, accounts, counts, async_func=func)
+        self.connections: set[SIAConnectionTCP] = set()
+        self.delivery_tasks: set[asyncio.Task[None]] = set()
+        self.dispatcher = (
+            SIADispatcher(self.async_func_wrap, counts, dispatch) if dispatch else None
+        )
+        self.parse_pool = SIAParsePool(parse_pool) if parse_pool else None
+
+    def protocol_factory(self) -> SIAConnectionTCP:
+        """Create the protocol for a new connection, used with loop.create_server()."""
+        return SIAConnectionTCP(self)
+
+    def close_connections(self) -> None:
+        """Close all open connections."""
+        for connection in list(self.connections):
+            connection.close()
+
+    async def wait_delivered(self) -> None:
+        """Wait until the connections have delivered all received events."""
+        while self.delivery_tasks:
+            await asyncio.gather(*self.delivery_tasks, return_exceptions=True)
+
+    def process_data(
+        self, framer: SIAFramer, data: bytes
+    ) -> tuple[list[bytes], list[EventsType]]:
+        """Parse all complete frames in data and create the responses, in order.
+
+        When the dispatcher does not block, events are queued right away, the
+        events that still have to be delivered are returned with the responses.
+
+        Arguments:
+            framer {SIAFramer} -- The framer of the connection.
+            data {bytes} -- The data received on the connection.
+
+        """
+        responses = []
+        events: list[EventsType] = []
+        for frame in framer.feed(data):
+            event = self.parse_and_check_event(frame)
+            if not event:
+                continue
+            response = self.accept(event, events).create_response()
+            _LOGGER.debug("Outgoing line: %s", response)
+            responses.append(response)
+        return responses, events
+
+    async def process_frames(
+        self, frames: list[bytes]
+    ) -> tuple[list[bytes], list[EventsType]]:
+        """Parse the frames in the parse pool and create the responses, in order.
+
+        Arguments:
+            frames {list[bytes]} -- The frames received on a connection in one round trip.
+
+        """
+        assert self.parse_pool is not None
+        responses = []
+        events: list[EventsType] = []
+        for result in await self.parse_pool.parse(self, frames):
+            if result is None:
+                continue
+            event, response = result
+            accepted = self.accept(event, events)
+            if accepted is not event:
+                response = accepted.create_response()
+            _LOGGER.debug("Outgoing line: %s", response)
+            responses.append(response)
+        return responses, events
+
+    def accept(self, event: EventsType, events: list[EventsType]) -> EventsType:
+        """Queue the event or add it to events to deliver, returns the event to respond to.
+
+        When the dispatcher does not block and the queue is full, a NAKEvent is returned.
+        """
+        _LOGGER.debug("Incoming event: %s", event)
+        dispatcher = self.dispatcher
+        if dispatcher is None or dispatcher.policy == DispatchPolicy.BLOCK:
+            events.append(event)
+        elif self.deliverable(event) and not dispatcher.put_nowait(event):
+            self.log_and_count(COUNTER_DROPPED, event=event)
+            return NAKEvent()
+        return event
+
+    async def deliver(self, event: EventsType) -> None:
+        """Pass a event to the dispatcher or call the user function directly."""
+        if self.dispatcher is None:
+            await self.async_func_wrap(event)
+        elif self.deliverable(event):
+            await self.dispatcher.put(event)
 
     async def handle_line(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ) -> None:
         """Handle line for SIA Events. This supports TCP connections.
 
+        Kept for use with asyncio.start_server(), the client uses the protocol_factory.
+
         Arguments:
             reader {asyncio.StreamReader} -- StreamReader with new data.
             writer {asyncio.StreamWriter} -- StreamWriter to respond.
 
         """
+        framer = SIAFramer()
         try:
             while not self.shutdown_flag:  # pragma: no cover  # type: ignore
                 try:
@@ -52,28 +150,137 @@ class SIAServerTCP(BaseSIAServer):
                     break
                 if data == EMPTY_BYTES or reader.at_eof():
                     break
-                event = self.parse_and_check_event(data)
-                if not event:
+                responses, events = self.process_data(framer, data)
+                if not responses:
                     continue
-                _LOGGER.debug("Incoming event: %s", event)
-                response = event.create_response()
-                _LOGGER.debug("Outgoing line: %s", response)
-                writer.write(response)
+                writer.writelines(responses)
                 await writer.drain()
-                await self.async_func_wrap(event)
+                for event in events:
+                    await self.deliver(event)
         finally:
             writer.close()
             await writer.wait_closed()
 
 
+class SIAConnectionTCP(asyncio.Protocol):
+    """Protocol for a single connection to the SIA TCP Server.
+
+    All frames in received data are answered right away and in order,
+    the events are then delivered in order as well, while that is running,
+    reading from the connection is paused. Without a dispatcher this calls
+    the user function, with a blocking dispatcher it waits for room in the queue.
+    """
+
+    def __init__(self, server: SIAServerTCP):
+        """Create the connection for a server."""
+        self.server = server
+        self.framer = SIAFramer()
+        self.transport: asyncio.Transport | None = None
+        self._pending: deque[EventsType] = deque()
+        self._callback_task: asyncio.Task[None] | None = None
+        self._frames: list[bytes] = []
+        self._parse_task: asyncio.Task[None] | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport of the new connection."""
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        self.server.connections.add(self)
+
+    def data_received(self, data: bytes) -> None:
+        """Parse and respond to the frames in data and schedule the user function."""
+        if self.transport is None:
+            return  # pragma: no cover
+        if self.server.shutdown_flag:
+            self.close()
+            return
+        if self.server.parse_pool is not None:
+            self._frames.extend(bytes(frame) for frame in self.framer.feed(data))
+            self._start_parse()
+            return
+        responses, events = self.server.process_data(self.framer, data)
+        if responses:
+            self.transport.writelines(responses)
+        if events:
+            self._pending.extend(events)
+            if self._callback_task is None:
+                self.transport.pause_reading()
+                self._callback_task = asyncio.create_task(self._run_callbacks())
+                self.server.delivery_tasks.add(self._callback_task)
+                self._callback_task.add_done_callback(
+                    self.server.delivery_tasks.discard
+                )
+
+    def _start_parse(self) -> None:
+        """Start parsing the received frames, if that is not running already.
+
+        Frames received while a batch is parsed form the next batch, when a
+        full batch is waiting, reading is paused.
+        """
+        assert self.server.parse_pool is not None and self.transport is not None
+        if not self._frames:
+            return
+        if len(self._frames) >= self.server.parse_pool.config.max_batch:
+            self.transport.pause_reading()
+        if self._parse_task is None:
+            self._parse_task = asyncio.create_task(self._run_parse())
+            self.server.delivery_tasks.add(self._parse_task)
+            self._parse_task.add_done_callback(self.server.delivery_tasks.discard)
+
+    async def _run_parse(self) -> None:
+        """Parse the waiting frames, respond and deliver the events, batch by batch."""
+        try:
+            while self._frames:
+                frames, self._frames = self._frames, []
+                responses, events = await self.server.process_frames(frames)
+                if responses and self.transport is not None:
+                    self.transport.writelines(responses)
+                for event in events:
+                    await self.server.deliver(event)
+        finally:
+            self._parse_task = None
+            if self.transport is not None and not self.transport.is_closing():
+                self.transport.resume_reading()
+
+    async def _run_callbacks(self) -> None:
+        """Deliver the pending events, in order."""
+        try:
+            while self._pending:
+                await self.server.deliver(self._pending.popleft())
+        finally:
+            self._callback_task = None
+            if self.transport is not None and not self.transport.is_closing():
+                self.transport.resume_reading()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Clean up when the connection is closed."""
+        self.server.connections.discard(self)
+        self.framer.clear()
+        self.transport = None
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self.transport is not None:
+            self.transport.close()
+
+
 class SIAServerUDP(BaseSIAServer, asyncio.DatagramProtocol):
-    """Class for SIA UDP Server Async."""
+    """Class for SIA UDP Server Async.
+
+    Every datagram is answered right away. Without a dispatch config the user
+    function is called in a task per event, the tasks are kept in
+    delivery_tasks until they are done. With a dispatch config the events are
+    passed to the user function by a dispatcher, so the number of running
+    functions and waiting events is bounded.
+    """
 
     def __init__(
         self,
         accounts: dict[str, SIAAccount],
-        func: Callable[[SIAEvent], Awaitable[None]],
+        func: Callable[[SIAEvent], Awaitable[None]] | None,
         counts: Counter,
+        dispatch: DispatchConfig | None = None,
+        parse_pool: ParsePoolConfig | None = None,
     ):
         """Create a SIA UDP Server.
 
@@ -82,25 +289,121 @@ class SIAServerUDP(BaseSIAServer, asyncio.DatagramProtocol):
             accounts {Dict[str, SIAAccount]} -- accounts as dict with account_id as key, SIAAccount object as value.  # pylint: disable=line-too-long
             func {Callable[[SIAEvent], None]} -- Function called for each valid SIA event, that can be matched to a account.  # pylint: disable=line-too-long
             counts {Counter} -- counter kept by client to give insights in how many errorous events were discarded of each type.  # pylint: disable=line-too-long
+            dispatch {DispatchConfig} -- when set, the concurrency limit, queue size and policy for passing events to the function.  # pylint: disable=line-too-long
+            parse_pool {ParsePoolConfig} -- when set, datagrams are parsed and decrypted by a pool of processes.  # pylint: disable=line-too-long
         """
         BaseSIAServer.__init__(self, accounts, counts, async_func=func)
         self.transport: asyncio.DatagramTransport | None = None
+        self.delivery_tasks: set[asyncio.Task[None]] = set()
+        self.dispatcher = (
+            SIADispatcher(self.async_func_wrap, counts, dispatch) if dispatch else None
+        )
+        self._blocked: deque[EventsType] = deque()
+        self._unblock_task: asyncio.Task[None] | None = None
+        self.parse_pool = SIAParsePool(parse_pool) if parse_pool else None
+        self._datagrams: list[tuple[bytes, tuple[str, int]]] = []
+        self._parse_task: asyncio.Task[None] | None = None
 
     def connection_made(self, transport: asyncio.BaseTransport) -> None:
         """Connect callback for datagrams."""
         assert isinstance(transport, asyncio.DatagramTransport)
         self.transport = transport
+        if self.dispatcher is not None:
+            self.dispatcher.start()
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
         """Receive and process datagrams. This support UDP connections."""
         if self.shutdown_flag:  # type: ignore
             return
+        if self.parse_pool is not None:
+            self._datagrams.append((data, addr))
+            if self._parse_task is None:
+                self._parse_task = asyncio.create_task(self._run_parse())
+            return
         event = self.parse_and_check_event(data)
         if not event:
             return
+        self.respond(event, None, addr)
+
+    def respond(
+        self, event: EventsType, response: bytes | None, addr: tuple[str, int]
+    ) -> None:
+        """Pass the event to the user function and send the response to addr."""
+        if self.deliverable(event) and not self.dispatch(event):
+            self.log_and_count(COUNTER_DROPPED, event=event)
+            event = NAKEvent()
+            response = None
         if self.transport is not None:
-            self.transport.sendto(event.create_response(), addr)
-        asyncio.create_task(self.async_func_wrap(event))
+            self.transport.sendto(response or event.create_response(), addr)
+
+    async def _run_parse(self) -> None:
+        """Parse the waiting datagrams in the parse pool and respond, batch by batch."""
+        assert self.parse_pool is not None
+        try:
+            while self._datagrams:
+                datagrams, self._datagrams = self._datagrams, []
+                results = await self.parse_pool.parse(
+                    self, [data for data, _ in datagrams]
+                )
+                for (_, addr), result in zip(datagrams, results):
+                    if result is not None:
+                        self.respond(result[0], result[1], addr)
+        finally:
+            self._parse_task = None
+
+    def dispatch(self, event: EventsType) -> bool:
+        """Pass the event to the dispatcher, returns False if it was not accepted.
+
+        Without a dispatcher, a task is created that calls the user function.
+        With the BLOCK policy and a full queue, the event is kept and reading
+        from the socket is paused until the queue has room again, datagrams
+        that arrive before reading is paused are kept up to the queue size,
+        after that they are not accepted.
+        """
+        dispatcher = self.dispatcher
+        if dispatcher is None:
+            task = asyncio.create_task(self.async_func_wrap(event))
+            self.delivery_tasks.add(task)
+            task.add_done_callback(self.delivery_tasks.discard)
+            return True
+        if not dispatcher.started:
+            dispatcher.start()
+        if dispatcher.policy != DispatchPolicy.BLOCK:
+            return dispatcher.put_nowait(event)
+        if not self._blocked and dispatcher.put_nowait(event):
+            return True
+        if len(self._blocked) >= dispatcher.config.queue_size:
+            return False
+        self._blocked.append(event)
+        if self._unblock_task is None:
+            pause_reading = getattr(self.transport, "pause_reading", None)
+            if pause_reading is not None:
+                pause_reading()
+            self._unblock_task = asyncio.create_task(self._unblock())
+        return True
+
+    async def _unblock(self) -> None:
+        """Move the blocked events to the queue and resume reading."""
+        assert self.dispatcher is not None
+        try:
+            while self._blocked:
+                await self.dispatcher.put(self._blocked.popleft())
+        finally:
+            self._unblock_task = None
+            transport = self.transport
+            if transport is not None and not transport.is_closing():
+                resume_reading = getattr(transport, "resume_reading", None)
+                if resume_reading is not None:
+                    resume_reading()
+
+    async def wait_delivered(self) -> None:
+        """Wait until all received datagrams are parsed and their events are passed to the function or the dispatcher."""  # pylint: disable=line-too-long
+        if self._parse_task is not None:
+            await asyncio.gather(self._parse_task, return_exceptions=True)
+        if self._unblock_task is not None:
+            await asyncio.gather(self._unblock_task, return_exceptions=True)
+        while self.delivery_tasks:
+            await asyncio.gather(*self.delivery_tasks, return_exceptions=True)
 
     def connection_lost(self, _: Any) -> None:
         """Close and reset transport when connection lost."""
@@ -2,10 +2,13 @@
 from __future__ import annotations
 
 from abc import ABC
+from collections.abc import Callable
+from typing import Any
 
 from .account import SIAAccount
 from .base_server import BaseSIAServer
-from .utils import CommunicationsProtocol, Counter
+from .event import HeartbeatEvent
+from .utils import CommunicationsProtocol, Counter, DedupeCache
 
 
 class BaseSIAClient(ABC):
@@ -37,6 +40,9 @@ class BaseSIAClient(ABC):
         self.accounts = accounts
 
         self._counts = Counter()
+        self._lazy_events = False
+        self._dedupe: DedupeCache | None = None
+        self._heartbeat_func: Callable[[HeartbeatEvent], Any] | None = None
 
     @property
     def accounts(self) -> list[SIAAccount]:
@@ -64,3 +70,54 @@ class BaseSIAClient(ABC):
     def counts(self) -> Counter:
         """Return the counts object."""
         return self._counts
+
+    @property
+    def lazy_events(self) -> bool:
+        """Return True if the content of events is parsed when it is first used."""
+        return self._lazy_events
+
+    @lazy_events.setter
+    def lazy_events(self, lazy: bool) -> None:
+        """Set lazy events, only the fields needed for the response are parsed right away.
+
+        Args:
+            lazy (bool): True to create LazySIAEvents.
+
+        """
+        self._lazy_events = lazy
+        if self.sia_server:
+            self.sia_server.lazy_events = lazy
+
+    @property
+    def dedupe(self) -> DedupeCache | None:
+        """Return the cache of answered frames, None when frames sent again are parsed again."""  # pylint: disable=line-too-long
+        return self._dedupe
+
+    @dedupe.setter
+    def dedupe(self, cache: DedupeCache | None) -> None:
+        """Set the cache of answered frames.
+
+        Args:
+            cache (DedupeCache | None): Frames with the same account, sequence and CRC as a frame in the cache are answered again, without parsing them or calling the function.  # pylint: disable=line-too-long
+
+        """
+        self._dedupe = cache
+        if self.sia_server:
+            self.sia_server.dedupe = cache
+
+    @property
+    def heartbeat_function(self) -> Callable[[HeartbeatEvent], Any] | None:
+        """Return the function that gets the heartbeats, None when heartbeats are events."""  # pylint: disable=line-too-long
+        return self._heartbeat_func
+
+    @heartbeat_function.setter
+    def heartbeat_function(self, func: Callable[[HeartbeatEvent], Any] | None) -> None:
+        """Set the function that gets the heartbeats.
+
+        Args:
+            func (Callable[[HeartbeatEvent], Any] | None): With a function, NULL frames are handled by the heartbeat fast path and passed to this function instead of the function of the client.  # pylint: disable=line-too-long
+
+        """
+        self._heartbeat_func = func
+        if self.sia_server:
+            self.sia_server.heartbeat_func = func
@@ -4,24 +4,44 @@ from __future__ import annotations
 import logging
 from abc import ABC
 from collections.abc import Awaitable, Callable
+from typing import Any, TypeGuard
 
 from .account import SIAAccount
+from .batch import BaseBatcher
 from .const import (
     COUNTER_ACCOUNT,
     COUNTER_CODE,
     COUNTER_CRC,
+    COUNTER_DEDUPE_HIT,
+    COUNTER_DROPPED,
     COUNTER_EVENTS,
     COUNTER_FORMAT,
+    COUNTER_HEARTBEAT,
     COUNTER_TIMESTAMP,
     COUNTER_USER_CODE,
 )
 from .errors import EventFormatError, NoAccountError
-from .event import NAKEvent, OHEvent, SIAEvent, EventsType
-from .utils import Counter, ResponseType
+from .event import (
+    DuplicateEvent,
+    EventsType,
+    HeartbeatEvent,
+    LazySIAEvent,
+    NAKEvent,
+    OHEvent,
+    SIAEvent,
+    _strip_bounds,
+)
+from .utils import Counter, DedupeCache, ResponseType, dedupe_key
+from .utils.dedupe import DedupeKey
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _text(line: memoryview) -> str:
+    """Decode a line for logging."""
+    return str(line, "ascii", "ignore")
+
+
 class BaseSIAServer(ABC):
     """Base class for SIA Server."""
 
@@ -44,31 +64,109 @@ class BaseSIAServer(ABC):
         self.async_func = async_func
         self.counts = counts
         self.shutdown_flag = False
+        self.lazy_events = False
+        self.dedupe: DedupeCache | None = None
+        self.heartbeat_func: Callable[[HeartbeatEvent], Any] | None = None
+        self.batch_func: Callable[[list[SIAEvent]], None] | None = None
+        self.async_batch_func: Callable[[list[SIAEvent]], Awaitable[None]] | None = None
+        self.batcher: BaseBatcher | None = None
 
-    def parse_and_check_event(self, data: bytes) -> EventsType | None:
+    def parse_and_check_event(self, data: bytes | memoryview) -> EventsType | None:
         """Parse and check the line and create the event, check the account and define the response.
 
         Args:
-            line (str): Line to parse
+            data (bytes | memoryview): Line to parse
 
         Returns:
             SIAEvent: The SIAEvent type of the parsed line.
             ResponseType: The response to send to the alarm.
 
         """
-        line = str.strip(data.decode("ascii", errors="ignore"))
-        if not line:
+        start, end = _strip_bounds(data)
+        if start == end:
             return None
-        self.log_and_count(COUNTER_EVENTS, line=line)
+        line = memoryview(data)[start:end]
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            self.log_and_count(COUNTER_EVENTS, line=_text(line))
+        else:
+            self.log_and_count(COUNTER_EVENTS)
+        key, duplicate = self.find_duplicate(line)
+        if duplicate is not None:
+            return duplicate
+        heartbeat = self.parse_heartbeat(data, start, end)
+        if heartbeat is not None:
+            return self.remember(key, heartbeat)
         try:
-            event = SIAEvent.from_line(line, self.accounts)
+            event = SIAEvent._from_bytes(  # pylint: disable=protected-access
+                data,
+                start,
+                end,
+                self.accounts,
+                self.lazy_events,
+            )
+            if isinstance(event, LazySIAEvent):
+                event.resolve_response()
         except NoAccountError as exc:
-            self.log_and_count(COUNTER_ACCOUNT, line, exception=exc)
+            self.log_and_count(COUNTER_ACCOUNT, _text(line), exception=exc)
             return NAKEvent()
         except EventFormatError as exc:
-            self.log_and_count(COUNTER_FORMAT, line, exception=exc)
+            self.log_and_count(COUNTER_FORMAT, _text(line), exception=exc)
             return NAKEvent()
+        return self.remember(key, self.check_event(event))
+
+    def find_duplicate(
+        self, line: memoryview
+    ) -> tuple[DedupeKey | None, DuplicateEvent | None]:
+        """Look up a stripped frame in the dedupe cache, if there is one.
 
+        Returns the key of the frame and the DuplicateEvent when the frame was
+        already answered with ACK.
+        """
+        dedupe = self.dedupe
+        if dedupe is None:
+            return None, None
+        key = dedupe_key(line)
+        if key is None:
+            return None, None
+        entry = dedupe.get(key, SIAEvent.clock.time())
+        if entry is None:
+            self.counts.increment_dedupe_misses()
+            return key, None
+        duplicate = DuplicateEvent.of(*entry)
+        self.log_and_count(COUNTER_DEDUPE_HIT, event=duplicate)  # type: ignore
+        return key, duplicate
+
+    def parse_heartbeat(
+        self, data: bytes | memoryview, start: int, end: int
+    ) -> HeartbeatEvent | None:
+        """Create and check the HeartbeatEvent of a NULL frame.
+
+        Returns None when there is no heartbeat function, so heartbeats are
+        passed to the function as events, or when the frame needs the full parser.
+        """
+        if self.heartbeat_func is None:
+            return None
+        heartbeat = HeartbeatEvent._from_bytes(  # pylint: disable=protected-access
+            data, start, end, self.accounts
+        )
+        if heartbeat is None:
+            return None
+        self.log_and_count(COUNTER_HEARTBEAT, event=heartbeat)
+        self.check_event(heartbeat)
+        return heartbeat
+
+    def remember(self, key: DedupeKey | None, event: EventsType) -> EventsType:
+        """Add the event and its response to the dedupe cache when it is answered with ACK.
+
+        The response is kept, so a frame that is sent again gets the same answer,
+        also when the timestamp of the event is no longer in the timeband.
+        """
+        if key is not None and self.dedupe is not None and self.deliverable(event):
+            self.dedupe.put(key, (event, ResponseType.ACK), SIAEvent.clock.time())
+        return event
+
+    def check_event(self, event: SIAEvent) -> SIAEvent:
+        """Count and log the reason a parsed event is not answered with ACK."""
         if isinstance(event, OHEvent):
             return event  # pragma: no cover
         if not event.valid_message:
@@ -81,36 +179,73 @@ class BaseSIAServer(ABC):
             self.log_and_count(COUNTER_TIMESTAMP, event=event)
         return event
 
+    @staticmethod
+    def deliverable(event: EventsType | None) -> TypeGuard[SIAEvent]:
+        """Return True if the event should be passed to the user function."""
+        return isinstance(event, SIAEvent) and event.response == ResponseType.ACK
+
     async def async_func_wrap(self, event: EventsType | None) -> None:
         """Wrap the user function in a try."""
-        if (
-            event is None
-            or not (isinstance(event, SIAEvent))
-            or event.response != ResponseType.ACK
-        ):
+        if not self.deliverable(event):
+            return
+        if isinstance(event, HeartbeatEvent):
+            try:
+                assert self.heartbeat_func is not None
+                await self.heartbeat_func(event)
+            except Exception as exp:  # pylint: disable=broad-except
+                self.log_and_count(COUNTER_USER_CODE, event=event, exception=exp)
             return
         self.counts.increment_valid_events()
+        if self.batcher is not None:
+            self.batcher.add(event)  # type: ignore
+        if self.async_func is None:
+            return
         try:
-            assert self.async_func is not None
             await self.async_func(event)  # type: ignore
         except Exception as exp:  # pylint: disable=broad-except
             self.log_and_count(COUNTER_USER_CODE, event=event, exception=exp)
 
     def func_wrap(self, event: EventsType | None) -> None:
         """Wrap the user function in a try."""
-        if (
-            event is None
-            or not (isinstance(event, SIAEvent))
-            or event.response != ResponseType.ACK
-        ):
+        if not self.deliverable(event):
+            return
+        if isinstance(event, HeartbeatEvent):
+            try:
+                assert self.heartbeat_func is not None
+                self.heartbeat_func(event)
+            except Exception as exp:  # pylint: disable=broad-except
+                self.log_and_count(COUNTER_USER_CODE, event=event, exception=exp)
             return
         self.counts.increment_valid_events()
+        if self.batcher is not None:
+            self.batcher.add(event)
+        if self.func is None:
+            return
         try:
-            assert self.func is not None
             self.func(event)
         except Exception as exp:  # pylint: disable=broad-except
             self.log_and_count(COUNTER_USER_CODE, event=event, exception=exp)
 
+    async def async_batch_func_wrap(self, events: list[SIAEvent]) -> None:
+        """Wrap the batch function in a try, a failed batch is counted once."""
+        try:
+            assert self.async_batch_func is not None
+            await self.async_batch_func(events)
+        except Exception as exp:  # pylint: disable=broad-except
+            self.log_and_count(
+                COUNTER_USER_CODE, f"{len(events)} events", exception=exp
+            )
+
+    def batch_func_wrap(self, events: list[SIAEvent]) -> None:
+        """Wrap the batch function in a try, a failed batch is counted once."""
+        try:
+            assert self.batch_func is not None
+            self.batch_func(events)
+        except Exception as exp:  # pylint: disable=broad-except
+            self.log_and_count(
+                COUNTER_USER_CODE, f"{len(events)} events", exception=exp
+            )
+
     def log_and_count(
         self,
         counter: str,
@@ -140,6 +275,10 @@ class BaseSIAServer(ABC):
             _LOGGER.warning(
                 "Last event: %s, gave error in user function: %s.", event, exception
             )
+        if counter == COUNTER_USER_CODE and line and exception:
+            _LOGGER.warning(
+                "Last batch of %s, gave error in batch function: %s.", line, exception
+            )
         if counter == COUNTER_CRC and event:
             _LOGGER.warning(
                 "CRC mismatch, ignoring message. Sent CRC: %s, Calculated CRC: %s. Line was %s",
@@ -151,6 +290,16 @@ class BaseSIAServer(ABC):
             _LOGGER.warning(
                 "Code not found, replying with DUH to account: %s", event.account
             )
+        if counter == COUNTER_DROPPED and event:
+            _LOGGER.warning(
+                "Dispatch queue full, replying with NAK to account: %s", event.account
+            )
+        if counter == COUNTER_DEDUPE_HIT and event:
+            _LOGGER.debug(
+                "Frame was sent again, answering without parsing: %s", event.sequence
+            )
+        if counter == COUNTER_HEARTBEAT and event:
+            _LOGGER.debug("Heartbeat from account: %s", event.account)
         if counter == COUNTER_TIMESTAMP and event:
             _LOGGER.warning("Event timestamp is no longer valid: %s", event.timestamp)
         if counter == COUNTER_EVENTS and line:
@@ -0,0 +1,79 @@
+"""Configuration and base class for passing events to the batch function in lists."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from .event import SIAEvent
+
+
+@dataclass
+class BatchConfig:
+    """Configuration of the batches passed to the batch function.
+
+    Arguments:
+        size {int} -- Maximum number of events in a batch, a full batch is
+            passed right away.
+        max_latency {float} -- Seconds the first event of a batch waits at most,
+            after that the batch is passed even when it is not full.
+    """
+
+    size: int = 100
+    max_latency: float = 1.0
+
+
+class BaseBatcher(ABC):
+    """Base class for collecting events into batches.
+
+    The batch is passed when it has size events or when its first event has
+    waited max_latency seconds, whichever comes first.
+    """
+
+    def __init__(self, config: BatchConfig):
+        """Create the batcher.
+
+        Arguments:
+            config {BatchConfig} -- Size and latency of the batches.
+        """
+        if config.size < 1:
+            raise ValueError("The size of a batch should be at least 1.")
+        self.config = config
+        self._events: list[SIAEvent] = []
+        self._arrivals: list[float] = []
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        """Return the number of events waiting for the batch function."""
+        return len(self._events)
+
+    @property
+    def _deadline(self) -> float:
+        """Return the time the first waiting event should be passed."""
+        return self._arrivals[0] + self.config.max_latency
+
+    def _append(self, event: SIAEvent, now: float) -> bool:
+        """Add the event, returns True when the batch is started or full."""
+        self._events.append(event)
+        self._arrivals.append(now)
+        return len(self._events) in (1, self.config.size)
+
+    def _take(self) -> list[SIAEvent]:
+        """Take the next batch, the events that are left wait for their own deadline."""
+        size = self.config.size
+        batch = self._events[:size]
+        del self._events[:size]
+        del self._arrivals[:size]
+        return batch
+
+    def _ready(self, now: float) -> bool:
+        """Return True if there are events and the batch is full, due or stopping."""
+        return bool(self._events) and (
+            self._stopping
+            or len(self._events) >= self.config.size
+            or now >= self._deadline
+        )
+
+    @abstractmethod
+    def add(self, event: SIAEvent) -> None:
+        """Add a event to the batch, does not wait for the batch function."""
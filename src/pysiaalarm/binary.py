@@ -0,0 +1,367 @@
+"""Compact binary format for events, for archives and for sending them to processes.
+
+A stream starts with MAGIC and the version of the format, followed by a record
+per event: the length of the record as 4 byte little endian and the encoded
+event. Events are encoded as a CompactEvent, so content that is part of the
+full message is not written twice and the SIA code and extended data are looked
+up again when decoding. Strings that repeat between events, like the account,
+code, receiver and line, are written once per stream and referred to by their
+index in the string table after that, so records can only be decoded in order.
+The account of an event is not written, like with to_dict, and neither is the
+original event of a DuplicateEvent. A LazySIAEvent is read back as a SIAEvent,
+other events keep their class. Aware timestamps keep their UTC offset, down to
+the microsecond, but are read back with a fixed offset timezone instead of the
+tzinfo they had, so the name of the zone is lost.
+"""
+from __future__ import annotations
+
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import IO, Iterable, Iterator
+
+from .compact import CompactEvent
+from .errors import EventFormatError
+from .event import BaseEvent, EventsType
+from .utils import MessageTypes
+
+MAGIC = b"SIAE"
+VERSION = 1
+MAX_TABLE_SIZE = 4096
+
+_HEADER = MAGIC + bytes((VERSION,))
+_LENGTH = struct.Struct("<I")
+_TIMESTAMP = struct.Struct("<qq")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MESSAGE_TYPES = {message_type.value: message_type for message_type in MessageTypes}
+
+# References to strings of the string table, higher values are the index + _TABLE.
+_NONE = 0
+_INLINE = 1
+_NEW = 2
+_TABLE = 3
+
+# Kinds of timestamps.
+_TIMESTAMP_NONE = 0
+_TIMESTAMP_STR = 1
+_TIMESTAMP_AWARE = 2
+_TIMESTAMP_NAIVE = 3
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    """Write a unsigned int with 7 bits per byte."""
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(view: memoryview, pos: int) -> tuple[int, int]:
+    """Read a unsigned int with 7 bits per byte, returns the value and the next pos."""
+    result = shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class _Encoder:
+    """Encode events with the string table of a stream."""
+
+    def __init__(self) -> None:
+        """Create the encoder with a empty string table."""
+        self._table: dict[str, int] = {}
+
+    def _string(self, buffer: bytearray, value: str | None) -> None:
+        """Write the length + 1 and the string, or 0 for None."""
+        if value is None:
+            buffer.append(0)
+            return
+        data = value.encode("utf-8", "surrogatepass")
+        _write_varint(buffer, len(data) + 1)
+        buffer += data
+
+    def _shared(self, buffer: bytearray, value: str | None) -> None:
+        """Write a string that repeats between events, through the string table."""
+        if value is None:
+            buffer.append(_NONE)
+            return
+        index = self._table.get(value)
+        if index is not None:
+            _write_varint(buffer, index + _TABLE)
+            return
+        if len(self._table) < MAX_TABLE_SIZE:
+            self._table[value] = len(self._table)
+            buffer.append(_NEW)
+        else:
+            buffer.append(_INLINE)
+        self._string(buffer, value)
+
+    def _timestamp(self, buffer: bytearray, value: datetime | str | None) -> None:
+        """Write the kind of timestamp and the timestamp."""
+        if value is None:
+            buffer.append(_TIMESTAMP_NONE)
+        elif isinstance(value, datetime):
+            offset = value.utcoffset()
+            if offset is None:
+                buffer.append(_TIMESTAMP_NAIVE)
+                micros = (value - _NAIVE_EPOCH) // _MICROSECOND
+                buffer += _TIMESTAMP.pack(micros, 0)
+            else:
+                buffer.append(_TIMESTAMP_AWARE)
+                micros = (value - _EPOCH) // _MICROSECOND
+                buffer += _TIMESTAMP.pack(micros, offset // _MICROSECOND)
+        else:
+            buffer.append(_TIMESTAMP_STR)
+            self._string(buffer, str(value))
+
+    def encode(self, event: BaseEvent) -> bytearray:
+        """Return the record for the event, with the length in front."""
+        compact = CompactEvent.from_event(event)
+        message_type = compact.message_type
+        if isinstance(message_type, MessageTypes):
+            message_type = message_type.value
+        buffer = bytearray(_LENGTH.size)
+        _write_varint(buffer, compact.flags)
+        self._string(buffer, compact.full_message)
+        self._string(buffer, compact.msg_crc)
+        self._string(buffer, compact.length)
+        self._shared(buffer, message_type)
+        self._shared(buffer, compact.receiver)
+        self._shared(buffer, compact.line)
+        self._shared(buffer, compact.account)
+        self._string(buffer, compact.sequence)
+        self._string(buffer, compact.content)
+        self._string(buffer, compact.encrypted_content)
+        self._string(buffer, compact.ti)
+        self._string(buffer, compact.id)
+        self._shared(buffer, compact.ri)
+        self._shared(buffer, compact.code)
+        self._string(buffer, compact.message)
+        self._string(buffer, compact.x_data)
+        self._timestamp(buffer, compact.timestamp)
+        self._shared(buffer, compact.event_qualifier)
+        self._shared(buffer, compact.event_type)
+        self._shared(buffer, compact.partition)
+        self._string(buffer, compact.calc_crc)
+        _LENGTH.pack_into(buffer, 0, len(buffer) - _LENGTH.size)
+        return buffer
+
+
+class _Decoder:
+    """Decode records with the string table of a stream."""
+
+    def __init__(self) -> None:
+        """Create the decoder with a empty string table."""
+        self._table: list[str] = []
+
+    @staticmethod
+    def _string(view: memoryview, pos: int, end: int) -> tuple[str | None, int]:
+        """Read a string written by _Encoder._string."""
+        size = view[pos]
+        pos += 1
+        if size > 0x7F:
+            size, pos = _read_varint(view, pos - 1)
+        if not size:
+            return None, pos
+        stop = pos + size - 1
+        if stop > end:
+            raise EventFormatError("String runs past the end of the record.")
+        return str(view[pos:stop], "utf-8", "surrogatepass"), stop
+
+    def _shared(self, view: memoryview, pos: int, end: int) -> tuple[str | None, int]:
+        """Read a string written by _Encoder._shared."""
+        ref = view[pos]
+        pos += 1
+        if ref > 0x7F:
+            ref, pos = _read_varint(view, pos - 1)
+        if ref == _NONE:
+            return None, pos
+        if ref >= _TABLE:
+            try:
+                return self._table[ref - _TABLE], pos
+            except IndexError as exc:
+                raise EventFormatError("Unknown string in the record.") from exc
+        value, pos = self._string(view, pos, end)
+        if value is None:
+            raise EventFormatError("Missing string in the record.")
+        if ref == _NEW:
+            self._table.append(value)
+        return value, pos
+
+    def _timestamp(
+        self, view: memoryview, pos: int, end: int
+    ) -> tuple[datetime | str | None, int]:
+        """Read a timestamp written by _Encoder._timestamp."""
+        kind = view[pos]
+        pos += 1
+        if kind == _TIMESTAMP_NONE:
+            return None, pos
+        if kind == _TIMESTAMP_STR:
+            return self._string(view, pos, end)
+        if kind not in (_TIMESTAMP_AWARE, _TIMESTAMP_NAIVE):
+            raise EventFormatError(f"Unknown timestamp kind {kind} in the record.")
+        if pos + _TIMESTAMP.size > end:
+            raise EventFormatError("Timestamp runs past the end of the record.")
+        micros, offset = _TIMESTAMP.unpack_from(view, pos)
+        pos += _TIMESTAMP.size
+        if kind == _TIMESTAMP_NAIVE:
+            return _NAIVE_EPOCH + micros * _MICROSECOND, pos
+        try:
+            tzone = timezone.utc if offset == 0 else timezone(offset * _MICROSECOND)
+        except ValueError as exc:
+            raise EventFormatError("Timestamp has a invalid UTC offset.") from exc
+        return (_EPOCH + micros * _MICROSECOND).astimezone(tzone), pos
+
+    def decode(self, view: memoryview, pos: int, end: int) -> EventsType:
+        """Decode the record between pos and end, without the length in front."""
+        try:
+            flags, pos = _read_varint(view, pos)
+            full_message, pos = self._string(view, pos, end)
+            msg_crc, pos = self._string(view, pos, end)
+            length, pos = self._string(view, pos, end)
+            message_type, pos = self._shared(view, pos, end)
+            receiver, pos = self._shared(view, pos, end)
+            line, pos = self._shared(view, pos, end)
+            account, pos = self._shared(view, pos, end)
+            sequence, pos = self._string(view, pos, end)
+            content, pos = self._string(view, pos, end)
+            encrypted_content, pos = self._string(view, pos, end)
+            ti, pos = self._string(view, pos, end)  # pylint: disable=invalid-name
+            id_, pos = self._string(view, pos, end)
+            ri, pos = self._shared(view, pos, end)  # pylint: disable=invalid-name
+            code, pos = self._shared(view, pos, end)
+            message, pos = self._string(view, pos, end)
+            x_data, pos = self._string(view, pos, end)
+            timestamp, pos = self._timestamp(view, pos, end)
+            event_qualifier, pos = self._shared(view, pos, end)
+            event_type, pos = self._shared(view, pos, end)
+            partition, pos = self._shared(view, pos, end)
+            calc_crc, pos = self._string(view, pos, end)
+        except IndexError as exc:
+            raise EventFormatError("Record is too short.") from exc
+        except UnicodeDecodeError as exc:
+            raise EventFormatError("Record has a invalid string.") from exc
+        if pos != end:
+            raise EventFormatError("Record is longer than the event.")
+        return CompactEvent(
+            full_message,
+            msg_crc,
+            length,
+            _MESSAGE_TYPES.get(message_type, message_type),  # type: ignore
+            receiver,
+            line,
+            account,
+            sequence,
+            content,
+            encrypted_content,
+            ti,
+            id_,
+            ri,
+            code,
+            message,
+            x_data,
+            timestamp,
+            event_qualifier,
+            event_type,
+            partition,
+            calc_crc,
+            None,
+            flags,
+        ).to_event()
+
+
+def _check_header(header: bytes | memoryview) -> None:
+    """Check the magic and the version at the start of a stream."""
+    if len(header) < len(_HEADER) or bytes(header[: len(MAGIC)]) != MAGIC:
+        raise EventFormatError("Data does not start with the event stream header.")
+    if header[len(MAGIC)] > VERSION:
+        raise EventFormatError(
+            f"Event stream version {header[len(MAGIC)]} is not supported."
+        )
+
+
+class EventWriter:
+    """Write events to a binary stream, like a file opened with "wb"."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        """Create the writer and write the header to the stream.
+
+        Arguments:
+            stream {IO[bytes]} -- the stream to write to.
+        """
+        self.stream = stream
+        self._encoder = _Encoder()
+        self.stream.write(_HEADER)
+
+    def write(self, event: BaseEvent) -> int:
+        """Write a event and return the number of bytes written."""
+        return self.stream.write(self._encoder.encode(event))
+
+    def write_all(self, events: Iterable[BaseEvent]) -> int:
+        """Write events and return the number of bytes written."""
+        return sum(self.write(event) for event in events)
+
+
+class EventReader:
+    """Read events from a binary stream, like a file opened with "rb"."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        """Create the reader and check the header of the stream.
+
+        Arguments:
+            stream {IO[bytes]} -- the stream to read from.
+        """
+        self.stream = stream
+        self._decoder = _Decoder()
+        _check_header(self.stream.read(len(_HEADER)))
+
+    def read(self) -> EventsType | None:
+        """Read the next event, returns None at the end of the stream."""
+        prefix = self.stream.read(_LENGTH.size)
+        if not prefix:
+            return None
+        if len(prefix) != _LENGTH.size:
+            raise EventFormatError("Stream ends in the length of a record.")
+        (size,) = _LENGTH.unpack(prefix)
+        record = self.stream.read(size)
+        if len(record) != size:
+            raise EventFormatError("Stream ends in a record.")
+        return self._decoder.decode(memoryview(record), 0, size)
+
+    def __iter__(self) -> Iterator[EventsType]:
+        """Iterate over the events in the stream."""
+        while (event := self.read()) is not None:
+            yield event
+
+
+def encode_events(events: Iterable[BaseEvent]) -> bytes:
+    """Encode events to bytes, with the header of a stream."""
+    encoder = _Encoder()
+    buffer = bytearray(_HEADER)
+    for event in events:
+        buffer += encoder.encode(event)
+    return bytes(buffer)
+
+
+def decode_events(data: bytes | bytearray | memoryview) -> Iterator[EventsType]:
+    """Decode the events in data, the records are read through a memoryview of data."""
+    view = memoryview(data)
+    _check_header(view)
+    decoder = _Decoder()
+    pos = len(_HEADER)
+    total = len(view)
+    while pos < total:
+        if pos + _LENGTH.size > total:
+            raise EventFormatError("Data ends in the length of a record.")
+        (size,) = _LENGTH.unpack_from(view, pos)
+        pos += _LENGTH.size
+        end = pos + size
+        if end > total:
+            raise EventFormatError("Data ends in a record.")
+        yield decoder.decode(view, pos, end)
+        pos = end
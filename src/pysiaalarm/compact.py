@@ -0,0 +1,223 @@
+"""Compact representation of events, for keeping many events in memory."""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from .account import SIAAccount
+from .event import (
+    BaseEvent,
+    DuplicateEvent,
+    EventsType,
+    HeartbeatEvent,
+    LazySIAEvent,
+    NAKEvent,
+    OHEvent,
+    SIAEvent,
+)
+from .utils import SIA_CODE_REGISTRY, MessageTypes
+
+# The flags that most events have are in the lowest bits, so that the flags of
+# those events stay below 256 and use the cached small ints.
+ENCRYPTED = 1
+DECRYPTED = 2
+CONTENT_PARSED = 4
+SIA_ADDED = 8
+CONTENT_IN_MESSAGE = 16
+ENCRYPTED_CONTENT_IN_MESSAGE = 32
+CRC_MATCH = 64
+ADM_PARSED = 128
+XDATA_PARSED = 256
+ENCRYPTED_UNKNOWN = 512
+OH_EVENT = 1024
+NAK_EVENT = 2048
+HEARTBEAT_EVENT = 4096
+DUPLICATE_EVENT = 8192
+
+
+def _intern(value: str | None) -> str | None:
+    """Intern values that repeat between events."""
+    return sys.intern(value) if value is not None else None
+
+
+def _rest(full_message: str | None) -> str | None:
+    """Return the part of the full message after the header, which is the content."""
+    if full_message is None:
+        return None
+    start = full_message.find("[")
+    return full_message[start + 1 :] if start != -1 else None
+
+
+@dataclass(slots=True)
+class CompactEvent:
+    """Event with slots, that shares strings and keeps no parsed copies.
+
+    The content is only kept when it is not part of the full message, the
+    calculated CRC only when it does not match, the SIA code and extended data
+    are looked up again when the event is converted back, the parse flags and
+    the event type are kept as bits in flags. Strings that repeat between
+    events, like account, receiver, line and code, are interned.
+
+    HeartbeatEvent and DuplicateEvent come back as their own class, but the
+    original event and response of a DuplicateEvent are not kept. A
+    LazySIAEvent is parsed first and comes back as a SIAEvent.
+    """
+
+    full_message: str | None
+    msg_crc: str | None
+    length: str | None
+    message_type: MessageTypes | str | None
+    receiver: str | None
+    line: str | None
+    account: str | None
+    sequence: str | None
+    content: str | None
+    encrypted_content: str | None
+    ti: str | None  # pylint: disable=invalid-name
+    id: str | None  # pylint: disable=invalid-name
+    ri: str | None  # pylint: disable=invalid-name
+    code: str | None
+    message: str | None
+    x_data: str | None
+    timestamp: datetime | str | None
+    event_qualifier: str | None
+    event_type: str | None
+    partition: str | None
+    calc_crc: str | None
+    sia_account: SIAAccount | None
+    flags: int
+
+    @classmethod
+    def from_event(cls, event: BaseEvent) -> CompactEvent:
+        """Create a compact event from a event, a LazySIAEvent is parsed first."""
+        if isinstance(event, LazySIAEvent):
+            event.materialize()
+        full_message = event.full_message
+        rest = _rest(full_message)
+        content = event.content
+        encrypted_content = event.encrypted_content
+        flags = 0
+        if event.encrypted is None:
+            flags |= ENCRYPTED_UNKNOWN
+        elif event.encrypted:
+            flags |= ENCRYPTED
+        if event._encrypted_content_decrypted:  # pylint: disable=protected-access
+            flags |= DECRYPTED
+        if event._content_parsed:  # pylint: disable=protected-access
+            flags |= CONTENT_PARSED
+        if event._sia_added:  # pylint: disable=protected-access
+            flags |= SIA_ADDED
+        if event._adm_parsed:  # pylint: disable=protected-access
+            flags |= ADM_PARSED
+        if event._xdata_parsed:  # pylint: disable=protected-access
+            flags |= XDATA_PARSED
+        if content is not None and content == rest:
+            flags |= CONTENT_IN_MESSAGE
+            content = None
+        if encrypted_content is not None and encrypted_content == rest:
+            flags |= ENCRYPTED_CONTENT_IN_MESSAGE
+            encrypted_content = None
+        calc_crc = event.calc_crc
+        if calc_crc is not None and calc_crc == event.msg_crc:
+            flags |= CRC_MATCH
+            calc_crc = None
+        if isinstance(event, OHEvent):
+            flags |= OH_EVENT
+        elif isinstance(event, NAKEvent):
+            flags |= NAK_EVENT
+        elif isinstance(event, HeartbeatEvent):
+            flags |= HEARTBEAT_EVENT
+        elif isinstance(event, DuplicateEvent):
+            flags |= DUPLICATE_EVENT
+        return cls(
+            full_message,
+            event.msg_crc,
+            _intern(event.length),
+            event.message_type,
+            _intern(event.receiver),
+            _intern(event.line),
+            _intern(event.account),
+            event.sequence,
+            content,
+            encrypted_content,
+            event.ti,
+            event.id,
+            _intern(event.ri),
+            _intern(event.code),
+            event.message,
+            event.x_data,
+            event.timestamp,
+            _intern(event.event_qualifier),
+            _intern(event.event_type),
+            _intern(event.partition),
+            calc_crc,
+            event.sia_account,
+            flags,
+        )
+
+    def to_event(self) -> EventsType:
+        """Create the event again with its class, without parsing the line."""
+        flags = self.flags
+        event_class: type[BaseEvent] = SIAEvent
+        if flags & OH_EVENT:
+            event_class = OHEvent
+        elif flags & NAK_EVENT:
+            event_class = NAKEvent
+        elif flags & HEARTBEAT_EVENT:
+            event_class = HeartbeatEvent
+        elif flags & DUPLICATE_EVENT:
+            event_class = DuplicateEvent
+        rest = (
+            _rest(self.full_message)
+            if flags & (CONTENT_IN_MESSAGE | ENCRYPTED_CONTENT_IN_MESSAGE)
+            else None
+        )
+        fields: dict[str, Any] = {
+            "full_message": self.full_message,
+            "msg_crc": self.msg_crc,
+            "length": self.length,
+            "encrypted": (
+                None if flags & ENCRYPTED_UNKNOWN else bool(flags & ENCRYPTED)
+            ),
+            "message_type": self.message_type,
+            "receiver": self.receiver,
+            "line": self.line,
+            "account": self.account,
+            "sequence": self.sequence,
+            "content": rest if flags & CONTENT_IN_MESSAGE else self.content,
+            "encrypted_content": (
+                rest if flags & ENCRYPTED_CONTENT_IN_MESSAGE else self.encrypted_content
+            ),
+            "ti": self.ti,
+            "id": self.id,
+            "ri": self.ri,
+            "code": self.code,
+            "message": self.message,
+            "x_data": self.x_data,
+            "timestamp": self.timestamp,
+            "event_qualifier": self.event_qualifier,
+            "event_type": self.event_type,
+            "partition": self.partition,
+            "calc_crc": self.msg_crc if flags & CRC_MATCH else self.calc_crc,
+            "extended_data": None,
+            "sia_account": self.sia_account,
+            "sia_code": (
+                SIA_CODE_REGISTRY.get(self.code)
+                if flags & SIA_ADDED and self.code
+                else None
+            ),
+            "_content_parsed": bool(flags & CONTENT_PARSED),
+            "_encrypted_content_decrypted": bool(flags & DECRYPTED),
+            "_adm_parsed": bool(flags & ADM_PARSED),
+            "_sia_added": bool(flags & SIA_ADDED),
+            "_xdata_parsed": False,
+        }
+        if event_class is DuplicateEvent:
+            fields.update(original=None, original_response=None)
+        event = event_class.__new__(event_class)
+        event.__dict__.update(fields)
+        if flags & XDATA_PARSED and isinstance(event, SIAEvent):
+            event.parse_extended_data()
+        return event  # type: ignore
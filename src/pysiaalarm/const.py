@@ -7,6 +7,11 @@ COUNTER_CODE = "code"
 COUNTER_TIMESTAMP = "timestamp"
 COUNTER_ACCOUNT = "account"
 COUNTER_USER_CODE = "user_code"
+COUNTER_DROPPED = "dropped"
+COUNTER_QUEUE_DEPTH = "queue_depth"
+COUNTER_DEDUPE_HIT = "dedupe_hit"
+COUNTER_DEDUPE_MISS = "dedupe_miss"
+COUNTER_HEARTBEAT = "heartbeat"
 
 IV = bytes.fromhex("00000000000000000000000000000000")
 EMPTY_BYTES = b""
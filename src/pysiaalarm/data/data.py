@@ -2,26 +2,70 @@
 
 from __future__ import annotations
 
+import sys
+from collections.abc import Mapping
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Optional
 
 from .adm_mapping import ADM_MAPPING
 from .sia_codes import SIA_CODES
 from .xdata import XDATA
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SIACode:
-    """Class for SIACodes."""
+    """Class for SIACodes.
+
+    Instances are immutable and shared between all events, copying returns the same object.
+    """
 
     code: str
     type: str
     description: str
     concerns: str
 
+    def __copy__(self) -> SIACode:
+        """Return self, the code is immutable."""
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SIACode:
+        """Return self, the code is immutable."""
+        return self
+
+
+@dataclass(frozen=True, slots=True)
+class SIAXDataSchema:
+    """Class for the definition of a type of Xdata.
+
+    Instances are immutable and shared between all events, copying returns the same object.
+    """
 
-@dataclass
+    identifier: str
+    name: str
+    description: str
+    length: int
+    characters: str
+
+    def __copy__(self) -> SIAXDataSchema:
+        """Return self, the schema is immutable."""
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SIAXDataSchema:
+        """Return self, the schema is immutable."""
+        return self
+
+
+@dataclass(frozen=True, slots=True)
 class SIAXData:
-    """Class for Xdata."""
+    """Class for the Xdata of a event.
+
+    The fields are the same as before, the name, description, length and
+    characters are the strings of the shared schema, so a event only adds
+    the value. Instances are immutable, copying returns the same object.
+    get_xdata of a event searches the list, there is no index by identifier
+    on purpose, a event has only a few xdata items.
+    """
 
     identifier: str
     name: str
@@ -30,15 +74,108 @@ class SIAXData:
     characters: str
     value: str | None = None
 
+    @classmethod
+    def from_schema(cls, schema: SIAXDataSchema, value: str | None) -> SIAXData:
+        """Create the xdata of a event from the schema of its identifier."""
+        return cls(
+            schema.identifier,
+            schema.name,
+            schema.description,
+            schema.length,
+            schema.characters,
+            value,
+        )
+
+    def __copy__(self) -> SIAXData:
+        """Return self, the xdata is immutable."""
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SIAXData:
+        """Return self, the xdata is immutable."""
+        return self
+
+    @property
+    def schema(self) -> SIAXDataSchema | None:
+        """Return the schema of this type of xdata, None for a unknown identifier."""
+        return SIA_XDATA_REGISTRY.get(self.identifier)
+
+
+def _build_sia_codes() -> Mapping[str, SIACode]:
+    """Build the read-only registry of SIA codes, with interned strings."""
+    return MappingProxyType(
+        {
+            sys.intern(key): SIACode(
+                **{name: sys.intern(text) for (name, text) in value.items()}
+            )
+            for (key, value) in SIA_CODES.items()
+        }
+    )
+
+
+SIA_CODE_REGISTRY: Mapping[str, SIACode] = _build_sia_codes()
+
+
+def _build_xdata() -> Mapping[str, SIAXDataSchema]:
+    """Build the read-only registry of xdata schemas, with interned identifiers."""
+    return MappingProxyType(
+        {
+            sys.intern(key): SIAXDataSchema(
+                identifier=sys.intern(value["identifier"]),
+                name=value["name"],
+                description=value["description"],
+                length=value["length"],
+                characters=value["characters"],
+            )
+            for (key, value) in XDATA.items()
+        }
+    )
+
+
+SIA_XDATA_REGISTRY: Mapping[str, SIAXDataSchema] = _build_xdata()
+
+
+ADM_UNKNOWN_CODE = "YN"
+AdmEntry = tuple[str, Optional[SIACode]]
+
+
+def _build_adm_codes() -> dict[str, AdmEntry]:
+    """Build the flat ADM-CID mapping, keyed by qualifier + event type.
+
+    Each entry has the code and the SIA code from the registry.
+    """
+    return {
+        sys.intern(qualifier + event_type): (
+            sys.intern(code),
+            SIA_CODE_REGISTRY.get(code),
+        )
+        for (event_type, sub_map) in ADM_MAPPING.items()
+        for (qualifier, code) in sub_map.items()
+    }
+
+
+_ADM_CODES = _build_adm_codes()
+ADM_CODES: Mapping[str, AdmEntry] = MappingProxyType(_ADM_CODES)
+_ADM_UNKNOWN: AdmEntry = (ADM_UNKNOWN_CODE, SIA_CODE_REGISTRY.get(ADM_UNKNOWN_CODE))
+
+
+def lookup_adm(event_qualifier: str, event_type: str) -> AdmEntry:
+    """Return the code and SIA code for a ADM-CID qualifier and event type.
+
+    Combinations that are not in the mapping get the code for invalid data.
+    """
+    if len(event_qualifier) != 1:
+        return _ADM_UNKNOWN
+    return _ADM_CODES.get(event_qualifier + event_type, _ADM_UNKNOWN)
+
 
-def _load_sia_codes() -> dict[str, SIACode]:
-    """Alias for loading sia codes file."""
-    return {key: SIACode(**value) for (key, value) in SIA_CODES.items()}
+def _load_sia_codes() -> Mapping[str, SIACode]:
+    """Alias for the sia codes registry, which is built once."""
+    return SIA_CODE_REGISTRY
 
 
-def _load_xdata() -> dict[str, SIAXData]:
-    """Alias for loading xdata file."""
-    return {key: SIAXData(**value) for (key, value) in XDATA.items()}
+def _load_xdata() -> Mapping[str, SIAXDataSchema]:
+    """Alias for the xdata registry, which is built once."""
+    return SIA_XDATA_REGISTRY
 
 
 def _load_adm_mapping() -> dict[str, dict[str, str]]:
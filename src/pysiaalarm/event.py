@@ -1,39 +1,103 @@
 """This is a class for SIA Events."""
 from __future__ import annotations
 
+import json
 import logging
 from abc import ABC, abstractmethod
 from copy import deepcopy
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta, timezone, tzinfo
-from typing import Union, Any
-
-from Crypto.Cipher import AES
-from Crypto.Cipher._mode_cbc import CbcMode
+from dataclasses import asdict, dataclass, field, is_dataclass
+from dataclasses import fields as dataclass_fields
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, ClassVar, Union
 
 from .account import SIAAccount
-from .const import IV, RSP_XDATA
+from .const import RSP_XDATA
 from .errors import EventFormatError, NoAccountError
 from .utils import (
     MAIN_MATCHER,
+    MAIN_MATCHER_BYTES,
     OH_MATCHER,
+    SIA_CODE_REGISTRY,
+    Clock,
     MessageTypes,
+    ResponseTemplate,
     ResponseType,
+    SIACipher,
     SIACode,
     SIAXData,
     _get_matcher,
-    _load_adm_mapping,
-    _load_sia_codes,
     _load_xdata,
+    crc16_hex,
+    lookup_adm,
+    parse_timestamp,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
+_PARSE_FLAGS = frozenset(
+    (
+        "_content_parsed",
+        "_encrypted_content_decrypted",
+        "_adm_parsed",
+        "_sia_added",
+        "_xdata_parsed",
+    )
+)
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_ACCOUNTLESS_RESPONSES = {
+    response_type: f'"{response_type.value}"'.encode("ascii")
+    for response_type in ResponseType
+}
+_NAK_TEMPLATE = ResponseTemplate('"NAK"', "L0R0A0[]")
+
+
+def _strip_bounds(data: bytes | bytearray | memoryview) -> tuple[int, int]:
+    """Return the start and end of data without leading and trailing whitespace."""
+    start = 0
+    end = len(data)
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def _plain(value: Any) -> Any:
+    """Return the value like dataclasses.asdict does, without copying strings."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, SIACode):
+        return {
+            "code": value.code,
+            "type": value.type,
+            "description": value.description,
+            "concerns": value.concerns,
+        }
+    if isinstance(value, SIAXData):
+        return {
+            "identifier": value.identifier,
+            "name": value.name,
+            "description": value.description,
+            "length": value.length,
+            "characters": value.characters,
+            "value": value.value,
+        }
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return deepcopy(value)
+
 
 @dataclass  # type: ignore
 class BaseEvent(ABC):
     """Base class for Events."""
 
+    # Clock for the timestamps of responses and the timeband check, replace it
+    # with a FakeClock for tests and benchmarks.
+    clock: ClassVar[Clock] = Clock()
+
     # From Main Matcher
     full_message: str | None = None
     msg_crc: str | None = None
@@ -103,29 +167,28 @@ class BaseEvent(ABC):
     def set_sia_code(self) -> None:
         """Return the SIA Code object, based on the code field."""
         if self.code:  # pragma: no cover
-            self.sia_code = _load_sia_codes().get(self.code)  # pylint: disable=E1101
+            self.sia_code = SIA_CODE_REGISTRY.get(self.code)
             self._sia_added = True
 
-    def _get_crypter(self) -> CbcMode | None:
-        """Give back a encrypter/decrypter."""
+    def _get_crypter(self) -> SIACipher | None:
+        """Give back the cached encrypter/decrypter of the account."""
         if not self.sia_account:
             return None  # pragma: no cover
-        if not self.sia_account.key_b:
-            return None  # pragma: no cover
-        cypher = AES.new(self.sia_account.key_b, AES.MODE_CBC, IV)
-        if isinstance(cypher, CbcMode):
-            return cypher
-        return None  # pragma: no cover
+        return self.sia_account.cipher
 
     @classmethod
     def from_line(
-        cls, incoming: str, accounts: dict[str, SIAAccount] | None = None
+        cls,
+        incoming: str,
+        accounts: dict[str, SIAAccount] | None = None,
+        lazy: bool = False,
     ) -> SIAEvent:
         """Create a Event from a line.
 
         Arguments:
             incoming {str} -- The line to be parsed.
             accounts {List[SIAAccount]} -- accounts to check against, optional
+            lazy {bool} -- create a LazySIAEvent, optional
 
         Raises:
             EventFormatError: If the event is not formatted according to SIA DC09 or ADM-CID.
@@ -158,7 +221,7 @@ class BaseEvent(ABC):
         if accounts and acc:
             sia_account = accounts.get(acc, None) or accounts.get("", None)
 
-        return SIAEvent(
+        return (LazySIAEvent if lazy else SIAEvent)(
             full_message=incoming[8:],
             msg_crc=main_content["crc"],
             length=main_content["length"],
@@ -173,61 +236,162 @@ class BaseEvent(ABC):
             sia_account=sia_account,
         )
 
-    @staticmethod
-    def _get_timestamp(device_timezone: tzinfo | None = None) -> str:
-        """Create a timestamp in the right format."""
-        if device_timezone:
-            return (
-                datetime.now()
-                .astimezone(device_timezone)
-                .strftime("_%H:%M:%S,%m-%d-%Y")
+    @classmethod
+    def from_bytes(
+        cls,
+        incoming: bytes | bytearray | memoryview,
+        accounts: dict[str, SIAAccount] | None = None,
+        lazy: bool = False,
+    ) -> SIAEvent:
+        """Create a Event from the raw bytes of a line.
+
+        The line is matched as bytes and the CRC is calculated over the received
+        bytes, only the matched fields are decoded.
+
+        Arguments:
+            incoming {bytes | bytearray | memoryview} -- The line to be parsed.
+            accounts {List[SIAAccount]} -- accounts to check against, optional
+            lazy {bool} -- create a LazySIAEvent, optional
+
+        Raises:
+            EventFormatError: If the event is not formatted according to SIA DC09 or ADM-CID.
+
+        """
+        start, end = _strip_bounds(incoming)
+        return cls._from_bytes(incoming, start, end, accounts, lazy)
+
+    @classmethod
+    def _from_bytes(
+        cls,
+        incoming: bytes | bytearray | memoryview,
+        start: int,
+        end: int,
+        accounts: dict[str, SIAAccount] | None = None,
+        lazy: bool = False,
+    ) -> SIAEvent:
+        """Create a Event from incoming[start:end], which is already stripped."""
+        line_match = MAIN_MATCHER_BYTES.match(incoming, start, end)
+        if not line_match:
+            return cls.from_line(
+                str(incoming[start:end], "ascii", "ignore"), accounts, lazy
             )
-        return datetime.now(timezone.utc).strftime("_%H:%M:%S,%m-%d-%Y")
+        (
+            crc,
+            length,
+            encrypted_flag,
+            message_type,
+            sequence,
+            receiver,
+            line,
+            acc_b,
+            rest,
+        ) = line_match.groups()
+
+        encrypted = encrypted_flag is not None
+        acc = acc_b.decode("ascii") if acc_b is not None else None
+        sia_account = None
+        if accounts and acc:
+            sia_account = accounts.get(acc, None) or accounts.get("", None)
+        message = memoryview(incoming)[start + 8 : end]
+        content = rest.decode("ascii", "ignore")
+
+        return (LazySIAEvent if lazy else SIAEvent)(
+            full_message=str(message, "ascii", "ignore"),
+            msg_crc=crc.decode("ascii"),
+            length=length.decode("ascii"),
+            encrypted=encrypted,
+            message_type=MessageTypes(message_type.decode("ascii")),
+            sequence=sequence.decode("ascii"),
+            receiver=receiver.decode("ascii") if receiver is not None else None,  # type: ignore
+            line=line.decode("ascii"),
+            account=acc,
+            content=content if not encrypted else None,
+            encrypted_content=content if encrypted else None,
+            sia_account=sia_account,
+            calc_crc=crc16_hex(message),
+        )
+
+    @classmethod
+    def _get_timestamp(cls, device_timezone: tzinfo | None = None) -> str:
+        """Create a timestamp in the right format."""
+        return cls.clock.timestamp(device_timezone)
 
     @staticmethod
-    def _crc_calc(msg: str | None) -> str | None:
+    def _crc_calc(msg: str | bytes | bytearray | memoryview | None) -> str | None:
         """Calculate the CRC of the msg."""
         if msg is None:  # pragma: no cover
             return None
-        crc = 0
-        for letter in str.encode(msg):
-            temp = letter
-            for _ in range(0, 8):
-                temp ^= crc & 1
-                crc >>= 1
-                if (temp & 1) != 0:
-                    crc ^= 0xA001
-                temp >>= 1
-        return ("%x" % crc).upper().zfill(4)
+        if isinstance(msg, str):
+            msg = msg.encode()
+        return crc16_hex(msg)
 
     def to_dict(self, **kwargs: Any) -> dict[str, Any]:
         """Create a dict from the dataclass.
 
+        The dict is the same as dataclasses.asdict gives for the event without
+        the account and with the timestamp in isoformat, but the event is not copied.
+
         Kwargs are only there for legacy (after no longer using dataclasses_json),
         so remove any other arguments from this function.
         """
-        event = deepcopy(self)
-        event.sia_account = None
-        if event.timestamp is not None and isinstance(event.timestamp, datetime):
-            event.timestamp = event.timestamp.isoformat()
-        return asdict(event)
+        timestamp = self.timestamp
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        return {
+            "full_message": self.full_message,
+            "msg_crc": self.msg_crc,
+            "length": self.length,
+            "encrypted": self.encrypted,
+            "message_type": self.message_type,
+            "receiver": self.receiver,
+            "line": self.line,
+            "account": self.account,
+            "sequence": self.sequence,
+            "content": self.content,
+            "encrypted_content": self.encrypted_content,
+            "ti": self.ti,
+            "id": self.id,
+            "ri": self.ri,
+            "code": self.code,
+            "message": self.message,
+            "x_data": self.x_data,
+            "timestamp": _plain(timestamp),
+            "event_qualifier": self.event_qualifier,
+            "event_type": self.event_type,
+            "partition": self.partition,
+            "calc_crc": self.calc_crc,
+            "extended_data": _plain(self.extended_data),
+            "sia_account": None,
+            "sia_code": _plain(self.sia_code),
+            "_content_parsed": self._content_parsed,
+            "_encrypted_content_decrypted": self._encrypted_content_decrypted,
+            "_adm_parsed": self._adm_parsed,
+            "_sia_added": self._sia_added,
+            "_xdata_parsed": self._xdata_parsed,
+        }
+
+    def to_json(self) -> bytes:
+        """Create JSON from the event, with the fields of to_dict.
+
+        The message type is written as its value.
+        """
+        event = self.to_dict()
+        if isinstance(event["message_type"], MessageTypes):
+            event["message_type"] = event["message_type"].value
+        return _JSON_ENCODER.encode(event).encode("ascii")
 
     @classmethod
     def from_dict(cls, event: dict[str, Any]) -> BaseEvent:
-        """Create a SIA Event from a dict."""
-        if "_content_parsed" in event:
-            event.pop("_content_parsed")
-        if "_encrypted_content_decrypted" in event:
-            event.pop("_encrypted_content_decrypted")
-        if "_adm_parsed" in event:
-            event.pop("_adm_parsed")
-        if "_sia_added" in event:
-            event.pop("_sia_added")
-        if "_xdata_parsed" in event:
-            event.pop("_xdata_parsed")
-        if "timestamp" in event and event["timestamp"] is not None:
-            event["timestamp"] = datetime.fromisoformat(event["timestamp"])
-        return cls(**event)
+        """Create a SIA Event from a dict, the dict is not changed."""
+        fields = {key: value for key, value in event.items() if key not in _PARSE_FLAGS}
+        if fields.get("timestamp") is not None:
+            fields["timestamp"] = datetime.fromisoformat(fields["timestamp"])
+        return cls(**fields)
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> BaseEvent:
+        """Create a SIA Event from JSON created with to_json."""
+        return cls.from_dict(json.loads(data))
 
 
 @dataclass
@@ -243,12 +407,20 @@ class SIAEvent(BaseEvent):
         # Calculate the CRC of the message.
         if not self.calc_crc:
             self.calc_crc = self._crc_calc(self.full_message)
+        # Encrypted content can only be decrypted with a account with a key
+        if self.encrypted_content and (
+            not self.sia_account or not self.sia_account.encrypted
+        ):
+            raise NoAccountError("No account present with encrypted message.")
+        self._parse_fields()
+        self._parse_code()
+        self._parse_xdata()
+
+    def _parse_fields(self) -> None:
+        """Decrypt and parse the content and map ADM-CID events to a code."""
         # If there is encrypted content and a key, decrypt
-        if self.encrypted_content:
-            if not self.sia_account or not self.sia_account.encrypted:
-                raise NoAccountError("No account present with encrypted message.")
-            if not self._encrypted_content_decrypted:
-                self.decrypt_content()
+        if self.encrypted_content and not self._encrypted_content_decrypted:
+            self.decrypt_content()
         # If there is content (either after decrypting or directly) parse
         if self.content and not self._content_parsed:
             self.parse_content()
@@ -260,10 +432,14 @@ class SIAEvent(BaseEvent):
             and not self._adm_parsed
         ):
             self.parse_adm()
-        # If there is a code, map it to the full SIA Code spec.
+
+    def _parse_code(self) -> None:
+        """If there is a code, map it to the full SIA Code spec."""
         if self.code and not self._sia_added:
             self.set_sia_code()
-        # If there is x_data, parse it.
+
+    def _parse_xdata(self) -> None:
+        """If there is x_data, parse it."""
         if self.x_data and not self._xdata_parsed:
             self.parse_extended_data()  # pragma: no cover
 
@@ -278,11 +454,14 @@ class SIAEvent(BaseEvent):
             return ResponseType.NAK  # pragma: no cover
         if not self.valid_timestamp:
             return ResponseType.NAK
-        if self.extended_data is not None:  # pragma: no cover
-            if [x for x in self.extended_data if x.identifier in RSP_XDATA]:
-                return ResponseType.RSP
+        if any(identifier in RSP_XDATA for identifier in self._xdata_identifiers()):
+            return ResponseType.RSP
         return ResponseType.ACK
 
+    def _xdata_identifiers(self) -> list[str]:
+        """Return the identifiers of the extended data."""
+        return [xdata.identifier for xdata in self.extended_data or ()]
+
     @property
     def sia_string(self) -> str:  # pragma: no cover
         """Create a string with the SIA codes and some other fields."""
@@ -316,7 +495,7 @@ class SIAEvent(BaseEvent):
         if self.sia_account.allowed_timeband is None:  # pragma: no cover
             return True
         if self.timestamp and isinstance(self.timestamp, datetime):
-            current_time = datetime.now(self.sia_account.device_timezone)
+            current_time = self.clock.now(self.sia_account.device_timezone)
             current_min = current_time - timedelta(
                 seconds=self.sia_account.allowed_timeband[0]
             )
@@ -329,34 +508,46 @@ class SIAEvent(BaseEvent):
     def create_response(self) -> bytes:
         """Create a response message, based on account, event and response type.
 
+        The static part of the response is kept per account and route in a
+        ResponseTemplate, so only the sequence and timestamp are added per event.
+
         Returns:
             bytes -- Response to send back to sender.
 
         """
-        response_type = self.response
+        return self._render_response(self.response)
+
+    def _render_response(self, response_type: ResponseType | None) -> bytes:
+        """Create the response message for the response type."""
         x_data = None
         if response_type is None:
             return b"\n\r"
-        if not self.sia_account:
-            return f'"{response_type.value}"'.encode("ascii")
-        if (
-            self.extended_data
-            and [x for x in self.extended_data if x.identifier == "K"] is not None
-            and self.sia_account.key is not None
-        ):
-            x_data = f"[K{self.sia_account.key}]"
+        account = self.sia_account
+        if not account:
+            return _ACCOUNTLESS_RESPONSES[response_type]
+        if self._xdata_identifiers() and account.key is not None:
+            x_data = f"[K{account.key}]"
+        rq = account.response_qualifier  # pylint: disable=invalid-name
         if response_type == ResponseType.NAK:
-            res = f'"{response_type.value}"0000{self.receiver}{self.line}A0[{self.sia_account.response_qualifier}]{self._get_timestamp(self.sia_account.device_timezone)}'
-        elif not self.encrypted or response_type == ResponseType.DUH:
-            res = f'"{response_type.value}"{self.sequence}{self.receiver}{self.line}#{self.account}[{self.sia_account.response_qualifier}]{x_data if x_data else ""}'
-        else:
-            encrypted_content = self.encrypt_content(
-                f']{x_data if x_data else ""}{self._get_timestamp(self.sia_account.device_timezone)}'
-            )
-            res = f'"*{response_type.value}"{self.sequence}{self.receiver}{self.line}#{self.account}[{self.sia_account.response_qualifier}{encrypted_content}'
-        header = ("%04x" % len(res)).upper()
-        new_crc = self._crc_calc(res)
-        return f"\n{new_crc}{header}{res}\r".encode("ascii")
+            return account.response_template(
+                (response_type, False, self.receiver, self.line),
+                f'"{response_type.value}"',
+                f"{self.receiver}{self.line}A0[{rq}]",
+            ).render("0000", self._get_timestamp(account.device_timezone))
+        if not self.encrypted or response_type == ResponseType.DUH:
+            return account.response_template(
+                (response_type, False, self.receiver, self.line, self.account, x_data),
+                f'"{response_type.value}"',
+                f'{self.receiver}{self.line}#{self.account}[{rq}]{x_data if x_data else ""}',
+            ).render(str(self.sequence))
+        encrypted_content = self.encrypt_content(
+            f']{x_data if x_data else ""}{self._get_timestamp(account.device_timezone)}'
+        )
+        return account.response_template(
+            (response_type, True, self.receiver, self.line, self.account),
+            f'"*{response_type.value}"',
+            f"{self.receiver}{self.line}#{self.account}[{rq}",
+        ).render(str(self.sequence), str(encrypted_content))
 
     def decrypt_content(self) -> None:
         """Decrypt the content, if encrypted account, otherwise pass back the event."""
@@ -389,10 +580,9 @@ class SIAEvent(BaseEvent):
     def parse_adm(self) -> None:
         """Parse the event qualifier and type for ADM messages."""
         if self.event_qualifier and self.event_type:  # pragma: no cover
-            if sub_map := _load_adm_mapping().get(self.event_type, None):
-                self.code = sub_map.get(self.event_qualifier, "YN")
-            else:
-                self.code = "YN"  # invalid data
+            # the SIA code comes from the same table, so it is added here
+            self.code, self.sia_code = lookup_adm(self.event_qualifier, self.event_type)
+            self._sia_added = True
         self._adm_parsed = True
 
     def parse_content(self) -> None:
@@ -427,8 +617,7 @@ class SIAEvent(BaseEvent):
         self.x_data = content["xdata"]
         if content["timestamp"]:
             try:
-                timestamp = datetime.strptime(content["timestamp"], "%H:%M:%S,%m-%d-%Y")
-                self.timestamp = timestamp.replace(tzinfo=timezone.utc)
+                self.timestamp = parse_timestamp(content["timestamp"])
             except ValueError:
                 _LOGGER.warning(
                     "Timestamp could not be parsed as a timestamp: %s",
@@ -443,15 +632,21 @@ class SIAEvent(BaseEvent):
         """Set extended data."""
         if self.x_data is None:  # pragma: no cover
             return
-        x_data_list = self.x_data.split("][")
-        self.extended_data = []
-        for x_data in x_data_list:  # pragma: no cover
-            xdata = _load_xdata().get(x_data[0], None)
-            if xdata:
-                xdata.value = x_data[1:]
-                self.extended_data.append(xdata)
+        registry = _load_xdata()
+        self.extended_data = [
+            SIAXData.from_schema(registry[x_data[0]], x_data[1:])
+            for x_data in self.x_data.split("][")
+            if x_data and x_data[0] in registry
+        ]
         self._xdata_parsed = True
 
+    def get_xdata(self, identifier: str) -> SIAXData | None:
+        """Return the first extended data with the identifier, if the event has it."""
+        for xdata in self.extended_data or ():
+            if xdata.identifier == identifier:
+                return xdata
+        return None
+
     def __str__(self) -> str:
         """Return the event as a string."""
         return f"\
@@ -471,6 +666,161 @@ Encrypted Content: {self.encrypted_content}, \
 Full Message: {self.full_message}."
 
 
+_LAZY_FIELDS = 1
+_LAZY_CODE = 2
+_LAZY_XDATA = 4
+_LAZY_ALL = _LAZY_FIELDS | _LAZY_CODE | _LAZY_XDATA
+
+
+def _lazy_field(name: str, stages: int) -> property:
+    """Create a property that parses the stages it depends on when first read."""
+
+    def getter(self: LazySIAEvent) -> Any:
+        if self.__dict__.get("_lazy", 0) & stages:
+            self._materialize(stages)
+        return self.__dict__[name]
+
+    def setter(self: LazySIAEvent, value: Any) -> None:
+        self.__dict__[name] = value
+
+    return property(getter, setter, doc=f"{name}, parsed when first read.")
+
+
+class LazySIAEvent(SIAEvent):
+    """SIAEvent that only does the work needed to decide the response when created.
+
+    The CRC is calculated and the account is checked when the event is created,
+    a unknown account is answered with NAK without parsing the content. The
+    content is decrypted and parsed when one of the fields from the content
+    is first read, the SIA code and extended data are looked up when they are
+    first read. Errors in the content are raised when the content is parsed,
+    so resolve_response should be called before the response is created.
+    The response only needs the content and the SIA code, the extended data
+    are not parsed for it, and repr and == do not parse anything.
+    """
+
+    content = _lazy_field("content", _LAZY_FIELDS)
+    ti = _lazy_field("ti", _LAZY_FIELDS)  # pylint: disable=invalid-name
+    id = _lazy_field("id", _LAZY_FIELDS)  # pylint: disable=invalid-name
+    ri = _lazy_field("ri", _LAZY_FIELDS)  # pylint: disable=invalid-name
+    code = _lazy_field("code", _LAZY_FIELDS)
+    message = _lazy_field("message", _LAZY_FIELDS)
+    x_data = _lazy_field("x_data", _LAZY_FIELDS)
+    timestamp = _lazy_field("timestamp", _LAZY_FIELDS)
+    event_qualifier = _lazy_field("event_qualifier", _LAZY_FIELDS)
+    event_type = _lazy_field("event_type", _LAZY_FIELDS)
+    partition = _lazy_field("partition", _LAZY_FIELDS)
+    sia_code = _lazy_field("sia_code", _LAZY_FIELDS | _LAZY_CODE)
+    extended_data = _lazy_field("extended_data", _LAZY_FIELDS | _LAZY_XDATA)
+
+    def __post_init__(self) -> None:
+        """Check the CRC and the account, the content is parsed later."""
+        if isinstance(self.message_type, str):  # pragma: no cover
+            self.message_type = MessageTypes(self.message_type)
+        if not self.calc_crc:
+            self.calc_crc = self._crc_calc(self.full_message)
+        if self.encrypted_content and (
+            not self.sia_account or not self.sia_account.encrypted
+        ):
+            raise NoAccountError("No account present with encrypted message.")
+        self.__dict__["_lazy"] = _LAZY_ALL
+
+    def _materialize(self, stages: int) -> None:
+        """Run the pending parse stages, a failed stage is run again on the next read."""
+        pending = self.__dict__["_lazy"]
+        todo = pending & stages
+        self.__dict__["_lazy"] = pending & ~todo
+        try:
+            if todo & _LAZY_FIELDS:
+                self._parse_fields()
+            if todo & _LAZY_CODE:
+                self._parse_code()
+            if todo & _LAZY_XDATA:
+                self._parse_xdata()
+        except Exception:
+            self.__dict__["_lazy"] = pending
+            raise
+
+    def materialize(self) -> None:
+        """Parse all fields now."""
+        if self.__dict__["_lazy"]:
+            self._materialize(_LAZY_ALL)
+
+    def resolve_response(self) -> ResponseType | None:
+        """Parse the content and SIA code needed for the response and return the response.
+
+        Raises:
+            EventFormatError: If the content is not formatted according to SIA DC09 or ADM-CID.
+
+        """
+        return self.response
+
+    @property
+    def response(self) -> ResponseType | None:
+        """Get the responsetype, the account is checked before the content is parsed."""
+        if self.valid_message and not self.sia_account:
+            return ResponseType.NAK
+        return super().response
+
+    def _xdata_identifiers(self) -> list[str]:
+        """Return the identifiers of the extended data, without parsing the extended data."""  # pylint: disable=line-too-long
+        if not self.__dict__["_lazy"] & _LAZY_XDATA:
+            return super()._xdata_identifiers()
+        registry = _load_xdata()
+        return [
+            x_data[0]
+            for x_data in (self.x_data or "").split("][")
+            if x_data and x_data[0] in registry
+        ]
+
+    def to_dict(self, **kwargs: Any) -> dict[str, Any]:
+        """Create a dict from the event, after parsing all fields."""
+        self.materialize()
+        return super().to_dict(**kwargs)
+
+    def __repr__(self) -> str:
+        """Return the repr of the event, fields that are not parsed yet are None."""
+        values = self.__dict__
+        shown = ", ".join(
+            f"{item.name}={values.get(item.name)!r}"
+            for item in dataclass_fields(self)
+            if item.repr
+        )
+        return f"{type(self).__name__}({shown})"
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the frames and accounts, the parsed fields follow from those."""
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        assert isinstance(other, LazySIAEvent)
+        return (self.full_message, self.calc_crc, self.sia_account) == (
+            other.full_message,
+            other.calc_crc,
+            other.sia_account,
+        )
+
+    def __str__(self) -> str:
+        """Return the event as a string, fields that are not parsed yet are None."""
+        if not self.__dict__["_lazy"] & _LAZY_FIELDS:
+            return super().__str__()
+        values = self.__dict__
+        return f"\
+Content: {values['content']}, \
+Zone (ri): {values['ri']}, \
+Code: {values['code']}, \
+Message: {values['message'] if values['message'] else ''}, \
+Account: {self.account}, \
+Receiver: {self.receiver}, \
+Line: {self.line}, \
+Timestamp: {values['timestamp']}, \
+Length: {self.length}, \
+Sequence: {self.sequence}, \
+CRC: {self.msg_crc}, \
+Calc CRC: {self.calc_crc}, \
+Encrypted Content: {self.encrypted_content}, \
+Full Message: {self.full_message}."
+
+
 @dataclass
 class OHEvent(SIAEvent):
     """Class for OH events."""
@@ -500,6 +850,132 @@ class OHEvent(SIAEvent):
         return '"ACK"'.encode("ascii")  # pragma: no cover
 
 
+@dataclass
+class HeartbeatEvent(SIAEvent):
+    """Class for NULL (supervision) frames that are handled by the heartbeat fast path.
+
+    Only the header is matched, the CRC is checked, the content is decrypted
+    and the timestamp is read, the content regexes and the code lookup are
+    skipped. The event is passed to the heartbeat function of the client.
+    """
+
+    code: str | None = "RP"
+    ri: str | None = "0"  # pylint: disable=invalid-name
+
+    def __post_init__(self) -> None:
+        """Mark the content as parsed and add the code."""
+        if isinstance(self.message_type, str):  # pragma: no cover
+            self.message_type = MessageTypes(self.message_type)
+        self._content_parsed = True
+        self._encrypted_content_decrypted = bool(self.encrypted_content)
+        if self.sia_code is None:
+            self.sia_code = SIA_CODE_REGISTRY.get("RP")
+        self._sia_added = True
+
+    @property
+    def response(self) -> ResponseType:
+        """Get the responsetype, the CRC and the code of a heartbeat are valid."""
+        if self.sia_account and self.valid_timestamp:
+            return ResponseType.ACK
+        return ResponseType.NAK
+
+    @property
+    def valid_timestamp(self) -> bool:
+        """Check if the timestamp is within bounds, once."""
+        valid = self.__dict__.get("_valid_timestamp")
+        if valid is None:
+            valid = self.__dict__["_valid_timestamp"] = super().valid_timestamp
+        return valid
+
+    @classmethod
+    def _from_bytes(  # type: ignore[override]
+        cls,
+        incoming: bytes | bytearray | memoryview,
+        start: int,
+        end: int,
+        accounts: dict[str, SIAAccount] | None = None,
+    ) -> HeartbeatEvent | None:
+        """Create a HeartbeatEvent from incoming[start:end], which is already stripped.
+
+        None is returned when the frame is not a NULL frame or needs the full
+        parser: a wrong CRC, a encrypted frame without a key, content besides
+        the timestamp, extended data or a timestamp that can not be parsed.
+        The empty content can be written as ] or |], a decrypted frame has the
+        padding in front of it.
+        """
+        head = bytes(incoming[start + 8 : start + 15])
+        if not head.startswith((b'"NULL"', b'"*NULL"')):
+            return None
+        line_match = MAIN_MATCHER_BYTES.match(incoming, start, end)
+        if not line_match:
+            return None  # pragma: no cover
+        (
+            crc,
+            length,
+            encrypted_flag,
+            _,
+            sequence,
+            receiver,
+            line,
+            acc_b,
+            rest,
+        ) = line_match.groups()
+        message = memoryview(incoming)[start + 8 : end]
+        calc_crc = crc16_hex(message)
+        msg_crc = crc.decode("ascii")
+        if msg_crc != calc_crc:
+            return None
+        encrypted = encrypted_flag is not None
+        acc = acc_b.decode("ascii") if acc_b is not None else None
+        sia_account = None
+        if accounts and acc:
+            sia_account = accounts.get(acc, None) or accounts.get("", None)
+        encrypted_content = None
+        content = rest.decode("ascii", "ignore")
+        if encrypted:
+            cipher = sia_account.cipher if sia_account else None
+            if cipher is None:
+                return None
+            encrypted_content = content
+            try:
+                content = cipher.decrypt(bytes.fromhex(content)).decode(
+                    "ascii", "ignore"
+                )
+            except ValueError:
+                return None
+        close = content.find("]")
+        if close == -1:
+            return None
+        pad = content[:close].removesuffix("|")
+        if "|" in pad or "[" in pad or (not encrypted and pad):
+            return None
+        tail = content[close + 1 :]
+        if tail[:1] == "[":
+            return None
+        if tail[:1] == "_":
+            tail = tail[1:]
+        try:
+            timestamp = parse_timestamp(tail) if tail else None
+        except ValueError:
+            return None
+        return cls(
+            full_message=str(message, "ascii", "ignore"),
+            msg_crc=msg_crc,
+            length=length.decode("ascii"),
+            encrypted=encrypted,
+            message_type=MessageTypes.NULL,
+            sequence=sequence.decode("ascii"),
+            receiver=receiver.decode("ascii") if receiver is not None else None,  # type: ignore
+            line=line.decode("ascii"),
+            account=acc,
+            content=content,
+            encrypted_content=encrypted_content,
+            timestamp=timestamp,
+            sia_account=sia_account,
+            calc_crc=calc_crc,
+        )
+
+
 @dataclass
 class NAKEvent(BaseEvent):
     """Class for NAK Events."""
@@ -521,9 +997,59 @@ class NAKEvent(BaseEvent):
             str -- Response to send back to sender.
 
         """
-        res = f'"NAK"0000L0R0A0[]{self._get_timestamp()}'
-        header = ("%04x" % len(res)).upper()
-        return f"\n{self._crc_calc(res)}{header}{res}\r".encode("ascii")
+        return _NAK_TEMPLATE.render("0000", self._get_timestamp())
+
+
+@dataclass
+class DuplicateEvent(BaseEvent):
+    """Class for a frame that was sent again after it was answered with ACK.
+
+    The frame is not decrypted or parsed, the response is created by the
+    original event with the response it was answered with, the original event
+    is not passed to the function again.
+    """
+
+    original: SIAEvent | None = field(default=None, repr=False, compare=False)
+    original_response: ResponseType | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    @classmethod
+    def of(cls, event: SIAEvent, response: ResponseType | None) -> DuplicateEvent:
+        """Create the duplicate of a event and its response, with the fields of its header."""  # pylint: disable=line-too-long
+        return cls(
+            full_message=event.full_message,
+            msg_crc=event.msg_crc,
+            length=event.length,
+            encrypted=event.encrypted,
+            message_type=event.message_type,
+            receiver=event.receiver,
+            line=event.line,
+            account=event.account,
+            sequence=event.sequence,
+            original=event,
+            original_response=response,
+        )
+
+    @property
+    def response(self) -> ResponseType | None:
+        """Return the response the original event was answered with."""
+        if self.original is None:  # pragma: no cover
+            return ResponseType.NAK
+        return self.original_response
+
+    def create_response(self) -> bytes:
+        """Create the response of the original event again, with the current timestamp.
+
+        Returns:
+            str -- Response to send back to sender.
+
+        """
+        if self.original is None:  # pragma: no cover
+            return _NAK_TEMPLATE.render("0000", self._get_timestamp())
+        return self.original._render_response(  # pylint: disable=protected-access
+            self.original_response
+        )
 
 
-EventsType = Union[SIAEvent, OHEvent, NAKEvent]
+EventsType = Union[SIAEvent, OHEvent, HeartbeatEvent, NAKEvent, DuplicateEvent]
@@ -0,0 +1,65 @@
+"""Thread that passes the events to the batch function of the sync client."""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+from ..batch import BaseBatcher, BatchConfig
+from ..event import SIAEvent
+
+
+class SIABatcher(BaseBatcher):
+    """Collects the events of the server threads and calls the batch function in its own thread."""  # pylint: disable=line-too-long
+
+    def __init__(self, config: BatchConfig, func: Callable[[list[SIAEvent]], None]):
+        """Create the batcher, the thread is started by start.
+
+        Arguments:
+            config {BatchConfig} -- Size and latency of the batches.
+            func {Callable[[list[SIAEvent]], None]} -- Wrapped batch function, should not raise.
+        """
+        super().__init__(config)
+        self.func = func
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the thread."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="SIABatchThread", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Pass the waiting events to the batch function and stop the thread."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def add(self, event: SIAEvent) -> None:
+        """Add a event to the batch, wakes the thread when the batch is due."""
+        with self._condition:
+            if self._append(event, time.monotonic()):
+                self._condition.notify()
+
+    def _run(self) -> None:
+        """Call the batch function for each batch until stopped."""
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._ready(time.monotonic()):
+                    if self._stopping:
+                        return
+                    condition.wait(
+                        self._deadline - time.monotonic() if self._events else None
+                    )
+                batch = self._take()
+            self.func(batch)
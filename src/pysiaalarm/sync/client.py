@@ -7,16 +7,24 @@ import inspect
 import logging
 from threading import Thread
 from types import TracebackType
-from typing import Any, Type
+from typing import Any, Type, Union
 
 from ..account import SIAAccount
 from ..base_client import BaseSIAClient
-from ..event import SIAEvent
+from ..batch import BatchConfig
+from ..event import HeartbeatEvent, SIAEvent
 from ..utils import CommunicationsProtocol
-from .server import SIATCPServer, SIAUDPServer
+from .batch import SIABatcher
+from .pool import ThreadPoolConfig, ThreadPoolMetrics
+from .selector import SelectorConfig, SIASelectorServer
+from .server import SIAPoolTCPServer, SIAPoolUDPServer, SIATCPServer, SIAUDPServer
 
 _LOGGER = logging.getLogger(__name__)
 
+SyncServer = Union[
+    SIATCPServer, SIAUDPServer, SIAPoolTCPServer, SIAPoolUDPServer, SIASelectorServer
+]
+
 
 class SIAClient(Thread, BaseSIAClient):
     """Class for Sync SIA Client."""
@@ -26,8 +34,13 @@ class SIAClient(Thread, BaseSIAClient):
         host: str,
         port: int,
         accounts: list[SIAAccount],
-        function: Callable[[SIAEvent], None],
+        function: Callable[[SIAEvent], None] | None,
         protocol: CommunicationsProtocol = CommunicationsProtocol.TCP,
+        thread_pool: ThreadPoolConfig | None = None,
+        selector: SelectorConfig | None = None,
+        heartbeat_function: Callable[[HeartbeatEvent], None] | None = None,
+        batch_function: Callable[[list[SIAEvent]], None] | None = None,
+        batch: BatchConfig | None = None,
     ):
         """Create the threaded SIA Client object.
 
@@ -35,22 +48,66 @@ class SIAClient(Thread, BaseSIAClient):
             host {str} -- Host to run the server on, usually would be ""
             port {int} -- The port the server listens to.
             accounts {List[SIAAccount]} -- List of SIA Accounts to add.
-            function {Callable[[SIAEvent], None]} -- The function that gets called for each event.
+            function {Callable[[SIAEvent], None]} -- The function that gets called for each event, can be None when there is a batch_function.  # pylint: disable=line-too-long
             protocol {CommunicationsProtocol Enum} -- CommunicationsProtocol to use, TCP or UDP.
+            thread_pool {ThreadPoolConfig} -- Optional, handle requests in a bounded pool of threads instead of a thread per connection or datagram.  # pylint: disable=line-too-long
+            selector {SelectorConfig} -- Optional, handle all sockets in one thread with a selector, the function is called by a small pool of threads.  # pylint: disable=line-too-long
+            heartbeat_function {Callable[[HeartbeatEvent], None]} -- Optional, handle NULL frames with the heartbeat fast path and call this function for them instead of function.  # pylint: disable=line-too-long
+            batch_function {Callable[[list[SIAEvent]], None]} -- Optional, the function that gets called with lists of events from a separate thread, as well as function when that is not None.  # pylint: disable=line-too-long
+            batch {BatchConfig} -- Optional, the size and maximum latency of the batches.
 
         """
-        if inspect.iscoroutinefunction(function):
+        if any(
+            inspect.iscoroutinefunction(func)
+            for func in (function, heartbeat_function, batch_function)
+        ):
             raise TypeError(
                 "Asyncio coroutines as the function are not supported, please use the aio version of the SIAClient for that."  # pylint: disable=line-too-long
             )
+        if function is None and batch_function is None:
+            raise ValueError("Use a function, a batch function or both.")
+        if thread_pool is not None and selector is not None:
+            raise ValueError("Use either a thread pool or a selector, not both.")
         Thread.__init__(self)
         BaseSIAClient.__init__(self, host, port, accounts, protocol)
-        self._func: Callable[[SIAEvent], None] = function
-        self.sia_server: SIATCPServer | SIAUDPServer = self.get_server()
+        self._func: Callable[[SIAEvent], None] | None = function
+        self._thread_pool = thread_pool
+        self._selector = selector
+        self.sia_server: SyncServer = self.get_server()
+        self.heartbeat_function = heartbeat_function
+        self._batcher: SIABatcher | None = None
+        if batch_function is not None:
+            self._batcher = SIABatcher(
+                batch or BatchConfig(), self.sia_server.batch_func_wrap
+            )
+            self.sia_server.batch_func = batch_function
+            self.sia_server.batcher = self._batcher
         self.server_thread: Thread | None = None
 
-    def get_server(self) -> SIATCPServer | SIAUDPServer:
+    def get_server(self) -> SyncServer:
         """Set the sia server to a TCP server."""
+        if self._selector is not None:
+            return SIASelectorServer(
+                (self._host, self._port),
+                self._accounts,
+                self._func,
+                self._counts,
+                self.protocol,
+                self._selector,
+            )
+        if self._thread_pool is not None:
+            server_class = (
+                SIAPoolTCPServer
+                if self.protocol == CommunicationsProtocol.TCP
+                else SIAPoolUDPServer
+            )
+            return server_class(
+                (self._host, self._port),
+                self._accounts,
+                self._func,
+                self._counts,
+                self._thread_pool,
+            )
         if self.protocol == CommunicationsProtocol.TCP:
             return SIATCPServer(  # type: ignore
                 (self._host, self._port), self._accounts, self._func, self._counts
@@ -59,6 +116,12 @@ class SIAClient(Thread, BaseSIAClient):
             (self._host, self._port), self._accounts, self._func, self._counts
         )
 
+    @property
+    def pool_metrics(self) -> ThreadPoolMetrics | None:
+        """Return the utilization and queued requests of the thread pool, if used."""
+        pool = getattr(self.sia_server, "pool", None)
+        return pool.metrics() if pool is not None else None
+
     def __enter__(self) -> SIAClient:
         """Start with as context manager."""
         self.start()
@@ -77,6 +140,8 @@ class SIAClient(Thread, BaseSIAClient):
     def start(self, **kwargs: Any) -> None:
         """Start the SIA Handler thread."""
         _LOGGER.debug("Starting SIA.")
+        if self._batcher is not None:
+            self._batcher.start()
         if self.sia_server is not None:  # pragma: no cover
             self.server_thread = Thread(
                 target=self.sia_server.serve_forever,
@@ -95,3 +160,5 @@ class SIAClient(Thread, BaseSIAClient):
             self.sia_server.server_close()
         if self.server_thread is not None:  # pragma: no cover
             self.server_thread.join()
+        if self._batcher is not None:
+            self._batcher.stop()
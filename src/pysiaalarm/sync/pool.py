@@ -0,0 +1,146 @@
+"""Bounded pool of threads that handle the requests of the sync servers."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from ..utils import Counter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ThreadPoolConfig:
+    """Configuration of the thread pool.
+
+    Arguments:
+        workers {int} -- Number of threads that handle requests.
+        queue_size {int} -- Maximum number of requests waiting for a thread,
+            when the queue is full the server stops reading until there is room.
+    """
+
+    workers: int = 8
+    queue_size: int = 100
+
+
+@dataclass
+class ThreadPoolMetrics:
+    """Snapshot of the state of the thread pool.
+
+    Arguments:
+        workers {int} -- Number of threads.
+        busy {int} -- Number of threads handling a request.
+        queued {int} -- Number of requests waiting for a thread.
+        max_queued {int} -- Highest number of waiting requests seen.
+        completed {int} -- Number of handled requests.
+        waits {int} -- Number of times the server waited for room in the queue.
+    """
+
+    workers: int
+    busy: int
+    queued: int
+    max_queued: int
+    completed: int
+    waits: int
+
+    @property
+    def utilization(self) -> float:
+        """Return the part of the threads that is busy, from 0 to 1."""
+        return self.busy / self.workers if self.workers else 0.0
+
+
+class SIAThreadPool:
+    """Fixed number of threads fed by a bounded queue."""
+
+    def __init__(self, config: ThreadPoolConfig, counts: Counter):
+        """Create the pool, the threads are started by start.
+
+        Arguments:
+            config {ThreadPoolConfig} -- Number of threads and size of the queue.
+            counts {Counter} -- Counter to keep the queue depth in.
+        """
+        self.config = config
+        self.counts = counts
+        self._queue: queue.Queue[tuple[Callable[..., None], tuple[Any, ...]] | None]
+        self._queue = queue.Queue(config.queue_size)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._waits = 0
+
+    @property
+    def started(self) -> bool:
+        """Return True if the threads are running."""
+        return bool(self._threads)
+
+    def start(self) -> None:
+        """Start the threads."""
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(
+                target=self._worker, name=f"SIAPoolThread-{i}", daemon=True
+            )
+            for i in range(self.config.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Let the threads handle the queued requests and stop them."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.counts.set_queue_depth(0)
+
+    def submit(self, func: Callable[..., None], *args: Any) -> None:
+        """Queue a call of func, waiting for room in the queue when it is full."""
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            with self._lock:
+                self._waits += 1
+            self._queue.put((func, args))
+        queued = self._queue.qsize()
+        self.counts.set_queue_depth(queued)
+        if queued > self._max_queued:
+            self._max_queued = queued
+
+    def metrics(self) -> ThreadPoolMetrics:
+        """Return the current state of the pool."""
+        with self._lock:
+            return ThreadPoolMetrics(
+                workers=self.config.workers,
+                busy=self._busy,
+                queued=self._queue.qsize(),
+                max_queued=self._max_queued,
+                completed=self._completed,
+                waits=self._waits,
+            )
+
+    def _worker(self) -> None:
+        """Handle queued requests until stopped."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            func, args = item
+            with self._lock:
+                self._busy += 1
+            self.counts.set_queue_depth(self._queue.qsize())
+            try:
+                func(*args)
+            except Exception as exp:  # pylint: disable=broad-except
+                _LOGGER.exception("Exception in SIA pool thread: %s", exp)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._completed += 1
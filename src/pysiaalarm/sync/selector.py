@@ -0,0 +1,306 @@
+"""Single threaded SIA server that handles all sockets with a selector."""
+from __future__ import annotations
+
+import logging
+import selectors
+import socket
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from ..account import SIAAccount
+from ..base_server import BaseSIAServer
+from ..const import EMPTY_BYTES
+from ..event import SIAEvent
+from ..utils import CommunicationsProtocol, Counter, SIAFramer
+from .pool import SIAThreadPool, ThreadPoolConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+RECV_SIZE = 4096
+DATAGRAM_SIZE = 8192
+
+
+@dataclass
+class SelectorConfig:
+    """Configuration of the selector server.
+
+    Arguments:
+        callback_workers {int} -- Number of threads that call the function.
+        callback_queue_size {int} -- Maximum number of events waiting for those
+            threads, when the queue is full the server waits until there is room.
+        backlog {int} -- Number of connections the TCP socket lets wait for accept.
+        datagram_batch {int} -- Maximum number of datagrams received, parsed and
+            answered at once, the size of the ring of receive buffers.
+    """
+
+    callback_workers: int = 2
+    callback_queue_size: int = 1000
+    backlog: int = 128
+    datagram_batch: int = 64
+
+
+class DatagramRing:
+    """Ring of preallocated buffers that datagrams are received into.
+
+    All waiting datagrams, up to the number of buffers, are received with non
+    blocking recvfrom_into calls, without creating a bytes object per datagram.
+    The received views are valid until the next receive.
+    """
+
+    __slots__ = ("_buffer", "_views")
+
+    def __init__(self, slots: int, slot_size: int = DATAGRAM_SIZE):
+        """Create the buffers.
+
+        Arguments:
+            slots {int} -- number of datagrams that can be received at once.
+            slot_size {int} -- size of each buffer, longer datagrams are cut off.
+        """
+        self._buffer = bytearray(slots * slot_size)
+        view = memoryview(self._buffer)
+        self._views = [
+            view[index * slot_size : (index + 1) * slot_size] for index in range(slots)
+        ]
+
+    def __len__(self) -> int:
+        """Return the number of buffers."""
+        return len(self._views)
+
+    def receive(self, sock: socket.socket) -> list[tuple[memoryview, Any]]:
+        """Receive the waiting datagrams, returns each datagram with its address."""
+        received = []
+        for view in self._views:
+            try:
+                size, address = sock.recvfrom_into(view)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as exp:  # pragma: no cover
+                _LOGGER.warning("Could not receive a datagram: %s", exp)
+                break
+            received.append((view[:size], address))
+        return received
+
+
+class _SelectorConnection:
+    """Open TCP connection of the selector server."""
+
+    __slots__ = ("sock", "address", "framer", "outgoing")
+
+    def __init__(self, sock: socket.socket, address: tuple[str, int]):
+        """Create the connection with a empty framer and nothing to send."""
+        self.sock = sock
+        self.address = address
+        self.framer = SIAFramer()
+        self.outgoing = bytearray()
+
+
+class SIASelectorServer(BaseSIAServer):
+    """Class for a SIA Server that handles all sockets in one thread.
+
+    The listening TCP socket and its connections, or the UDP socket, are non
+    blocking and registered with a selector (epoll on Linux). Frames are parsed
+    and answered in the thread of serve_forever, responses that do not fit in
+    the send buffer are sent when the socket is writable again. Datagrams are
+    received in batches into a DatagramRing, the whole batch is parsed and then
+    answered in a burst. The function is
+    called by a small pool of threads, so a slow function does not stop the
+    other connections.
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        accounts: dict[str, SIAAccount],
+        func: Callable[[SIAEvent], None] | None,
+        counts: Counter,
+        protocol: CommunicationsProtocol = CommunicationsProtocol.TCP,
+        config: SelectorConfig | None = None,
+    ):
+        """Create a SIA Server with a selector.
+
+        Arguments:
+            server_address Tuple[string, int] -- the address the server should listen on.
+            accounts Dict[str, SIAAccount] -- accounts as dict with account_id as key, SIAAccount object as value.  # pylint: disable=line-too-long
+            func Callable[[SIAEvent], None] -- Function called for each valid SIA event, that can be matched to a account.  # pylint: disable=line-too-long
+            counts Counter -- counter kept by client to give insights in how many errorous events were discarded of each type.  # pylint: disable=line-too-long
+            protocol CommunicationsProtocol -- TCP or UDP.
+            config SelectorConfig -- threads for the function, the TCP backlog and the datagram batch.  # pylint: disable=line-too-long
+        """
+        BaseSIAServer.__init__(self, accounts, counts, func=func)
+        self.protocol = protocol
+        self.config = config or SelectorConfig()
+        self.pool = SIAThreadPool(
+            ThreadPoolConfig(
+                self.config.callback_workers, self.config.callback_queue_size
+            ),
+            counts,
+        )
+        self.connections: dict[socket.socket, _SelectorConnection] = {}
+        tcp = protocol == CommunicationsProtocol.TCP
+        self.socket = socket.socket(
+            socket.AF_INET, socket.SOCK_STREAM if tcp else socket.SOCK_DGRAM
+        )
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.bind(server_address)
+            if tcp:
+                self.socket.listen(self.config.backlog)
+        except OSError:
+            self.socket.close()
+            raise
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()
+        self._ring = DatagramRing(self.config.datagram_batch) if not tcp else None
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Handle the sockets until shutdown is called."""
+        self._is_shut_down.clear()
+        self.pool.start()
+        selector = self._selector
+        selector.register(self._wakeup, selectors.EVENT_READ)
+        selector.register(self.socket, selectors.EVENT_READ)
+        tcp = self.protocol == CommunicationsProtocol.TCP
+        try:
+            while not self._shutdown_request:
+                for key, mask in selector.select(poll_interval):
+                    if key.data is not None:
+                        self._handle_connection(key.data, mask)
+                    elif key.fileobj is self._wakeup:
+                        self._drain_wakeup()
+                    elif tcp:
+                        self._accept()
+                    else:
+                        self._receive_datagrams()
+        finally:
+            selector.unregister(self._wakeup)
+            selector.unregister(self.socket)
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever and wait until it has returned."""
+        self._shutdown_request = True
+        try:
+            self._waker.send(b"\0")
+        except OSError:  # pragma: no cover
+            pass
+        self._is_shut_down.wait()
+
+    def server_close(self) -> None:
+        """Close all sockets and let the threads call the function for the queued events."""
+        for connection in list(self.connections.values()):
+            self._close(connection)
+        self.socket.close()
+        self._selector.close()
+        self._wakeup.close()
+        self._waker.close()
+        self.pool.stop()
+
+    def _drain_wakeup(self) -> None:
+        """Read the bytes that woke up the selector."""
+        try:
+            self._wakeup.recv(RECV_SIZE)
+        except BlockingIOError:  # pragma: no cover
+            pass
+
+    def _accept(self) -> None:
+        """Accept the waiting connections and watch them for data."""
+        while True:
+            try:
+                sock, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exp:  # pragma: no cover
+                _LOGGER.warning("Could not accept a connection: %s", exp)
+                return
+            sock.setblocking(False)
+            connection = _SelectorConnection(sock, address)
+            self.connections[sock] = connection
+            self._selector.register(sock, selectors.EVENT_READ, connection)
+
+    def _handle_connection(self, connection: _SelectorConnection, mask: int) -> None:
+        """Read from and write to a connection that is ready."""
+        if mask & selectors.EVENT_READ:
+            try:
+                data = connection.sock.recv(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):  # pragma: no cover
+                data = None
+            except OSError:
+                data = EMPTY_BYTES
+            if data == EMPTY_BYTES or self.shutdown_flag:
+                self._close(connection)
+                return
+            if data:
+                for frame in connection.framer.feed(data):
+                    event = self.parse_and_check_event(frame)
+                    if not event:
+                        continue
+                    connection.outgoing += event.create_response()
+                    if self.deliverable(event):
+                        self.pool.submit(self.func_wrap, event)
+        if connection.outgoing:
+            self._send(connection)
+
+    def _send(self, connection: _SelectorConnection) -> None:
+        """Send what fits in the send buffer, watch for writable for the rest."""
+        try:
+            sent = connection.sock.send(connection.outgoing)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError as exp:
+            _LOGGER.error("Exception caught while responding: %s", exp)
+            self._close(connection)
+            return
+        del connection.outgoing[:sent]
+        events = selectors.EVENT_READ
+        if connection.outgoing:
+            events |= selectors.EVENT_WRITE
+        if self._selector.get_key(connection.sock).events != events:
+            self._selector.modify(connection.sock, events, connection)
+
+    def _receive_datagrams(self) -> None:
+        """Receive the waiting datagrams into the ring, answer them in a burst and queue their events."""  # pylint: disable=line-too-long
+        assert self._ring is not None
+        received = self._ring.receive(self.socket)
+        if self.shutdown_flag:
+            return
+        responses = []
+        events = []
+        for data, address in received:
+            event = self.parse_and_check_event(data)
+            if not event:
+                continue
+            responses.append((event.create_response(), address))
+            if self.deliverable(event):
+                events.append(event)
+        sendto = self.socket.sendto
+        for response, address in responses:
+            try:
+                sendto(response, address)
+            except OSError as exp:
+                _LOGGER.error(
+                    "Exception caught while responding to %s, exception: %s",
+                    address,
+                    exp,
+                )
+        for event in events:
+            self.pool.submit(self.func_wrap, event)
+
+    def _close(self, connection: _SelectorConnection) -> None:
+        """Stop watching the connection and close it."""
+        if self.connections.pop(connection.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(connection.sock)
+        except (KeyError, ValueError):  # pragma: no cover
+            pass
+        connection.sock.close()
@@ -2,14 +2,21 @@
 from __future__ import annotations
 
 import logging
+import selectors
+import socket
+import threading
+from collections import deque
 from collections.abc import Callable
-from socketserver import ThreadingTCPServer, ThreadingUDPServer
+from socketserver import TCPServer, ThreadingTCPServer, ThreadingUDPServer, UDPServer
+from typing import Any
 
 from ..account import SIAAccount
 from ..base_server import BaseSIAServer
+from ..const import EMPTY_BYTES
 from ..event import SIAEvent
-from ..utils import Counter
+from ..utils import Counter, SIAFramer
 from .handler import SIATCPHandler, SIAUDPHandler
+from .pool import SIAThreadPool, ThreadPoolConfig
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,7 +31,7 @@ class SIATCPServer(ThreadingTCPServer, BaseSIAServer):
         self,
         server_address: tuple[str, int],
         accounts: dict[str, SIAAccount],
-        func: Callable[[SIAEvent], None],
+        func: Callable[[SIAEvent], None] | None,
         counts: Counter,
     ):
         """Create a SIA TCP Server.
@@ -49,7 +56,7 @@ class SIAUDPServer(ThreadingUDPServer, BaseSIAServer):
         self,
         server_address: tuple[str, int],
         accounts: dict[str, SIAAccount],
-        func: Callable[[SIAEvent], None],
+        func: Callable[[SIAEvent], None] | None,
         counts: Counter,
     ):
         """Create a SIA UDP Server.
@@ -62,3 +69,206 @@ class SIAUDPServer(ThreadingUDPServer, BaseSIAServer):
         """
         ThreadingUDPServer.__init__(self, server_address, SIAUDPHandler)
         BaseSIAServer.__init__(self, accounts, counts, func=func)
+
+
+class PoolingMixIn:
+    """Mix-in class to handle each request in a thread of a bounded pool."""
+
+    pool: SIAThreadPool
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Start the pool and handle requests until shutdown."""
+        self.pool.start()
+        super().serve_forever(poll_interval)  # type: ignore
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Queue the request for a thread of the pool."""
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request: Any, client_address: Any) -> None:
+        """Handle the request in a thread of the pool, like ThreadingMixIn."""
+        try:
+            self.finish_request(request, client_address)  # type: ignore
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)  # type: ignore
+        finally:
+            self.shutdown_request(request)  # type: ignore
+
+    def server_close(self) -> None:
+        """Close the server and let the pool handle the queued requests."""
+        super().server_close()  # type: ignore
+        self.pool.stop()
+
+
+class _PoolConnection:
+    """Open connection of the pooled TCP server."""
+
+    __slots__ = ("sock", "address", "framer")
+
+    def __init__(self, sock: socket.socket, address: Any):
+        """Create the connection with a empty framer."""
+        self.sock = sock
+        self.address = address
+        self.framer = SIAFramer()
+
+
+class SIAPoolTCPServer(TCPServer, BaseSIAServer):
+    """Class for a SIA TCP Server with a bounded pool of threads.
+
+    The open connections are watched by a single poller thread, when a
+    connection has data, one read is handled by a thread of the pool, after
+    which the poller watches the connection again. Idle connections do not
+    take a thread and the frames of a connection are handled in order.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        accounts: dict[str, SIAAccount],
+        func: Callable[[SIAEvent], None] | None,
+        counts: Counter,
+        pool: ThreadPoolConfig,
+    ):
+        """Create a SIA TCP Server with a thread pool.
+
+        Arguments:
+            server_address Tuple[string, int] -- the address the server should listen on.
+            accounts Dict[str, SIAAccount] -- accounts as dict with account_id as key, SIAAccount object as value.  # pylint: disable=line-too-long
+            func Callable[[SIAEvent], None] -- Function called for each valid SIA event, that can be matched to a account.  # pylint: disable=line-too-long
+            counts Counter -- counter kept by client to give insights in how many errorous events were discarded of each type.  # pylint: disable=line-too-long
+            pool ThreadPoolConfig -- number of threads and size of the queue of the pool.
+        """
+        TCPServer.__init__(self, server_address, SIATCPHandler)
+        BaseSIAServer.__init__(self, accounts, counts, func=func)
+        self.pool = SIAThreadPool(pool, counts)
+        self.connections: set[_PoolConnection] = set()
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._watch: deque[_PoolConnection] = deque()
+        self._poller: threading.Thread | None = None
+        self._closing = False
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Start the pool and the poller and accept connections until shutdown."""
+        self.pool.start()
+        self._poller = threading.Thread(
+            target=self._poll, name="SIAPollerThread", daemon=True
+        )
+        self._poller.start()
+        super().serve_forever(poll_interval)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Add a new connection to the poller."""
+        connection = _PoolConnection(request, client_address)
+        with self._lock:
+            self.connections.add(connection)
+        self._watch_again(connection)
+
+    def _watch_again(self, connection: _PoolConnection) -> None:
+        """Let the poller watch the connection for data."""
+        self._watch.append(connection)
+        try:
+            self._waker.send(b"\0")
+        except OSError:  # pragma: no cover
+            pass
+
+    def _poll(self) -> None:
+        """Pass one read of each connection with data to the pool."""
+        selector = self._selector
+        while not self._closing:
+            for key, _ in selector.select(0.5):
+                if key.data is None:
+                    try:
+                        self._wakeup.recv(4096)
+                    except BlockingIOError:  # pragma: no cover
+                        pass
+                    continue
+                selector.unregister(key.fileobj)
+                self.pool.submit(self._read, key.data)
+            while self._watch:
+                connection = self._watch.popleft()
+                if connection in self.connections:
+                    selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+    def _read(self, connection: _PoolConnection) -> None:
+        """Read from the connection, respond to the frames and call the function."""
+        try:
+            data = connection.sock.recv(4096)
+        except OSError:
+            data = EMPTY_BYTES
+        if not data or self.shutdown_flag:
+            self._close(connection)
+            return
+        for frame in connection.framer.feed(data):
+            event = self.parse_and_check_event(frame)
+            if not event:
+                continue
+            try:
+                connection.sock.sendall(event.create_response())
+            except OSError as exp:
+                _LOGGER.error(
+                    "Exception caught while responding to event: %s, exception: %s",
+                    event,
+                    exp,
+                )
+                self._close(connection)
+                return
+            self.func_wrap(event)
+        self._watch_again(connection)
+
+    def _close(self, connection: _PoolConnection) -> None:
+        """Close the connection and forget it."""
+        with self._lock:
+            self.connections.discard(connection)
+        self.shutdown_request(connection.sock)
+
+    def server_close(self) -> None:
+        """Stop the poller and the pool and close all connections."""
+        self._closing = True
+        if self._poller is not None:
+            self._waker.send(b"\0")
+            self._poller.join()
+            self._poller = None
+        self.pool.stop()
+        with self._lock:
+            connections = list(self.connections)
+        for connection in connections:
+            self._close(connection)
+        self._selector.close()
+        self._wakeup.close()
+        self._waker.close()
+        super().server_close()
+
+
+class SIAPoolUDPServer(PoolingMixIn, UDPServer, BaseSIAServer):
+    """Class for a SIA UDP Server that handles datagrams in a bounded pool of threads."""
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        accounts: dict[str, SIAAccount],
+        func: Callable[[SIAEvent], None] | None,
+        counts: Counter,
+        pool: ThreadPoolConfig,
+    ):
+        """Create a SIA UDP Server with a thread pool.
+
+        Arguments:
+            server_address Tuple[string, int] -- the address the server should listen on.
+            accounts Dict[str, SIAAccount] -- accounts as dict with account_id as key, SIAAccount object as value.  # pylint: disable=line-too-long
+            func Callable[[SIAEvent], None] -- Function called for each valid SIA event, that can be matched to a account.  # pylint: disable=line-too-long
+            counts Counter -- counter kept by client to give insights in how many errorous events were discarded of each type.  # pylint: disable=line-too-long
+            pool ThreadPoolConfig -- number of threads and size of the queue of the pool.
+        """
+        UDPServer.__init__(self, server_address, SIAUDPHandler)
+        BaseSIAServer.__init__(self, accounts, counts, func=func)
+        self.pool = SIAThreadPool(pool, counts)
@@ -2,12 +2,29 @@
 from __future__ import annotations
 
 from ..data.data import (
+    ADM_CODES,
+    SIA_CODE_REGISTRY,
+    SIA_XDATA_REGISTRY,
     SIACode,
     SIAXData,
+    SIAXDataSchema,
     _load_adm_mapping,
     _load_sia_codes,
     _load_xdata,
+    lookup_adm,
 )
-from .counter import Counter
-from .enums import CommunicationsProtocol, MessageTypes, ResponseType
-from .regexes import MAIN_MATCHER, OH_MATCHER, _get_matcher
+from .cipher import SIACipher
+from .clock import Clock, FakeClock
+from .counter import Counter, SharedCounts
+from .crc import CRC16, crc16, crc16_batch, crc16_hex
+from .dedupe import DedupeCache, dedupe_key
+from .enums import (
+    CommunicationsProtocol,
+    DispatchPolicy,
+    MessageTypes,
+    ResponseType,
+)
+from .framer import SIAFramer
+from .regexes import MAIN_MATCHER, MAIN_MATCHER_BYTES, OH_MATCHER, _get_matcher
+from .response import ResponseTemplate
+from .timestamp import parse_timestamp
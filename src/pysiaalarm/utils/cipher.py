@@ -0,0 +1,59 @@
+"""AES cipher helper for encrypted SIA accounts."""
+from __future__ import annotations
+
+from threading import Lock
+
+from Crypto.Cipher import AES
+
+from ..const import IV
+
+BLOCK_SIZE = 16
+
+
+def _check_size(data: bytes) -> None:
+    """Raise a ValueError when data is not aligned to the block size."""
+    if len(data) % BLOCK_SIZE:
+        raise ValueError("Data must be padded to 16 byte boundary in CBC mode")
+
+
+class SIACipher:
+    """AES-CBC cipher with the fixed SIA IV, with the key schedule expanded once.
+
+    Decryption uses a stateless ECB cipher and chains the blocks afterwards,
+    encryption reuses one CBC cipher and corrects the first block for the
+    chaining value left by the previous message.
+    """
+
+    def __init__(self, key: bytes):
+        """Create the ciphers for a key."""
+        self._ecb = AES.new(key, AES.MODE_ECB)
+        self._cbc = AES.new(key, AES.MODE_CBC, IV)
+        self._iv = int.from_bytes(IV, "big")
+        self._last_block = self._iv
+        self._lock = Lock()
+
+    def decrypt(self, data: bytes) -> bytes:
+        """Decrypt data, must be a multiple of the block size."""
+        _check_size(data)
+        if not data:
+            return b""
+        size = len(data)
+        plain = int.from_bytes(self._ecb.decrypt(data), "big")
+        chain = (self._iv << ((size - BLOCK_SIZE) * 8)) | int.from_bytes(
+            data[:-BLOCK_SIZE], "big"
+        )
+        return (plain ^ chain).to_bytes(size, "big")
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Encrypt data, must be a multiple of the block size."""
+        _check_size(data)
+        if not data:
+            return b""
+        with self._lock:
+            first = int.from_bytes(data[:BLOCK_SIZE], "big")
+            first ^= self._iv ^ self._last_block
+            result = self._cbc.encrypt(
+                first.to_bytes(BLOCK_SIZE, "big") + data[BLOCK_SIZE:]
+            )
+            self._last_block = int.from_bytes(result[-BLOCK_SIZE:], "big")
+        return result
@@ -0,0 +1,88 @@
+"""Clock for the timestamps of responses and the timeband check of events."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone, tzinfo
+
+TIMESTAMP_FORMAT = "_%H:%M:%S,%m-%d-%Y"
+
+
+class Clock:
+    """Clock that caches the current time per timezone.
+
+    The current time is read once per resolution seconds and per timezone,
+    the timestamp string for responses is rendered once per second and
+    timezone, so converting to the timezone and formatting is not done for
+    every event.
+    """
+
+    def __init__(
+        self, resolution: float = 0.1, time_func: Callable[[], float] = time.time
+    ) -> None:
+        """Create the clock.
+
+        Arguments:
+            resolution {float} -- seconds that the current time is cached for.
+            time_func {Callable[[], float]} -- function that returns the time in
+                seconds since the epoch, time.time by default.
+        """
+        self.resolution = resolution
+        self._time = time_func
+        self._now: dict[tzinfo | None, tuple[float, datetime]] = {}
+        self._timestamps: dict[tzinfo, tuple[int, str]] = {}
+
+    def time(self) -> float:
+        """Return the time in seconds since the epoch."""
+        return self._time()
+
+    def now(self, device_timezone: tzinfo | None = None) -> datetime:
+        """Return the current time in the timezone, or the local naive time for None."""
+        current = self._time()
+        cached = self._now.get(device_timezone)
+        if cached is not None and 0 <= current - cached[0] < self.resolution:
+            return cached[1]
+        now = datetime.fromtimestamp(current, device_timezone)
+        self._now[device_timezone] = (current, now)
+        return now
+
+    def timestamp(self, device_timezone: tzinfo | None = None) -> str:
+        """Return the current time as _HH:MM:SS,MM-DD-YYYY, in UTC for None."""
+        device_timezone = device_timezone or timezone.utc
+        second = int(self._time())
+        cached = self._timestamps.get(device_timezone)
+        if cached is not None and cached[0] == second:
+            return cached[1]
+        rendered = datetime.fromtimestamp(second, device_timezone).strftime(
+            TIMESTAMP_FORMAT
+        )
+        self._timestamps[device_timezone] = (second, rendered)
+        return rendered
+
+
+class FakeClock(Clock):
+    """Clock with a time that is set by hand, for tests and benchmarks."""
+
+    def __init__(self, start: datetime | float = 0.0, resolution: float = 0.1) -> None:
+        """Create the clock at start.
+
+        Arguments:
+            start {datetime | float} -- the time to start at, as a aware datetime
+                or seconds since the epoch.
+            resolution {float} -- seconds that the current time is cached for.
+        """
+        super().__init__(resolution, self._current)
+        self.current = 0.0
+        self.set(start)
+
+    def _current(self) -> float:
+        """Return the time that was set."""
+        return self.current
+
+    def set(self, when: datetime | float) -> None:
+        """Set the time, as a aware datetime or seconds since the epoch."""
+        self.current = when.timestamp() if isinstance(when, datetime) else when
+
+    def advance(self, seconds: float) -> None:
+        """Move the time forward by seconds."""
+        self.current += seconds
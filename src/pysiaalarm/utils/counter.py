@@ -1,15 +1,22 @@
 """Counter helper class."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import multiprocessing
+from dataclasses import dataclass, fields
+from multiprocessing.context import BaseContext
 from typing import Optional
 
 from ..const import (
     COUNTER_ACCOUNT,
     COUNTER_CODE,
     COUNTER_CRC,
+    COUNTER_DEDUPE_HIT,
+    COUNTER_DEDUPE_MISS,
+    COUNTER_DROPPED,
     COUNTER_EVENTS,
     COUNTER_FORMAT,
+    COUNTER_HEARTBEAT,
+    COUNTER_QUEUE_DEPTH,
     COUNTER_TIMESTAMP,
     COUNTER_USER_CODE,
     COUNTER_VALID,
@@ -28,6 +35,11 @@ class Counter:
     error_user_function: int = 0
     events: int = 0
     valid_events: int = 0
+    dropped_events: int = 0
+    queue_depth: int = 0
+    dedupe_hits: int = 0
+    dedupe_misses: int = 0
+    heartbeats: int = 0
 
     def increment_error_account(self) -> None:
         """Increment the error_account count."""
@@ -61,6 +73,26 @@ class Counter:
         """Increment the valid_events count."""
         self.valid_events += 1
 
+    def increment_dropped_events(self) -> None:
+        """Increment the dropped_events count."""
+        self.dropped_events += 1
+
+    def increment_dedupe_hits(self) -> None:
+        """Increment the dedupe_hits count."""
+        self.dedupe_hits += 1
+
+    def increment_dedupe_misses(self) -> None:
+        """Increment the dedupe_misses count."""
+        self.dedupe_misses += 1
+
+    def increment_heartbeats(self) -> None:
+        """Increment the heartbeats count."""
+        self.heartbeats += 1
+
+    def set_queue_depth(self, depth: int) -> None:
+        """Set the queue_depth gauge."""
+        self.queue_depth = depth
+
     def get(self, item: str) -> Optional[int]:
         """Get the right counter."""
         if item == COUNTER_ACCOUNT:
@@ -79,6 +111,16 @@ class Counter:
             return self.valid_events
         if item == COUNTER_EVENTS:
             return self.events
+        if item == COUNTER_DROPPED:
+            return self.dropped_events
+        if item == COUNTER_QUEUE_DEPTH:
+            return self.queue_depth
+        if item == COUNTER_DEDUPE_HIT:
+            return self.dedupe_hits
+        if item == COUNTER_DEDUPE_MISS:
+            return self.dedupe_misses
+        if item == COUNTER_HEARTBEAT:
+            return self.heartbeats
         return None  # pragma: no cover
 
     def increment(self, item: str) -> None:  # pragma: no cover
@@ -106,3 +148,62 @@ class Counter:
             return
         if item == COUNTER_EVENTS:
             self.increment_events()
+            return
+        if item == COUNTER_DROPPED:
+            self.increment_dropped_events()
+            return
+        if item == COUNTER_DEDUPE_HIT:
+            self.increment_dedupe_hits()
+            return
+        if item == COUNTER_DEDUPE_MISS:
+            self.increment_dedupe_misses()
+            return
+        if item == COUNTER_HEARTBEAT:
+            self.increment_heartbeats()
+
+
+COUNTER_FIELDS = tuple(field.name for field in fields(Counter))
+
+
+class SharedCounts:
+    """Counters of a number of worker processes, kept in shared memory.
+
+    Each worker has a row with a value per field of Counter, the workers store
+    their own counts in their row and the parent process adds the rows up.
+    The workers store their counts every flush interval, so the rows can lag
+    the counts of the workers by up to that interval.
+    """
+
+    def __init__(self, workers: int, context: BaseContext | None = None) -> None:
+        """Create the shared memory for the workers.
+
+        Arguments:
+            workers {int} -- number of workers that store their counts.
+            context {BaseContext} -- multiprocessing context used to create
+                the workers, the default context when None.
+        """
+        context = context or multiprocessing.get_context()
+        self.workers = workers
+        self._array = context.Array("q", workers * len(COUNTER_FIELDS))
+
+    def store(self, worker: int, counts: Counter) -> None:
+        """Store the counts of a worker in its row."""
+        start = worker * len(COUNTER_FIELDS)
+        with self._array.get_lock():
+            self._array[start : start + len(COUNTER_FIELDS)] = [
+                getattr(counts, name) for name in COUNTER_FIELDS
+            ]
+
+    def worker(self, worker: int) -> Counter:
+        """Return the counts that were stored by a worker."""
+        start = worker * len(COUNTER_FIELDS)
+        with self._array.get_lock():
+            values = self._array[start : start + len(COUNTER_FIELDS)]
+        return Counter(*values)
+
+    def total(self) -> Counter:
+        """Return the counts of all workers added up."""
+        with self._array.get_lock():
+            values = self._array[:]
+        size = len(COUNTER_FIELDS)
+        return Counter(*(sum(values[index::size]) for index in range(size)))
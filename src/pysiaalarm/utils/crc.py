@@ -0,0 +1,73 @@
+"""Table driven CRC-16 (ARC, poly 0xA001 reflected) used by SIA DC-09."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+CRC16_POLY = 0xA001
+
+
+def _build_table() -> tuple[int, ...]:
+    """Build the 256 entry lookup table for the reflected polynomial."""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC16_POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _build_table()
+
+
+def crc16(data: BytesLike, crc: int = 0) -> int:
+    """Calculate the CRC over data, optionally continuing from a previous crc value."""
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def crc16_hex(data: BytesLike, crc: int = 0) -> str:
+    """Calculate the CRC over data and format it as used in SIA messages."""
+    return "%04X" % crc16(data, crc)
+
+
+def crc16_batch(frames: Iterable[BytesLike]) -> list[str]:
+    """Calculate the formatted CRC of each frame in one call."""
+    table = CRC16_TABLE
+    result = []
+    for frame in frames:
+        crc = 0
+        for byte in frame:
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        result.append("%04X" % crc)
+    return result
+
+
+class CRC16:
+    """Incremental CRC-16 calculation, for data that arrives in parts."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, data: BytesLike | None = None):
+        """Create the CRC, optionally with a first part of the data."""
+        self.value = 0
+        if data:
+            self.update(data)
+
+    def update(self, data: BytesLike) -> CRC16:
+        """Add data to the calculation."""
+        self.value = crc16(data, self.value)
+        return self
+
+    def hexdigest(self) -> str:
+        """Return the formatted CRC of all data so far."""
+        return "%04X" % self.value
+
+    def reset(self) -> None:
+        """Reset the calculation."""
+        self.value = 0
@@ -0,0 +1,89 @@
+"""Cache of answered frames, to recognize frames that are sent again."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .crc import crc16_hex
+
+DedupeKey = tuple[bytes, bytes, bytes]
+
+
+def dedupe_key(line: bytes | bytearray | memoryview) -> Optional[DedupeKey]:
+    """Return the account, sequence and CRC of a stripped frame, without parsing it.
+
+    The frame starts with the CRC and the length, followed by the quoted message
+    type, the sequence, the receiver and line and #account[, None is returned
+    when the frame does not look like that or when the CRC does not match the
+    message, so a changed frame is never taken for one that was answered.
+    """
+    raw = bytes(line)
+    if len(raw) < 18 or raw[8] != 34:  # 34 is '"'
+        return None
+    if crc16_hex(memoryview(raw)[8:]).encode() != raw[:4]:
+        return None
+    quote = raw.find(b'"', 9)
+    if quote == -1:
+        return None
+    hashtag = raw.find(b"#", quote)
+    if hashtag == -1:
+        return None
+    bracket = raw.find(b"[", hashtag)
+    if bracket == -1:
+        return None
+    return raw[hashtag + 1 : bracket], raw[quote + 1 : quote + 5], raw[:4]
+
+
+class DedupeCache:
+    """Bounded LRU cache with a time to live, for frames that were answered with ACK.
+
+    Alarms send a frame again, with the same account, sequence and CRC, when
+    the ACK was late or lost. For those frames the server finds the event in
+    this cache and answers again, without decrypting and parsing the frame or
+    calling the function a second time. Getting and putting are O(1), the
+    least recently used entry is removed when the cache is full.
+    """
+
+    def __init__(self, size: int = 1024, ttl: float = 20.0) -> None:
+        """Create the cache.
+
+        Arguments:
+            size {int} -- maximum number of frames that are remembered.
+            ttl {float} -- seconds that a frame is remembered.
+        """
+        if size < 1:
+            raise ValueError("The size of the cache should be at least 1.")
+        self.size = size
+        self.ttl = ttl
+        self._entries: OrderedDict[DedupeKey, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of remembered frames, including expired ones."""
+        return len(self._entries)
+
+    def get(self, key: DedupeKey, now: float) -> Any | None:
+        """Return the value remembered for the key at time now, or None if it is not there or expired."""  # pylint: disable=line-too-long
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: DedupeKey, value: Any, now: float) -> None:
+        """Remember the value for the key at time now, removing the least recently used when full."""  # pylint: disable=line-too-long
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all frames."""
+        with self._lock:
+            self._entries.clear()
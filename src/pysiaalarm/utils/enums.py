@@ -35,6 +35,14 @@ class ResponseType(AutoName):
     RSP = auto()
 
 
+class DispatchPolicy(AutoName):
+    """Policy for events that arrive when the dispatch queue is full."""
+
+    BLOCK = auto()
+    DROP_OLDEST = auto()
+    NAK = auto()
+
+
 class MessageTypes(Enum):
     """Message type enumerator for SIA."""
 
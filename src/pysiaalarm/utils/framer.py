@@ -0,0 +1,61 @@
+"""Framer for SIA DC-09 frames on a stream connection."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+FRAME_START = 0x0A  # \n
+FRAME_END = 0x0D  # \r
+MAX_FRAME_SIZE = 4096
+
+
+class SIAFramer:
+    """Split a stream of bytes into the LF...CR frames, one framer per connection.
+
+    The frames are given back as memoryviews on the internal buffer, these are
+    only valid until the next frame is requested and should not be kept.
+    Data without a leading LF and no CR is handled as a single unframed
+    message, like the previous read based servers did, data that starts with
+    a LF is kept until the CR arrives.
+    """
+
+    __slots__ = ("_buffer", "max_size")
+
+    def __init__(self, max_size: int = MAX_FRAME_SIZE):
+        """Create the framer with a empty buffer."""
+        self._buffer = bytearray()
+        self.max_size = max_size
+
+    @property
+    def pending(self) -> int:
+        """Return the number of bytes waiting for the end of a frame."""
+        return len(self._buffer)
+
+    def clear(self) -> None:
+        """Drop all buffered data."""
+        self._buffer.clear()
+
+    def feed(self, data: bytes | bytearray | memoryview) -> Iterator[memoryview]:
+        """Add data and give back every complete frame, in order."""
+        buffer = self._buffer
+        buffer += data
+        start = 0
+        size = len(buffer)
+        try:
+            with memoryview(buffer) as view:
+                while start < size:
+                    end = buffer.find(FRAME_END, start)
+                    if end == -1:
+                        if (
+                            buffer[start] == FRAME_START
+                            and size - start <= self.max_size
+                        ):
+                            break
+                        end = size
+                    frame = view[start:end]
+                    start = end + 1
+                    try:
+                        yield frame
+                    finally:
+                        frame.release()
+        finally:
+            del buffer[:start]
@@ -30,6 +30,7 @@ main_regex = r"""
 (?P<rest>.*)
 """
 MAIN_MATCHER = re.compile(main_regex, re.X)
+MAIN_MATCHER_BYTES = re.compile(main_regex.encode("ascii"), re.X)
 
 sia_content_regex = r"""
 [#]?(?P<account>[A-Fa-f0-9]{3,16})?
@@ -0,0 +1,68 @@
+"""Response templates, with the static part of a response and its CRC prepared once."""
+from __future__ import annotations
+
+from .crc import crc16
+
+SEQUENCE_LENGTH = 4
+
+
+class ResponseTemplate:
+    """Template for responses that only differ in sequence and a variable tail.
+
+    A response is the prefix, the sequence, the static part and a variable part,
+    like '"ACK"' 1234 'R0L0#AAA[]' and the encrypted timestamp. The CRC-16 ARC
+    has no initial value or final xor, so the CRC of two messages of the same
+    length xor'ed is the xor of their CRCs. The CRC of the static parts with
+    zero bytes in place of the sequence is calculated once and the CRC of each
+    sequence byte at its place is cached, so per response only the CRC over
+    the variable part is calculated.
+    """
+
+    __slots__ = ("prefix", "static", "_static_crc", "_positions")
+
+    def __init__(self, prefix: str, static: str) -> None:
+        """Create the template.
+
+        Arguments:
+            prefix {str} -- the part before the sequence.
+            static {str} -- the part between the sequence and the variable part.
+        """
+        self.prefix = prefix
+        self.static = static
+        self._static_crc = crc16(
+            b"".join(
+                (
+                    prefix.encode("ascii"),
+                    bytes(SEQUENCE_LENGTH),
+                    static.encode("ascii"),
+                )
+            )
+        )
+        self._positions: tuple[dict[int, int], ...] = tuple(
+            {} for _ in range(SEQUENCE_LENGTH)
+        )
+
+    def _sequence_crc(self, sequence: bytes) -> int:
+        """Return the CRC of the prefix, sequence and static part."""
+        crc = self._static_crc
+        for place, byte in enumerate(sequence):
+            cache = self._positions[place]
+            part = cache.get(byte)
+            if part is None:
+                part = cache[byte] = crc16(
+                    bytes((byte,))
+                    + bytes(SEQUENCE_LENGTH - place - 1 + len(self.static))
+                )
+            crc ^= part
+        return crc
+
+    def render(self, sequence: str, variable: str = "") -> bytes:
+        """Create the framed response for the sequence and the variable part."""
+        res = f"{self.prefix}{sequence}{self.static}{variable}"
+        if len(sequence) == SEQUENCE_LENGTH and sequence.isascii():
+            crc = self._sequence_crc(sequence.encode("ascii"))
+            if variable:
+                crc = crc16(variable.encode(), crc)
+        else:
+            crc = crc16(res.encode())
+        return f"\n{crc:04X}{len(res):04X}{res}\r".encode("ascii")
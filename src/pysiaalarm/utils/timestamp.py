@@ -0,0 +1,39 @@
+"""Parser for the timestamps of SIA DC-09 messages."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+TIMESTAMP_FORMAT = "%H:%M:%S,%m-%d-%Y"
+_SEPARATORS = ((2, ":"), (5, ":"), (8, ","), (11, "-"), (14, "-"))
+
+
+@lru_cache(maxsize=256)
+def parse_timestamp(value: str) -> datetime:
+    """Parse a HH:MM:SS,MM-DD-YYYY timestamp as a UTC datetime.
+
+    The fields are sliced from their fixed places, timestamps in other forms
+    that strptime accepts, like single digit fields, are parsed by strptime.
+    Timestamps of events that arrive in the same second are parsed once.
+
+    Raises:
+        ValueError: If the value is not a valid timestamp.
+
+    """
+    if (
+        len(value) == 19
+        and value.isascii()
+        and all(value[place] == separator for place, separator in _SEPARATORS)
+    ):
+        digits = value[:2] + value[3:5] + value[6:8] + value[9:11] + value[12:14]
+        if (digits + value[15:]).isdigit():
+            return datetime(
+                int(value[15:]),
+                int(value[9:11]),
+                int(value[12:14]),
+                int(value[:2]),
+                int(value[3:5]),
+                int(value[6:8]),
+                tzinfo=timezone.utc,
+            )
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
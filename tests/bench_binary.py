@@ -0,0 +1,65 @@
+#!/usr/bin/python
+"""Benchmark the size and speed of the binary format against JSON.
+
+Run with: python -m tests.bench_binary
+"""
+import io
+import timeit
+
+from pysiaalarm import SIAAccount, SIAEvent, decode_events, encode_events
+from pysiaalarm.binary import EventReader, EventWriter
+
+from .test_utils import ACCOUNT, KEY, create_test_line
+
+NUMBER = 10000
+
+
+def _events(accounts, key):
+    """Create events with different sequences and codes."""
+    codes = ("RP", "BA", "CL", "OP")
+    return [
+        SIAEvent.from_line(
+            create_test_line(
+                account=ACCOUNT, key=key, code=codes[i % len(codes)], seq=f"{i:04d}"
+            ),
+            accounts,
+        )
+        for i in range(NUMBER)
+    ]
+
+
+def _best(stmt) -> float:
+    """Return the best time per event in microseconds."""
+    return min(timeit.repeat(stmt, number=1, repeat=5)) / NUMBER * 1e6
+
+
+def main():
+    """Run the benchmark and print the results."""
+    accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+    for key in (None, KEY):
+        label = "encrypted" if key else "plain"
+        events = _events(accounts, key)
+        data = encode_events(events)
+        lines = b"\n".join(event.to_json() for event in events)
+        print(f"{label:9}, binary size: {len(data) / NUMBER:8.1f} bytes per event")
+        print(f"{label:9}, json size:   {len(lines) / NUMBER:8.1f} bytes per event")
+        encode = _best(lambda: encode_events(events))
+        encode_json = _best(lambda: [event.to_json() for event in events])
+        decode = _best(lambda: list(decode_events(data)))
+        print(f"{label:9}, binary encode: {encode:8.3f} us")
+        print(f"{label:9}, json encode:   {encode_json:8.3f} us")
+        print(f"{label:9}, binary decode: {decode:8.3f} us")
+        if not key:
+            # encrypted events can not be created from a dict without the account
+            decode_json = _best(
+                lambda: [SIAEvent.from_json(line) for line in lines.split(b"\n")]
+            )
+            print(f"{label:9}, json decode:   {decode_json:8.3f} us")
+        stream = io.BytesIO()
+        EventWriter(stream).write_all(events)
+        stream.seek(0)
+        assert len(list(EventReader(stream))) == NUMBER
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/python
+"""Benchmark decrypt_content + create_response for a encrypted account.
+
+Run with: python -m tests.bench_cipher
+"""
+import timeit
+from unittest.mock import patch
+
+from Crypto.Cipher import AES
+
+from pysiaalarm import SIAAccount, SIAEvent
+from pysiaalarm.const import IV
+from pysiaalarm.event import BaseEvent
+
+from .test_utils import ACCOUNT, KEY, create_test_line
+
+NUMBER = 5000
+
+
+def _legacy_crypter(self):
+    """Create a new cipher for each call, as done before the account cache."""
+    return AES.new(self.sia_account.key_b, AES.MODE_CBC, IV)
+
+
+def _throughput(event: SIAEvent) -> float:
+    """Return the number of decrypt + response cycles per second."""
+
+    def cycle():
+        event.decrypt_content()
+        event.create_response()
+
+    return NUMBER / min(timeit.repeat(cycle, number=NUMBER, repeat=5))
+
+
+def main():
+    """Run the benchmark and print the results."""
+    account = SIAAccount(ACCOUNT, KEY, allowed_timeband=None)
+    line = create_test_line(account=ACCOUNT, key=KEY, code="RP")
+    event = SIAEvent.from_line(line, {ACCOUNT: account})
+    with patch.object(BaseEvent, "_get_crypter", _legacy_crypter):
+        legacy = _throughput(event)
+    cached = _throughput(event)
+    print(f"AES.new per call:      {legacy:10.0f} msg/s per account")
+    print(f"Cached account cipher: {cached:10.0f} msg/s per account")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+"""Benchmark the memory used to keep events, as SIAEvent and as CompactEvent.
+
+Run with: python -m tests.bench_compact_event
+"""
+import gc
+import timeit
+import tracemalloc
+
+from pysiaalarm import SIAAccount, SIAEvent
+from pysiaalarm.compact import CompactEvent
+
+from .test_utils import ACCOUNT, KEY, create_test_line
+
+NUMBER = 10000
+
+
+def _lines(key):
+    """Create lines with different sequences and codes."""
+    codes = ("RP", "BA", "CL", "OP")
+    return [
+        create_test_line(
+            account=ACCOUNT, key=key, code=codes[i % len(codes)], seq=f"{i % 10000:04d}"
+        ).encode()
+        for i in range(NUMBER)
+    ]
+
+
+def _bytes_per_event(lines, accounts, convert) -> float:
+    """Return the memory kept per event, as measured by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [convert(SIAEvent.from_bytes(line, accounts)) for line in lines]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(kept) == len(lines)
+    return (after - before) / len(lines)
+
+
+def main():
+    """Run the benchmark and print the results."""
+    accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+    for key in (None, KEY):
+        label = "encrypted" if key else "plain"
+        lines = _lines(key)
+        event = _bytes_per_event(lines, accounts, lambda e: e)
+        compact = _bytes_per_event(lines, accounts, CompactEvent.from_event)
+        print(f"{label:9}, SIAEvent:     {event:8.0f} bytes per event")
+        print(f"{label:9}, CompactEvent: {compact:8.0f} bytes per event")
+        sample = SIAEvent.from_bytes(lines[0], accounts)
+        small = CompactEvent.from_event(sample)
+        to_compact = min(
+            timeit.repeat(lambda: CompactEvent.from_event(sample), number=NUMBER)
+        )
+        from_compact = min(timeit.repeat(small.to_event, number=NUMBER))
+        print(f"{label:9}, from_event:   {to_compact / NUMBER * 1e6:8.3f} us")
+        print(f"{label:9}, to_event:     {from_compact / NUMBER * 1e6:8.3f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+"""Benchmark the SIA code lookup done for every event.
+
+Run with: python -m tests.bench_sia_codes
+"""
+import timeit
+
+from pysiaalarm import SIAEvent
+from pysiaalarm.data.sia_codes import SIA_CODES
+from pysiaalarm.utils import SIA_CODE_REGISTRY, SIACode
+
+from .test_utils import ACCOUNT, create_test_line
+
+NUMBER = 20000
+
+
+def lookup_rebuilt(code: str):
+    """Lookup as done before the registry, rebuilding all codes for each event."""
+    return {key: SIACode(**value) for (key, value) in SIA_CODES.items()}.get(code)
+
+
+def lookup_registry(code: str):
+    """Lookup in the shared registry."""
+    return SIA_CODE_REGISTRY.get(code)
+
+
+def _per_event(stmt, number: int = NUMBER) -> float:
+    """Return the best time per call in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    """Run the benchmark and print the results."""
+    line = create_test_line(account=ACCOUNT, key=None, code="RP")
+    rebuilt = _per_event(lambda: lookup_rebuilt("RP"), 500)
+    registry = _per_event(lambda: lookup_registry("RP"))
+    event = _per_event(lambda: SIAEvent.from_line(line), 5000)
+    print(f"Codes in registry:             {len(SIA_CODE_REGISTRY)}")
+    print(f"Lookup, rebuilt per event:     {rebuilt:10.3f} us")
+    print(f"Lookup, shared registry:       {registry:10.3f} us")
+    print(f"SIAEvent.from_line (registry): {event:10.3f} us")
+
+
+if __name__ == "__main__":
+    main()
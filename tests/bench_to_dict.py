@@ -0,0 +1,65 @@
+#!/usr/bin/python
+"""Benchmark to_dict and to_json against the deepcopy and asdict implementation.
+
+Run with: python -m tests.bench_to_dict
+"""
+import json
+import timeit
+from copy import deepcopy
+from dataclasses import asdict
+from datetime import datetime
+
+from pysiaalarm import SIAAccount, SIAEvent
+
+from .test_utils import ACCOUNT, KEY, create_test_line
+
+NUMBER = 20000
+
+
+def _per_event(stmt, number: int = NUMBER) -> float:
+    """Return the best time per call in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def _old_to_dict(event):
+    """Create the dict like to_dict did before, from a deep copy."""
+    event = deepcopy(event)
+    event.sia_account = None
+    if event.timestamp is not None and isinstance(event.timestamp, datetime):
+        event.timestamp = event.timestamp.isoformat()
+    return asdict(event)
+
+
+def _old_to_json(event):
+    """Create json from the old dict, with the enums as their value."""
+    return json.dumps(_old_to_dict(event), default=lambda value: value.value).encode(
+        "ascii"
+    )
+
+
+def main():
+    """Run the benchmark and print the results."""
+    accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+    for key in (None, KEY):
+        label = "encrypted" if key else "plain"
+        event = SIAEvent.from_line(
+            create_test_line(account=ACCOUNT, key=key, code="RP"), accounts
+        )
+        assert event.to_dict() == _old_to_dict(event)
+        print(
+            f"{label:9}, deepcopy+asdict: {_per_event(lambda: _old_to_dict(event)):8.3f} us"
+        )
+        print(f"{label:9}, to_dict:         {_per_event(event.to_dict):8.3f} us")
+        print(
+            f"{label:9}, json.dumps:      {_per_event(lambda: _old_to_json(event)):8.3f} us"
+        )
+        print(f"{label:9}, to_json:         {_per_event(event.to_json):8.3f} us")
+    event = SIAEvent.from_line(create_test_line(account=ACCOUNT, key=None, code="RP"))
+    dic = event.to_dict()
+    print(
+        f"plain    , from_dict:       {_per_event(lambda: SIAEvent.from_dict(dic)):8.3f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
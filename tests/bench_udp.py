@@ -0,0 +1,89 @@
+#!/usr/bin/python
+"""Benchmark the datagrams per second of the threaded UDP server and the selector server.
+
+Run with: python -m tests.bench_udp
+"""
+import socket
+import threading
+import time
+
+from pysiaalarm import SIAAccount
+from pysiaalarm.sync.selector import SelectorConfig, SIASelectorServer
+from pysiaalarm.sync.server import SIAUDPServer
+from pysiaalarm.utils import CommunicationsProtocol, Counter
+
+from .test_utils import ACCOUNT, KEY, create_test_line
+
+NUMBER = 20000
+SENDERS = 8
+WINDOW = 16
+
+
+def _send(port, lines):
+    """Send the lines from a number of sockets, a window at a time, and wait for the answers."""
+    senders = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(SENDERS)]
+    for sock in senders:
+        sock.settimeout(5)
+    answered = 0
+    try:
+        for start in range(0, len(lines), SENDERS * WINDOW):
+            window = lines[start : start + SENDERS * WINDOW]
+            for index, line in enumerate(window):
+                senders[index % SENDERS].sendto(line, ("127.0.0.1", port))
+            for index in range(len(window)):
+                senders[index % SENDERS].recv(1024)
+                answered += 1
+    finally:
+        for sock in senders:
+            sock.close()
+    return answered
+
+
+def _run(label, server, lines):
+    """Serve in a thread, send all lines and print the datagrams per second."""
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    port = server.server_address[1]
+    _send(port, lines[:200])
+    start = time.perf_counter()
+    answered = _send(port, lines)
+    elapsed = time.perf_counter() - start
+    server.shutdown_flag = True
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    print(f"{label:9}: {answered / elapsed:10.0f} datagrams per second")
+
+
+def main():
+    """Run the benchmark and print the results."""
+    for key in (None, KEY):
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT, key, allowed_timeband=None)}
+        lines = [
+            f"\n{create_test_line(ACCOUNT, key, 'RP', seq=f'{i % 10000:04d}')}\r".encode()
+            for i in range(NUMBER)
+        ]
+        label = "encrypted" if key else "plain"
+        _run(
+            f"{label:9}, threaded",
+            SIAUDPServer(("127.0.0.1", 0), accounts, lambda event: None, Counter()),
+            lines,
+        )
+        _run(
+            f"{label:9}, selector",
+            SIASelectorServer(
+                ("127.0.0.1", 0),
+                accounts,
+                lambda event: None,
+                Counter(),
+                CommunicationsProtocol.UDP,
+                SelectorConfig(callback_workers=1),
+            ),
+            lines,
+        )
+
+
+if __name__ == "__main__":
+    main()
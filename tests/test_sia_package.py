@@ -1,29 +1,94 @@
 # -*- coding: utf-8 -*-
 """Class for tests of pysiaalarm."""
+import io
+import json
 import logging
 import asyncio
+import random
+import socket
+import string
+import time
 import pytest
+import pytz
+from copy import deepcopy
 from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
 
 from pytest_cases import parametrize_with_cases, fixture
 from unittest.mock import AsyncMock, Mock, patch
+from Crypto.Cipher import AES
 
 from pysiaalarm import (
+    BatchConfig,
+    CompactEvent,
+    EventReader,
+    EventWriter,
     SIAAccount,
     SIAClient,
     SIAEvent,
+    decode_events,
+    encode_events,
 )
 from pysiaalarm.aio import SIAClient as SIAClientA
+from pysiaalarm.aio import DispatchConfig, DispatchPolicy, ParsePoolConfig
 from pysiaalarm.aio.client import SIAClientTCP
-from pysiaalarm.aio.server import SIAServerTCP, SIAServerUDP
-from pysiaalarm.event import NAKEvent, BaseEvent
-from pysiaalarm.const import COUNTER_USER_CODE, COUNTER_VALID, COUNTER_EVENTS
-from pysiaalarm.errors import NoAccountError
+from pysiaalarm.aio.multiprocess import SIAMultiProcessClient
+from pysiaalarm.aio.parse_pool import SIAParsePool
+from pysiaalarm.aio.server import SIAConnectionTCP, SIAServerTCP, SIAServerUDP
+from pysiaalarm.base_server import BaseSIAServer
+from pysiaalarm.event import (
+    NAKEvent,
+    BaseEvent,
+    DuplicateEvent,
+    HeartbeatEvent,
+    LazySIAEvent,
+    OHEvent,
+)
+from pysiaalarm.const import (
+    COUNTER_ACCOUNT,
+    COUNTER_DROPPED,
+    COUNTER_EVENTS,
+    COUNTER_FORMAT,
+    COUNTER_QUEUE_DEPTH,
+    COUNTER_USER_CODE,
+    COUNTER_VALID,
+    IV,
+)
+from pysiaalarm.errors import EventFormatError, NoAccountError
+from pysiaalarm.sync.batch import SIABatcher
 from pysiaalarm.sync.handler import SIATCPHandler, SIAUDPHandler
-from pysiaalarm.utils import Counter
+from pysiaalarm.sync.pool import ThreadPoolConfig
+from pysiaalarm.sync.selector import DatagramRing, SelectorConfig
+from pysiaalarm.utils import (
+    CRC16,
+    Clock,
+    Counter,
+    DedupeCache,
+    FakeClock,
+    SIA_CODE_REGISTRY,
+    SIA_XDATA_REGISTRY,
+    SIAFramer,
+    SIAXData,
+    SharedCounts,
+    crc16,
+    crc16_batch,
+    crc16_hex,
+    dedupe_key,
+    lookup_adm,
+    parse_timestamp,
+)
+from pysiaalarm.data.adm_mapping import ADM_MAPPING
 
 from tests.test_alarm import send_messages
-from tests.test_utils import ACCOUNT, KEY, HOST, create_test_line
+from tests.test_utils import (
+    ACCOUNT,
+    KEY,
+    HOST,
+    _encrypt_content,
+    async_pass,
+    crc_calc,
+    create_test_line,
+)
 from tests.test_sia_package_cases import *  # pylint: disable=W0614
 
 
@@ -154,7 +219,7 @@ class testSIA(object):
             elif key == "message_type":
                 assert dic2[key].value == value
             elif key == "timestamp":
-                assert dic2[key] == value.isoformat()
+                assert dic2[key] == value
             else:
                 assert dic2[key] == value
 
@@ -242,6 +307,349 @@ class testSIA(object):
         event2 = event_type.from_dict(event_dict)
         assert event == event2
 
+    @parametrize_with_cases(
+        "line, account_id, code_type, code, error_type, extended_data_flag, encrypted_flag",
+        cases=EventParsing,
+    )
+    def test_event_parsing_bytes(
+        self,
+        line,
+        account_id,
+        code_type,
+        code,
+        error_type,
+        extended_data_flag,
+        encrypted_flag,
+    ):
+        """Test that parsing from bytes gives the same event as parsing the str."""
+        accounts = (
+            {account_id: SIAAccount(account_id, KEY, allowed_timeband=None)}
+            if account_id
+            else None
+        )
+        try:
+            expected = SIAEvent.from_line(line, accounts)
+        except Exception as exc:  # pylint: disable=broad-except
+            with pytest.raises(type(exc)):
+                SIAEvent.from_bytes(f"\n{line}\r".encode(), accounts)
+            return
+        event = SIAEvent.from_bytes(memoryview(f"\n{line}\r".encode()), accounts)
+        assert event == expected
+        assert event.calc_crc == expected.calc_crc
+
+    @parametrize_with_cases(
+        "line, account_id, code_type, code, error_type, extended_data_flag, encrypted_flag",
+        cases=EventParsing,
+    )
+    def test_event_parsing_lazy(
+        self,
+        line,
+        account_id,
+        code_type,
+        code,
+        error_type,
+        extended_data_flag,
+        encrypted_flag,
+    ):
+        """Test that a lazy event gives the same fields and response as a event."""
+        accounts = (
+            {account_id: SIAAccount(account_id, KEY, allowed_timeband=None)}
+            if account_id
+            else None
+        )
+        try:
+            expected = SIAEvent.from_line(line, accounts)
+        except Exception as exc:  # pylint: disable=broad-except
+            with pytest.raises(type(exc)):
+                SIAEvent.from_line(line, accounts, lazy=True).materialize()
+            return
+        event = SIAEvent.from_line(line, accounts, lazy=True)
+        assert isinstance(
+            event, OHEvent if isinstance(expected, OHEvent) else LazySIAEvent
+        )
+        assert event.response == expected.response
+        assert event.code == expected.code
+        assert event.sia_code is expected.sia_code
+        assert event.to_dict() == expected.to_dict()
+
+    def test_lazy_event_parsing(self):
+        """Test that lazy events only parse the content when it is needed."""
+        line = create_test_line(account=ACCOUNT, key=KEY, code="RP", alter_crc=True)
+        event = SIAEvent.from_line(line, {ACCOUNT: SIAAccount(ACCOUNT, KEY)}, lazy=True)
+        assert not event.valid_message
+        assert event.create_response() == b"\n\r"
+        assert not event._encrypted_content_decrypted
+        assert not event._content_parsed
+        assert event.code == "RP"
+        assert event._content_parsed
+        assert not event._sia_added
+        assert event.sia_code is SIA_CODE_REGISTRY["RP"]
+
+        msg = f'"SIA-DCS"0001L0#{ACCOUNT}[garbage'
+        line = f"{crc_calc(msg)}{len(msg):04X}{msg}"
+        event = SIAEvent.from_line(line, {ACCOUNT: SIAAccount(ACCOUNT)}, lazy=True)
+        assert event.valid_message
+        with pytest.raises(EventFormatError):
+            event.resolve_response()
+        with pytest.raises(EventFormatError):
+            event.resolve_response()
+        assert "garbage" in repr(event)
+        server = SIAServerTCP({ACCOUNT: SIAAccount(ACCOUNT)}, AsyncMock(), Counter())
+        server.lazy_events = True
+        assert isinstance(server.parse_and_check_event(line.encode()), NAKEvent)
+        assert server.counts.get(COUNTER_FORMAT) == 1
+
+    def test_lazy_event_unknown_account(self):
+        """Test that lazy events answer a unknown account without parsing the content."""
+        line = create_test_line(account=ACCOUNT, key=None, code="RP")
+        accounts = {"AAA": SIAAccount("AAA")}
+        event = SIAEvent.from_line(line, accounts, lazy=True)
+        assert event.valid_message
+        assert event.resolve_response() == ResponseType.NAK
+        assert event.account == ACCOUNT
+        assert ACCOUNT in str(event)
+        assert not event._content_parsed
+
+        server = SIAServerTCP(accounts, AsyncMock(), Counter())
+        server.lazy_events = True
+        event = server.parse_and_check_event(line.encode())
+        assert event.response == ResponseType.NAK
+        assert not event._content_parsed
+        assert server.counts.get(COUNTER_ACCOUNT) == 1
+
+    def test_lazy_event_response_stages(self):
+        """Test that the server answers lazy events without parsing the extended data."""
+        msg = '"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]'
+        line = f"{crc_calc(msg)}{len(msg):04X}{msg}"
+        accounts = {"1111": SIAAccount("1111")}
+        expected = SIAEvent.from_line(line, accounts)
+        server = SIAServerTCP(accounts, AsyncMock(), Counter())
+        server.lazy_events = True
+        event = server.parse_and_check_event(line.encode())
+        assert isinstance(event, LazySIAEvent)
+        assert event.create_response() == expected.create_response()
+        assert event.response == ResponseType.RSP
+        assert event._content_parsed and event._sia_added
+        assert "extended_data=None" in repr(event)
+        assert event == SIAEvent.from_line(line, accounts, lazy=True)
+        assert not event._xdata_parsed
+        assert event.get_xdata("K") == expected.get_xdata("K")
+        assert event._xdata_parsed
+
+    def test_compact_event(self):
+        """Test converting events to compact events and back."""
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+        lines = [
+            create_test_line(account=ACCOUNT, key=key, code="RP", msg_type=msg_type)
+            for key in (None, KEY)
+            for msg_type in ("SIA-DCS", "ADM-CID", "NULL")
+        ]
+        lines.append(
+            create_test_line(account=ACCOUNT, key=None, code="RP", alter_crc=True)
+        )
+        lines.append(r'02310052"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]')
+        events = [SIAEvent.from_line(line, accounts) for line in lines]
+        heartbeat = lines[2].encode()
+        events += [
+            NAKEvent(),
+            SIAEvent.from_line("SR0001L0001    006969XX    [ID00000000]"),
+            HeartbeatEvent._from_bytes(heartbeat, 0, len(heartbeat), accounts),
+            DuplicateEvent.of(events[0], ResponseType.ACK),
+        ]
+        for event in events:
+            compact = CompactEvent.from_event(event)
+            assert not hasattr(compact, "__dict__")
+            assert compact.content is None or event.encrypted
+            assert compact.to_event() == event
+            assert type(compact.to_event()) is type(event)
+        assert events[-5].extended_data
+        assert (
+            CompactEvent.from_event(events[-5]).to_event().extended_data
+            == events[-5].extended_data
+        )
+        duplicate = CompactEvent.from_event(events[-1]).to_event()
+        assert duplicate.original is None and duplicate.original_response is None
+        lazy = SIAEvent.from_line(lines[3], accounts, lazy=True)
+        assert type(CompactEvent.from_event(lazy).to_event()) is SIAEvent
+        assert CompactEvent.from_event(lazy).to_event() == events[3]
+
+    def test_xdata_registry(self):
+        """Test that the xdata schemas are shared and the xdata is looked up by id."""
+        body = '"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]'
+        line = f"{crc_calc(body)}0052{body}"
+        account = SIAAccount("1111", KEY, allowed_timeband=None)
+        first = SIAEvent.from_line(line, {"1111": account})
+        second = SIAEvent.from_line(line, {"1111": account})
+        xdata = first.get_xdata("K")
+        value = "AAAAAAAAAAAAAAAA"
+        assert xdata == SIAXData(
+            "K", "Encryption Key", xdata.description, 64, xdata.characters, value
+        )
+        assert xdata == SIAXData.from_schema(SIA_XDATA_REGISTRY["K"], value)
+        assert asdict(xdata) == first.to_dict()["extended_data"][0]
+        assert xdata.name is second.get_xdata("K").name
+        assert xdata.schema is SIA_XDATA_REGISTRY["K"]
+        assert SIAXData("Q", "Unknown", "", 1, "", "1").schema is None
+        assert first.get_xdata("A") is None
+        assert first.response == ResponseType.RSP
+        first.extended_data[0] = SIAXData.from_schema(SIA_XDATA_REGISTRY["A"], "12")
+        assert first.get_xdata("K") is None
+        assert first.get_xdata("A").value == "12"
+        assert first.response == ResponseType.ACK
+        with pytest.raises(TypeError):
+            SIA_XDATA_REGISTRY["K"] = None
+        with pytest.raises(AttributeError):
+            xdata.value = "other"
+        assert deepcopy(xdata) is xdata
+
+    def test_adm_table(self):
+        """Test the ADM-CID table against the mapping."""
+
+        def reference(event_qualifier, event_type):
+            """Map like parse_adm did with the nested dicts."""
+            if sub_map := ADM_MAPPING.get(event_type, None):
+                return sub_map.get(event_qualifier, "YN")
+            return "YN"
+
+        values = [
+            (qualifier, event_type)
+            for event_type in ADM_MAPPING
+            for qualifier in "0123456789"
+        ]
+        values += [("1", "999"), ("1", "10"), ("11", "13"), ("11", "00"), ("1", "1a0")]
+        for qualifier, event_type in values:
+            code, sia_code = lookup_adm(qualifier, event_type)
+            assert code == reference(qualifier, event_type)
+            assert sia_code is SIA_CODE_REGISTRY.get(code)
+        line = create_test_line(
+            account=ACCOUNT, key=None, code="WA", msg_type="ADM-CID"
+        )
+        event = SIAEvent.from_line(line)
+        assert event.code == "WA"
+        assert event.sia_code is SIA_CODE_REGISTRY["WA"]
+
+    def test_to_dict_json(self):
+        """Test that to_dict is the same as asdict of a copy and the json round trip."""
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+        lines = [
+            create_test_line(account=ACCOUNT, key=key, code="RP", msg_type=msg_type)
+            for key in (None, KEY)
+            for msg_type in ("SIA-DCS", "ADM-CID", "NULL")
+        ]
+        lines.append(r'02310052"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]')
+        events = [SIAEvent.from_line(line, accounts) for line in lines]
+        events += [
+            NAKEvent(),
+            SIAEvent.from_line("SR0001L0001    006969XX    [ID00000000]"),
+            SIAEvent.from_line(lines[3], accounts, lazy=True),
+        ]
+        for event in events:
+            reference = deepcopy(event)
+            if isinstance(reference, LazySIAEvent):
+                reference.materialize()
+            reference.sia_account = None
+            if reference.timestamp is not None:
+                reference.timestamp = reference.timestamp.isoformat()
+            expected = asdict(reference)
+            dic = event.to_dict()
+            assert dic == expected
+            assert list(dic) == list(expected)
+            data = event.to_json()
+            assert isinstance(data, bytes)
+            if dic["message_type"] is not None:
+                dic["message_type"] = dic["message_type"].value
+            assert json.loads(data) == dic
+            if event.encrypted:
+                # encrypted events need the account to be created again
+                continue
+            before = deepcopy(dic)
+            assert type(event).from_dict(dic) == type(event).from_dict(before)
+            assert dic == before
+            assert type(event).from_json(data) == type(event).from_dict(before)
+        assert events[-4].to_dict()["extended_data"] == [
+            {
+                "identifier": "K",
+                "name": "Encryption Key",
+                "description": "Key exchange request from CSR to PE (up to 256 bits)",
+                "length": 64,
+                "characters": "ASCII",
+                "value": "AAAAAAAAAAAAAAAA",
+            }
+        ]
+
+    def test_binary_events(self):
+        """Test writing events in the binary format and reading them back."""
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+        lines = [
+            create_test_line(account=ACCOUNT, key=key, code=code, msg_type=msg_type)
+            for key in (None, KEY)
+            for msg_type in ("SIA-DCS", "ADM-CID", "NULL")
+            for code in ("RP", "WA")
+        ]
+        lines.append(r'02310052"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]')
+        lines.append(
+            create_test_line(account=ACCOUNT, key=None, code="RP", alter_crc=True)
+        )
+        events = [SIAEvent.from_line(line, accounts) for line in lines]
+        heartbeat = lines[4].encode()
+        events += [
+            NAKEvent(),
+            SIAEvent.from_line("SR0001L0001    006969XX    [ID00000000]"),
+            HeartbeatEvent._from_bytes(heartbeat, 0, len(heartbeat), accounts),
+            DuplicateEvent.of(events[0], ResponseType.ACK),
+        ]
+        for event in events:
+            event.sia_account = None
+        events.append(SIAEvent.from_line(lines[6], accounts, lazy=True))
+        data = encode_events(events)
+        assert data.startswith(b"SIAE\x01")
+        assert len(data) < sum(len(event.to_json()) for event in events) / 4
+        decoded = list(decode_events(memoryview(bytearray(data))))
+        assert len(decoded) == len(events)
+        for event, result in zip(events, decoded):
+            assert result.to_dict() == event.to_dict()
+            if not isinstance(event, LazySIAEvent):
+                assert type(result) is type(event)
+                assert result == event
+            else:
+                assert type(result) is SIAEvent
+
+        stream = io.BytesIO()
+        writer = EventWriter(stream)
+        assert writer.write_all(events) == len(data) - 5
+        assert stream.getvalue() == data
+        stream.seek(0)
+        assert list(EventReader(stream)) == decoded
+
+        with pytest.raises(EventFormatError):
+            list(decode_events(b"SIAE\x02"))
+        with pytest.raises(EventFormatError):
+            list(decode_events(data[:-1]))
+        with pytest.raises(EventFormatError):
+            EventReader(io.BytesIO(b"JSON"))
+
+    def test_binary_timestamps(self):
+        """Test that aware timestamps keep their UTC offset in the binary format."""
+        line = create_test_line(account=ACCOUNT, key=None, code="RP")
+        offsets = (
+            timedelta(hours=-3, minutes=-30),
+            timedelta(hours=5, seconds=30, microseconds=7),
+        )
+        events = []
+        for offset in offsets:
+            event = SIAEvent.from_line(line)
+            event.timestamp = datetime(2020, 7, 9, 16, 4, 2, tzinfo=timezone(offset))
+            events.append(event)
+        event = SIAEvent.from_line(line)
+        event.timestamp = pytz.timezone("Europe/Amsterdam").localize(
+            datetime(2020, 7, 9, 16, 4, 2)
+        )
+        events.append(event)
+        for event, result in zip(events, decode_events(encode_events(events))):
+            assert result.timestamp == event.timestamp
+            assert result.timestamp.utcoffset() == event.timestamp.utcoffset()
+            assert result.timestamp.isoformat() == event.timestamp.isoformat()
+
     @parametrize_with_cases("key, account_id, error_type", cases=AccountSetup)
     def test_sia_account_setup(
         self, unused_tcp_port_factory, key, account_id, error_type
@@ -433,7 +841,9 @@ class testSIA(object):
 
         else:
             with patch.object(SIAClientTCP, "async_stop") as client:
-                with patch("asyncio.start_server"):
+                with patch.object(
+                    asyncio.get_running_loop(), "create_server", AsyncMock()
+                ):
                     # test Async
                     async with SIAClientA(
                         HOST,
@@ -475,6 +885,311 @@ class testSIA(object):
         response = event.create_response().decode("ascii")
         assert f"#{ACCOUNT}[AB" in response
 
+    def test_response_templates(self):
+        """Test that the templated responses are the same as the formatted ones."""
+
+        def reference(event):
+            """Create the response like create_response did without templates."""
+            response_type = event.response
+            if response_type is None:
+                return b"\n\r"
+            account = event.sia_account
+            x_data = f"[K{account.key}]" if event.extended_data and account.key else ""
+            rq = account.response_qualifier
+            if response_type == ResponseType.NAK:
+                res = f'"NAK"0000{event.receiver}{event.line}A0[{rq}]{TIMESTAMP}'
+            elif not event.encrypted or response_type == ResponseType.DUH:
+                res = f'"{response_type.value}"{event.sequence}{event.receiver}{event.line}#{event.account}[{rq}]{x_data}'
+            else:
+                encrypted = event.encrypt_content(f"]{x_data}{TIMESTAMP}")
+                res = f'"*{response_type.value}"{event.sequence}{event.receiver}{event.line}#{event.account}[{rq}{encrypted}'
+            return f"\n{crc_calc(res)}{len(res):04X}{res}\r".encode("ascii")
+
+        TIMESTAMP = "_10:11:12,01-02-2024"
+        accounts = [
+            SIAAccount(ACCOUNT, key, allowed_timeband=None, response_qualifier=rq)
+            for key in (None, KEY)
+            for rq in ("", "ab")
+        ]
+        xdata_line = r'02310052"SIA-DCS"6002L0#1111[|Nri1/RP000][KAAAAAAAAAAAAAAAA]'
+        with patch.object(
+            BaseEvent, "_get_timestamp", staticmethod(lambda tz=None: TIMESTAMP)
+        ):
+            for account in accounts:
+                lines = [
+                    create_test_line(
+                        account=ACCOUNT, key=account.key, code="RP", seq=seq
+                    )
+                    for seq in ("0000", "0001", "1234", "9999")
+                ]
+                for line in lines + [xdata_line]:
+                    event = SIAEvent.from_line(
+                        line, {ACCOUNT: account, "1111": account}
+                    )
+                    assert event.create_response() == reference(event)
+                    for response_type in ResponseType:
+                        with patch.object(SIAEvent, "response", response_type):
+                            assert event.create_response() == reference(event)
+            event.sequence = "12"
+            assert event.create_response() == reference(event)
+            nak = f'"NAK"0000L0R0A0[]{TIMESTAMP}'
+            assert NAKEvent().create_response() == (
+                f"\n{crc_calc(nak)}{len(nak):04X}{nak}\r".encode("ascii")
+            )
+        line = create_test_line(account=ACCOUNT, key=None, code="RP")
+        account = accounts[1]
+        account.response_qualifier = "CD"
+        assert b"[CD]" in SIAEvent.from_line(line, {ACCOUNT: account}).create_response()
+        event = SIAEvent.from_line(line)
+        assert event.create_response() == f'"{event.response.value}"'.encode()
+
+    def test_clock(self):
+        """Test the cached clock and the timeband check with a fake clock."""
+        ticks = [1594310642.25]
+        clock = Clock(resolution=0.5, time_func=lambda: ticks[0])
+        amsterdam = pytz.timezone("Europe/Amsterdam")
+        first = clock.now(amsterdam)
+        assert first == datetime.fromtimestamp(ticks[0], amsterdam)
+        assert clock.timestamp(amsterdam) == "_18:04:02,07-09-2020"
+        assert clock.timestamp() == "_16:04:02,07-09-2020"
+        ticks[0] += 0.25
+        assert clock.now(amsterdam) is first
+        assert clock.timestamp() == "_16:04:02,07-09-2020"
+        ticks[0] += 0.5
+        assert clock.now(amsterdam) == datetime.fromtimestamp(ticks[0], amsterdam)
+        assert clock.timestamp() == "_16:04:03,07-09-2020"
+        assert clock.now().tzinfo is None
+
+        fake = FakeClock(datetime(2020, 7, 9, 16, 4, 2, tzinfo=timezone.utc))
+        account = SIAAccount(ACCOUNT, None)
+        line = create_test_line(
+            account=ACCOUNT, key=None, code="RP", use_fixed_time=True
+        )
+        with patch.object(BaseEvent, "clock", fake):
+            event = SIAEvent.from_line(line, {ACCOUNT: account})
+            assert event.valid_timestamp
+            assert event.response == ResponseType.ACK
+            fake.advance(41)
+            assert not event.valid_timestamp
+            fake.advance(-62)
+            assert not event.valid_timestamp
+            assert NAKEvent().create_response().endswith(b"_16:03:41,07-09-2020\r")
+
+    def test_dedupe(self):
+        """Test that frames sent again are answered from the dedupe cache."""
+        cache = DedupeCache(size=2, ttl=10)
+        cache.put((b"1", b"0001", b"AAAA"), "first", 0)
+        cache.put((b"1", b"0002", b"BBBB"), "second", 0)
+        assert cache.get((b"1", b"0001", b"AAAA"), 1) == "first"
+        cache.put((b"1", b"0003", b"CCCC"), "third", 2)
+        assert len(cache) == 2
+        assert cache.get((b"1", b"0002", b"BBBB"), 2) is None
+        assert cache.get((b"1", b"0001", b"AAAA"), 10) is None
+        assert cache.get((b"1", b"0003", b"CCCC"), 11.9) == "third"
+        with pytest.raises(ValueError):
+            DedupeCache(size=0)
+
+        line = create_test_line(
+            account=ACCOUNT, key=None, code="RP", seq="1234", use_fixed_time=True
+        )
+        assert dedupe_key(line.encode()) == (
+            ACCOUNT.encode(),
+            b"1234",
+            line[:4].encode(),
+        )
+        assert dedupe_key(b"garbage") is None
+        bad = create_test_line(
+            account=ACCOUNT, key=None, code="RP", alter_crc=True, use_fixed_time=True
+        )
+        assert dedupe_key(bad.encode()) is None
+        changed = line.replace("RP", "WA")
+        assert changed[:4] == line[:4] and dedupe_key(changed.encode()) is None
+
+        events = []
+        server = BaseSIAServer(
+            {ACCOUNT: SIAAccount(ACCOUNT, None)}, Counter(), func=events.append
+        )
+        server.dedupe = DedupeCache(ttl=60)
+        fake = FakeClock(datetime(2020, 7, 9, 16, 4, 2, tzinfo=timezone.utc))
+        with patch.object(BaseEvent, "clock", fake):
+            first = server.parse_and_check_event(line.encode())
+            server.func_wrap(first)
+            with patch.object(SIAEvent, "_from_bytes") as parse:
+                second = server.parse_and_check_event(line.encode())
+                parse.assert_not_called()
+            server.func_wrap(second)
+            assert isinstance(second, DuplicateEvent)
+            assert second.original is first and second.sequence == "1234"
+            assert second.create_response() == first.create_response()
+            for frame in (bad, bad, changed):
+                event = server.parse_and_check_event(frame.encode())
+                assert not event.valid_message and not server.deliverable(event)
+            fake.advance(45)
+            assert first.response == ResponseType.NAK
+            late = server.parse_and_check_event(line.encode())
+            assert isinstance(late, DuplicateEvent)
+            assert late.response == ResponseType.ACK
+            assert late.create_response()[9:14] == b'"ACK"'
+            fake.advance(15)
+            third = server.parse_and_check_event(line.encode())
+            assert isinstance(third, SIAEvent)
+        assert events == [first]
+        assert server.counts.dedupe_hits == 2
+        assert server.counts.dedupe_misses == 2
+        assert server.counts.events == 7
+
+    @pytest.mark.parametrize("key", [None, KEY])
+    def test_heartbeat_fast_path(self, key):
+        """Test that NULL frames are handled by the heartbeat fast path."""
+        line = create_test_line(
+            account=ACCOUNT, key=key, code="RP", msg_type="NULL", use_fixed_time=True
+        ).encode()
+        late = create_test_line(
+            account=ACCOUNT,
+            key=key,
+            code="RP",
+            msg_type="NULL",
+            time_offset=timedelta(minutes=5),
+        ).encode()
+        issue_42 = b'CA2F0038"NULL"0000L0#7890[#0000|0000 00 000]_22:13:29,12-29-2022'
+        assert HeartbeatEvent._from_bytes(issue_42, 0, len(issue_42)) is None
+
+        events = []
+        heartbeats = []
+        server = BaseSIAServer(
+            {ACCOUNT: SIAAccount(ACCOUNT, key)}, Counter(), func=events.append
+        )
+        fake = FakeClock(datetime(2020, 7, 9, 16, 4, 2, tzinfo=timezone.utc))
+        with patch.object(BaseEvent, "clock", fake):
+            full = server.parse_and_check_event(line)
+            assert not isinstance(full, HeartbeatEvent)
+            server.heartbeat_func = heartbeats.append
+            with patch.object(SIAEvent, "_from_bytes") as parse:
+                heartbeat = server.parse_and_check_event(line)
+                parse.assert_not_called()
+            assert isinstance(heartbeat, HeartbeatEvent)
+            assert heartbeat.response == full.response == ResponseType.ACK
+            assert heartbeat.code == full.code == "RP"
+            assert heartbeat.timestamp == full.timestamp
+            assert heartbeat.sequence == full.sequence
+            if key is None:
+                assert heartbeat.create_response() == full.create_response()
+            server.func_wrap(heartbeat)
+
+            bad = line[:-1] + (b"0" if line[-1:] != b"0" else b"1")
+            assert not isinstance(server.parse_and_check_event(bad), HeartbeatEvent)
+        assert heartbeats == [heartbeat] and events == []
+        assert server.counts.heartbeats == 1 and server.counts.valid_events == 0
+
+        late_event = server.parse_and_check_event(late)
+        assert isinstance(late_event, HeartbeatEvent)
+        assert late_event.response == ResponseType.NAK
+        assert server.counts.error_timestamp == 1
+
+    def test_heartbeat_padding(self):
+        """Test that heartbeats with the empty content as |] use the fast path."""
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT, KEY, allowed_timeband=None)}
+        for encrypted, content in (
+            (True, _encrypt_content(KEY, "|]_16:04:02,07-09-2020")),
+            (False, "|]_16:04:02,07-09-2020"),
+        ):
+            msg = f'"{"*" if encrypted else ""}NULL"0001L0#{ACCOUNT}[{content}'
+            line = f"{crc_calc(msg)}{len(msg):04X}{msg}".encode()
+            heartbeat = HeartbeatEvent._from_bytes(line, 0, len(line), accounts)
+            full = SIAEvent._from_bytes(line, 0, len(line), accounts)
+            assert heartbeat is not None
+            assert heartbeat.response == full.response == ResponseType.ACK
+            assert heartbeat.timestamp == full.timestamp
+        msg = f'"*NULL"0001L0#{ACCOUNT}[{_encrypt_content(KEY, "|Nri1/RP000]")}'
+        line = f"{crc_calc(msg)}{len(msg):04X}{msg}".encode()
+        assert HeartbeatEvent._from_bytes(line, 0, len(line), accounts) is None
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_function_aio(self, unused_tcp_port):
+        """Test the heartbeat function of the aio client."""
+        with pytest.raises(TypeError):
+            SIAClientA(
+                HOST,
+                unused_tcp_port,
+                [SIAAccount(ACCOUNT, None)],
+                AsyncMock(),
+                heartbeat_function=lambda heartbeat: None,
+            )
+        with pytest.raises(TypeError):
+            SIAClient(
+                HOST,
+                unused_tcp_port,
+                [SIAAccount(ACCOUNT, None)],
+                lambda event: None,
+                heartbeat_function=AsyncMock(),
+            )
+        function = AsyncMock()
+        heartbeat_function = AsyncMock(side_effect=ValueError("boom"))
+        client = SIAClientA(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, None)],
+            function,
+            heartbeat_function=heartbeat_function,
+        )
+        line = create_test_line(account=ACCOUNT, key=None, code="RP", msg_type="NULL")
+        heartbeat = client.sia_server.parse_and_check_event(line.encode())
+        await client.sia_server.async_func_wrap(heartbeat)
+        heartbeat_function.assert_awaited_once_with(heartbeat)
+        function.assert_not_awaited()
+        assert client.counts.error_user_function == 1
+        with pytest.raises(TypeError):
+            client.heartbeat_function = lambda heartbeat: None
+        assert client.sia_server.heartbeat_func is heartbeat_function
+        client.heartbeat_function = None
+        assert client.sia_server.heartbeat_func is None
+
+    def test_parse_timestamp(self):
+        """Test the timestamp parser against strptime."""
+
+        def reference(value):
+            """Parse the timestamp with strptime."""
+            try:
+                timestamp = datetime.strptime(value, "%H:%M:%S,%m-%d-%Y")
+            except ValueError:
+                return None
+            return timestamp.replace(tzinfo=timezone.utc)
+
+        def parsed(value):
+            """Parse the timestamp, None when it is not valid."""
+            try:
+                return parse_timestamp(value)
+            except ValueError:
+                return None
+
+        values = [
+            "16:04:02,07-09-2020",
+            "00:00:00,01-01-0001",
+            "23:59:59,12-31-9999",
+            "24:00:00,01-01-2020",
+            "12:60:00,01-01-2020",
+            "12:00:60,01-01-2020",
+            "12:00:00,02-30-2020",
+            "12:00:00,02-29-2020",
+            "12:00:00,13-01-2020",
+            "12:00:00,01-01-0000",
+            "1:2:3,4-5-2020",
+            "12:00:00,01-01-20201",
+            "12-00:00,01-01-2020",
+            "",
+        ]
+        rng = random.Random(15)
+        for _ in range(2000):
+            chars = list(rng.choice(values[:3]))
+            chars[rng.randrange(len(chars))] = rng.choice("0123456789:,-")
+            values.append("".join(chars))
+        for value in values:
+            assert parsed(value) == reference(value), value
+        parse_timestamp.cache_clear()
+        parse_timestamp("16:04:02,07-09-2020")
+        assert parse_timestamp("16:04:02,07-09-2020").tzinfo is timezone.utc
+        assert parse_timestamp.cache_info().hits == 1
+
     def test_default_account_fallback(self):
         """Test using the default account when no direct match exists."""
         default_account = SIAAccount("", KEY)
@@ -532,3 +1247,629 @@ class testSIA(object):
         with patch.object(server, "parse_and_check_event") as parse_event:
             server.datagram_received(b"data", ("127.0.0.1", 1234))
         parse_event.assert_not_called()
+
+    def test_sia_code_registry_shared(self):
+        """Ensure events share the immutable SIA code registry entries."""
+        line = create_test_line(account=ACCOUNT, key=None, code="RP")
+        event1 = SIAEvent.from_line(line)
+        event2 = SIAEvent.from_line(line)
+        assert event1.sia_code is SIA_CODE_REGISTRY["RP"]
+        assert event2.sia_code is event1.sia_code
+        with pytest.raises(TypeError):
+            SIA_CODE_REGISTRY["RP"] = None  # type: ignore
+        with pytest.raises(AttributeError):
+            event1.sia_code.description = "changed"  # type: ignore
+
+    def test_crc_engine_matches_reference(self):
+        """Check the table driven CRC against the bitwise reference on random input."""
+        rnd = random.Random(1729)
+        frames = []
+        for _ in range(500):
+            msg = "".join(
+                rnd.choice(string.printable) for _ in range(rnd.randint(0, 200))
+            )
+            raw = msg.encode()
+            expected = crc_calc(msg)
+            assert crc16_hex(raw) == expected
+            assert crc16_hex(memoryview(bytearray(raw))) == expected
+            assert BaseEvent._crc_calc(msg) == expected
+            split = rnd.randint(0, len(raw))
+            crc = CRC16(raw[:split]).update(memoryview(raw)[split:])
+            assert crc.hexdigest() == expected
+            assert crc16_hex(raw[split:], crc16(raw[:split])) == expected
+            frames.append((raw, expected))
+        assert crc16_batch(raw for raw, _ in frames) == [exp for _, exp in frames]
+
+    def test_account_cipher_cache(self):
+        """Check the cached account cipher against a fresh AES cipher per message."""
+        account = SIAAccount(ACCOUNT, KEY)
+        cipher = account.cipher
+        assert cipher is account.cipher
+        rnd = random.Random(42)
+        for _ in range(20):
+            data = rnd.randbytes(16 * rnd.randint(1, 6))
+            expected = AES.new(account.key_b, AES.MODE_CBC, IV).encrypt(data)
+            assert cipher.encrypt(data) == expected
+            assert cipher.decrypt(expected) == data
+        with pytest.raises(ValueError):
+            cipher.encrypt(b"not padded")
+        account.key = "BBBBBBBBBBBBBBBB"
+        assert account.key_b == b"BBBBBBBBBBBBBBBB"
+        assert account.cipher is not cipher
+        account.key = None
+        assert account.cipher is None
+
+    def test_framer(self):
+        """Test splitting a stream into frames."""
+        framer = SIAFramer(max_size=64)
+        assert [bytes(f) for f in framer.feed(b"\nfirst\r\nsecond\r\nthi")] == [
+            b"\nfirst",
+            b"\nsecond",
+        ]
+        assert framer.pending == 4
+        assert [bytes(f) for f in framer.feed(b"rd\r")] == [b"\nthird"]
+        assert framer.pending == 0
+        assert [bytes(f) for f in framer.feed(b"unframed")] == [b"unframed"]
+        assert [bytes(f) for f in framer.feed(b"\n" + b"x" * 64)] == [b"\n" + b"x" * 64]
+        assert framer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_aio_tcp_connection_pipelined(self, account):
+        """Ensure all pipelined and split frames are answered in order."""
+        events = []
+
+        async def async_func(event: SIAEvent) -> None:
+            events.append(event)
+
+        server = SIAServerTCP({account.account_id: account}, async_func, Counter())
+        connection = server.protocol_factory()
+        transport = Mock(spec=asyncio.Transport)
+        transport.is_closing.return_value = False
+        connection.connection_made(transport)
+        lines = [
+            f"\n{create_test_line(account=ACCOUNT, key=KEY, code='RP', seq=seq)}\r".encode()
+            for seq in ("1001", "1002", "1003")
+        ]
+        stream = b"".join(lines)
+        connection.data_received(stream[:-10])
+        connection.data_received(stream[-10:])
+        responses = [call.args[0] for call in transport.writelines.call_args_list]
+        assert [len(r) for r in responses] == [2, 1]
+        sequences = [r[15:19] for batch in responses for r in batch]
+        assert sequences == [b"1001", b"1002", b"1003"]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert [e.sequence for e in events] == ["1001", "1002", "1003"]
+        transport.pause_reading.assert_called()
+        transport.resume_reading.assert_called()
+        assert server.counts.get(COUNTER_VALID) == 3
+        connection.connection_lost(None)
+        assert connection not in server.connections
+
+    @pytest.mark.parametrize(
+        "policy, acks, delivered",
+        [
+            (DispatchPolicy.BLOCK, 3, ["1001", "1002", "1003"]),
+            (DispatchPolicy.DROP_OLDEST, 3, ["1003"]),
+            (DispatchPolicy.NAK, 1, ["1001"]),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_aio_tcp_dispatch(self, account, policy, acks, delivered):
+        """Ensure events are answered before a slow user function has finished."""
+        events = []
+        release = asyncio.Event()
+
+        async def async_func(event: SIAEvent) -> None:
+            await release.wait()
+            events.append(event)
+
+        server = SIAServerTCP(
+            {account.account_id: account},
+            async_func,
+            Counter(),
+            DispatchConfig(workers=1, queue_size=1, policy=policy),
+        )
+        server.dispatcher.start()
+        connection = server.protocol_factory()
+        transport = Mock(spec=asyncio.Transport)
+        transport.is_closing.return_value = False
+        connection.connection_made(transport)
+        connection.data_received(
+            b"".join(
+                f"\n{create_test_line(account=ACCOUNT, key=KEY, code='RP', seq=seq)}\r".encode()
+                for seq in ("1001", "1002", "1003")
+            )
+        )
+        responses = transport.writelines.call_args_list[0].args[0]
+        assert len(responses) == 3
+        assert sum(b"ACK" in response for response in responses) == acks
+        await asyncio.sleep(0.01)
+        assert server.counts.get(COUNTER_QUEUE_DEPTH) == (
+            1 if policy == DispatchPolicy.BLOCK else 0
+        )
+        release.set()
+        await server.wait_delivered()
+        await server.dispatcher.stop()
+        assert [e.sequence for e in events] == delivered
+        assert server.counts.get(COUNTER_DROPPED) == 3 - len(delivered)
+        assert server.counts.get(COUNTER_QUEUE_DEPTH) == 0
+
+    @pytest.mark.parametrize(
+        "policy, acks, delivered",
+        [
+            (DispatchPolicy.BLOCK, 2, ["1001", "1002"]),
+            (DispatchPolicy.DROP_OLDEST, 3, ["1003"]),
+            (DispatchPolicy.NAK, 1, ["1001"]),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_aio_udp_dispatch(self, account, policy, acks, delivered):
+        """Ensure datagrams are answered right away with a bounded dispatcher."""
+        events = []
+        release = asyncio.Event()
+
+        async def async_func(event: SIAEvent) -> None:
+            await release.wait()
+            events.append(event)
+
+        server = SIAServerUDP(
+            {account.account_id: account},
+            async_func,
+            Counter(),
+            DispatchConfig(workers=1, queue_size=1, policy=policy),
+        )
+        transport = Mock(spec=asyncio.DatagramTransport)
+        transport.pause_reading = Mock()
+        transport.resume_reading = Mock()
+        transport.is_closing.return_value = False
+        server.connection_made(transport)
+        for seq in ("1001", "1002", "1003"):
+            line = create_test_line(account=ACCOUNT, key=KEY, code="RP", seq=seq)
+            server.datagram_received(line.encode(), ("127.0.0.1", 1234))
+        responses = [call.args[0] for call in transport.sendto.call_args_list]
+        assert len(responses) == 3
+        assert sum(b"ACK" in response for response in responses) == acks
+        assert server.dispatcher.pending == 1
+        if policy == DispatchPolicy.BLOCK:
+            transport.pause_reading.assert_called_once()
+        release.set()
+        await server.wait_delivered()
+        await server.dispatcher.stop()
+        assert [e.sequence for e in events] == delivered
+        assert server.counts.get(COUNTER_DROPPED) == 3 - len(delivered)
+        assert server.dispatcher.pending == 0
+        if policy == DispatchPolicy.BLOCK:
+            transport.resume_reading.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_aio_udp_without_dispatch(self, account):
+        """Ensure datagrams call the function in a task each without a dispatch config."""
+        events = []
+        release = asyncio.Event()
+
+        async def async_func(event: SIAEvent) -> None:
+            await release.wait()
+            events.append(event)
+
+        server = SIAServerUDP({account.account_id: account}, async_func, Counter())
+        assert server.dispatcher is None
+        transport = Mock(spec=asyncio.DatagramTransport)
+        server.connection_made(transport)
+        for seq in ("1001", "1002", "1003"):
+            line = create_test_line(account=ACCOUNT, key=KEY, code="RP", seq=seq)
+            server.datagram_received(line.encode(), ("127.0.0.1", 1234))
+        responses = [call.args[0] for call in transport.sendto.call_args_list]
+        assert all(b"ACK" in response for response in responses)
+        assert len(server.delivery_tasks) == 3
+        release.set()
+        await server.wait_delivered()
+        assert [e.sequence for e in events] == ["1001", "1002", "1003"]
+        assert not server.delivery_tasks
+        assert server.counts.get(COUNTER_DROPPED) == 0
+
+    @pytest.mark.asyncio
+    async def test_aio_parse_pool(self, account):
+        """Ensure frames parsed in the parse pool give the same responses and events, in order."""  # pylint: disable=line-too-long
+        lines = [
+            create_test_line(account=ACCOUNT, key=KEY, code="RP", seq="1001"),
+            create_test_line(
+                account=ACCOUNT, key=KEY, code="RP", seq="1002", alter_crc=True
+            ),
+            "garbage",
+            create_test_line(account="AAAA", key=KEY, code="RP", seq="1003"),
+            "",
+            create_test_line(account=ACCOUNT, key=KEY, code="RP", seq="1004"),
+            create_test_line(account=ACCOUNT, key=None, code="RP", seq="1005"),
+        ]
+        lines.append(lines[0])
+        stream = b"".join(f"\n{line}\r".encode() for line in lines)
+        results = {}
+        pools = (None, ParsePoolConfig(workers=2, max_batch=2, start_method="spawn"))
+        for pool in pools:
+            events = []
+
+            async def async_func(event: SIAEvent) -> None:
+                events.append(event)
+
+            server = SIAServerTCP(
+                {account.account_id: account}, async_func, Counter(), parse_pool=pool
+            )
+            server.dedupe = DedupeCache()
+            connection = server.protocol_factory()
+            transport = Mock(spec=asyncio.Transport)
+            transport.is_closing.return_value = False
+            connection.connection_made(transport)
+            connection.data_received(stream[:-30])
+            connection.data_received(stream[-30:])
+            await server.wait_delivered()
+            if server.parse_pool is not None:
+                await server.parse_pool.stop()
+            responses = [
+                response[9:19]
+                for call in transport.writelines.call_args_list
+                for response in call.args[0]
+            ]
+            results[pool is None] = (
+                responses,
+                [event.to_dict() for event in events],
+                server.counts,
+            )
+        assert results[True] == results[False]
+        assert len(results[True][0]) == 7
+        assert results[True][2].dedupe_hits == 1
+        assert [e["sequence"] for e in results[True][1]] == ["1001", "1004", "1005"]
+
+        events = []
+        server = SIAServerUDP(
+            {account.account_id: account},
+            async_func,
+            Counter(),
+            parse_pool=ParsePoolConfig(workers=1, start_method="spawn"),
+        )
+        server.dedupe = DedupeCache()
+        transport = Mock(spec=asyncio.DatagramTransport)
+        server.connection_made(transport)
+        for port, line in enumerate(lines):
+            server.datagram_received(line.encode(), ("127.0.0.1", port))
+        await server.wait_delivered()
+        await server.parse_pool.stop()
+        addresses = [call.args[1][1] for call in transport.sendto.call_args_list]
+        assert addresses == [0, 1, 2, 3, 5, 6, 7]
+        assert [e.sequence for e in events] == ["1001", "1004", "1005"]
+        assert server.counts == results[True][2]
+
+    def test_parse_pool_restarts(self):
+        """Test that the parse pool is started again when the accounts change."""
+        pool = SIAParsePool(ParsePoolConfig(workers=1))
+        accounts = {ACCOUNT: SIAAccount(ACCOUNT)}
+        executor = pool._get_executor(accounts)
+        assert pool._get_executor(accounts) is executor
+        accounts[ACCOUNT].key = KEY
+        restarted = pool._get_executor(accounts)
+        assert restarted is not executor
+        other = SIAAccount("AAA")
+        assert pool._get_executor(accounts) is restarted
+        accounts["AAA"] = other
+        executor = pool._get_executor(accounts)
+        assert executor is not restarted
+        assert pool._get_executor(dict(accounts)) is executor
+        SIAAccount("BBB").key = KEY
+        assert pool._get_executor(accounts) is executor
+        asyncio.run(pool.stop())
+
+    def test_client_lazy_events(self, unused_tcp_port):
+        """Test that the client passes the parse options to the server."""
+
+        async def async_func(event: SIAEvent) -> None:
+            pass
+
+        client = SIAClientA(HOST, unused_tcp_port, [], async_func)
+        assert not client.sia_server.lazy_events
+        client.lazy_events = True
+        assert client.lazy_events and client.sia_server.lazy_events
+
+    @pytest.mark.parametrize(
+        "mode",
+        [
+            {"thread_pool": ThreadPoolConfig(workers=2, queue_size=2)},
+            {"selector": SelectorConfig(callback_workers=2, callback_queue_size=2)},
+        ],
+        ids=["thread_pool", "selector"],
+    )
+    @pytest.mark.parametrize(
+        "protocol", [CommunicationsProtocol.TCP, CommunicationsProtocol.UDP]
+    )
+    def test_sync_server_modes(self, unused_tcp_port, protocol, mode):
+        """Test that many connections are handled by a small number of threads."""
+        events = []
+        client = SIAClient(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, KEY)],
+            events.append,
+            protocol=protocol,
+            **mode,
+        )
+        assert client.pool_metrics.completed == 0
+        client.start(poll_interval=0.01)
+        kind = (
+            socket.SOCK_STREAM
+            if protocol == CommunicationsProtocol.TCP
+            else socket.SOCK_DGRAM
+        )
+        sockets = [socket.socket(socket.AF_INET, kind) for _ in range(10)]
+        try:
+            for sock in sockets:
+                sock.settimeout(2)
+                sock.connect((HOST, unused_tcp_port))
+            for batch in range(2):
+                for index, sock in enumerate(sockets):
+                    line = create_test_line(
+                        ACCOUNT, KEY, "RP", seq=f"{batch}{index:03d}"
+                    )
+                    data = f"\n{line}\r".encode()
+                    if protocol == CommunicationsProtocol.TCP:
+                        sock.sendall(data[:20])
+                        data = data[20:]
+                    sock.sendall(data)
+                for index, sock in enumerate(sockets):
+                    assert f"{batch}{index:03d}".encode() in sock.recv(1024)
+        finally:
+            for sock in sockets:
+                sock.close()
+            client.stop()
+        metrics = client.pool_metrics
+        assert metrics.workers == 2
+        assert metrics.busy == 0 and metrics.utilization == 0.0
+        assert metrics.completed >= 20
+        assert metrics.max_queued <= 2
+        assert client.counts.valid_events == 20
+        assert len(events) == 20
+        assert client.counts.queue_depth == 0
+        if protocol == CommunicationsProtocol.TCP:
+            assert not client.sia_server.connections
+
+    def test_datagram_ring(self):
+        """Test that waiting datagrams are received in batches of the ring size."""
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            receiver.bind((HOST, 0))
+            receiver.setblocking(False)
+            ring = DatagramRing(3, 16)
+            assert len(ring) == 3
+            assert ring.receive(receiver) == []
+            for index in range(5):
+                sender.sendto(b"datagram %d" % index, receiver.getsockname())
+            sender.sendto(b"x" * 20, receiver.getsockname())
+            time.sleep(0.05)
+            first = [bytes(data) for data, _ in ring.receive(receiver)]
+            assert first == [b"datagram 0", b"datagram 1", b"datagram 2"]
+            second = ring.receive(receiver)
+            assert [bytes(data) for data, _ in second] == [
+                b"datagram 3",
+                b"datagram 4",
+                b"x" * 16,
+            ]
+            assert second[0][1][1] == sender.getsockname()[1]
+            assert ring.receive(receiver) == []
+        finally:
+            receiver.close()
+            sender.close()
+
+    def test_sync_server_modes_exclusive(self):
+        """Test that the thread pool and the selector can not be combined."""
+        with pytest.raises(ValueError):
+            SIAClient(
+                HOST,
+                0,
+                [],
+                get_func("sync"),
+                thread_pool=ThreadPoolConfig(),
+                selector=SelectorConfig(),
+            )
+
+    def test_batcher(self):
+        """Test that the events are passed in batches by size and by latency."""
+        with pytest.raises(ValueError):
+            SIABatcher(BatchConfig(size=0), print)
+        batches = []
+        batcher = SIABatcher(BatchConfig(size=3, max_latency=10), batches.append)
+        batcher.start()
+        for number in range(7):
+            batcher.add(number)
+        deadline = time.monotonic() + 5
+        while len(batches) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert batches == [[0, 1, 2], [3, 4, 5]] and batcher.pending == 1
+        batcher.stop()
+        assert batches[2:] == [[6]]
+
+        batches.clear()
+        batcher = SIABatcher(BatchConfig(size=3, max_latency=0.05), batches.append)
+        batcher.start()
+        batcher.add(0)
+        deadline = time.monotonic() + 5
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        batcher.stop()
+        assert batches == [[0]]
+
+    def test_batch_function_sync(self, unused_tcp_port):
+        """Test the batch function of the sync client."""
+        with pytest.raises(ValueError):
+            SIAClient(HOST, 0, [], None)
+        with pytest.raises(TypeError):
+            SIAClient(HOST, 0, [], None, batch_function=AsyncMock())
+        batch_function = Mock(side_effect=[None, ValueError("boom")])
+        client = SIAClient(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, None)],
+            None,
+            batch_function=batch_function,
+            batch=BatchConfig(size=2, max_latency=10),
+        )
+        events = [
+            client.sia_server.parse_and_check_event(
+                create_test_line(
+                    account=ACCOUNT, key=None, code="RP", seq=f"{seq:04d}"
+                ).encode()
+            )
+            for seq in range(3)
+        ]
+        client.start()
+        for event in events:
+            client.sia_server.func_wrap(event)
+        client.stop()
+        assert [call.args[0] for call in batch_function.call_args_list] == [
+            events[:2],
+            events[2:],
+        ]
+        assert client.counts.valid_events == 3
+        assert client.counts.error_user_function == 1
+
+    def test_batch_function_and_function_sync(self, unused_tcp_port):
+        """Test that with both functions each event is passed to both."""
+        function = Mock()
+        batches = []
+        client = SIAClient(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, None)],
+            function,
+            batch_function=batches.append,
+            batch=BatchConfig(size=2, max_latency=10),
+        )
+        events = [
+            client.sia_server.parse_and_check_event(
+                create_test_line(
+                    account=ACCOUNT, key=None, code="RP", seq=f"{seq:04d}"
+                ).encode()
+            )
+            for seq in range(3)
+        ]
+        client.start()
+        for event in events:
+            client.sia_server.func_wrap(event)
+        client.stop()
+        assert [call.args[0] for call in function.call_args_list] == events
+        assert batches == [events[:2], events[2:]]
+        assert client.counts.valid_events == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_function_and_function_aio(self, unused_tcp_port):
+        """Test that with both async functions each event is passed to both."""
+        function = AsyncMock()
+        batch_function = AsyncMock()
+        client = SIAClientA(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, None)],
+            function,
+            batch_function=batch_function,
+            batch=BatchConfig(size=2, max_latency=10),
+        )
+        events = [
+            client.sia_server.parse_and_check_event(
+                create_test_line(
+                    account=ACCOUNT, key=None, code="RP", seq=f"{seq:04d}"
+                ).encode()
+            )
+            for seq in range(3)
+        ]
+        await client.async_start()
+        for event in events:
+            await client.sia_server.async_func_wrap(event)
+        await client.async_stop()
+        assert [call.args[0] for call in function.await_args_list] == events
+        assert [call.args[0] for call in batch_function.await_args_list] == [
+            events[:2],
+            events[2:],
+        ]
+        assert client.counts.valid_events == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_function_aio(self, unused_tcp_port):
+        """Test the batch function of the aio client."""
+        with pytest.raises(ValueError):
+            SIAClientA(HOST, 0, [], None)
+        with pytest.raises(TypeError):
+            SIAClientA(HOST, 0, [], None, batch_function=lambda events: None)
+        batch_function = AsyncMock(side_effect=[ValueError("boom"), None])
+        client = SIAClientA(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, None)],
+            None,
+            batch_function=batch_function,
+            batch=BatchConfig(size=2, max_latency=0.05),
+        )
+        events = [
+            client.sia_server.parse_and_check_event(
+                create_test_line(
+                    account=ACCOUNT, key=None, code="RP", seq=f"{seq:04d}"
+                ).encode()
+            )
+            for seq in range(3)
+        ]
+        await client.async_start()
+        for event in events:
+            await client.sia_server.async_func_wrap(event)
+        for _ in range(100):
+            if batch_function.await_count == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert [call.args[0] for call in batch_function.await_args_list] == [
+            events[:2],
+            events[2:],
+        ]
+        await client.async_stop()
+        assert batch_function.await_count == 2
+        assert client.counts.valid_events == 3
+        assert client.counts.error_user_function == 1
+
+    def test_shared_counts(self):
+        """Test that the counts of the workers are added up."""
+        shared = SharedCounts(3)
+        assert shared.total() == Counter()
+        shared.store(0, Counter(events=2, valid_events=1, error_crc=1))
+        shared.store(2, Counter(events=3, valid_events=3, queue_depth=4))
+        assert shared.worker(1) == Counter()
+        assert shared.worker(2) == Counter(events=3, valid_events=3, queue_depth=4)
+        assert shared.total() == Counter(
+            events=5, valid_events=4, error_crc=1, queue_depth=4
+        )
+        shared.store(0, Counter(events=4))
+        assert shared.total().events == 7
+
+    @pytest.mark.skipif(
+        not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT not available"
+    )
+    def test_multi_process_client(self, unused_tcp_port):
+        """Test that the workers share the port and their counts."""
+        client = SIAMultiProcessClient(
+            HOST,
+            unused_tcp_port,
+            [SIAAccount(ACCOUNT, KEY)],
+            async_pass,
+            workers=2,
+            flush_interval=0.01,
+            start_method="spawn",
+        )
+        with client:
+            assert len(client._processes) == 2
+            for seq in range(8):
+                line = create_test_line(
+                    ACCOUNT, KEY, "RP", seq=f"{seq:04d}", alter_crc=seq == 7
+                )
+                with socket.create_connection((HOST, unused_tcp_port), 1) as sock:
+                    sock.sendall(line.encode("ascii"))
+                    assert sock.recv(1024)
+        counts = client.counts
+        assert counts.events == 8
+        assert counts.valid_events == 7
+        assert counts.error_crc == 1
+        assert sum(c.events for c in client.worker_counts()) == 8
+        assert not client._processes
@@ -27,6 +27,10 @@ PORT = 7777
 ADM_REVERSE_MAP = {"RP": 1602, "WA": 1113}
 
 
+async def async_pass(event):
+    """Pass for testing, defined at module level so it can be pickled."""
+
+
 def _get_crypter(key: bytes):
     """Give back a encrypter/decrypter."""
     return AES.new(key, AES.MODE_CBC, IV)